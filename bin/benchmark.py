@@ -0,0 +1,244 @@
+#! /usr/bin/env python3
+"""Benchmark the stages of the extraction and the CPA update on seeded synthetic data at several sizes.
+
+Usage: python bin/benchmark.py [--sizes 1000,10000] [--output results.json] [--help]
+"""
+
+import argparse
+import datetime as dti
+import gc
+import json
+import pathlib
+import platform
+import random
+import subprocess  # nosec
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator, List
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import prosessilouhinta.cpa as cpa  # noqa: E402
+import prosessilouhinta.prosessilouhinta as pm  # noqa: E402
+from prosessilouhinta.mapped import MappedSource  # noqa: E402
+from prosessilouhinta.network import CompactNetwork  # noqa: E402
+
+ENCODING = 'utf-8'
+START = dti.datetime(2021, 11, 27, 12, 34, 56)
+HEADER = '#case_id,task,user,ts_text'
+WHAT_IF_EDITS = 100
+
+Result = dict[str, Any]
+
+SECTIONS: dict[str, Callable[[pm.Aggregate], Any]] = {
+    'activity_counts': lambda agg: agg.activity_counts(),
+    'average_time_differences': lambda agg: pm.average_time_differences_as_float(pm.average_time_differences(agg.D)),
+    'control_flow': lambda agg: agg.control_flow(),
+    'time_differences': lambda agg: pm.time_differences_as_float(agg.D),
+    'user_activities': lambda agg: agg.user_activities(),
+    'work_distribution': lambda agg: agg.work_distribution(),
+    'working_together': lambda agg: agg.working_together(),
+}
+
+
+def generate_rows(
+    seed: int, cases: int, trace_length: int, activities: int, users: int, interleave: int
+) -> Iterator[str]:
+    """Generate the eventlog rows of cases with up to trace_length events, interleaving up to interleave cases."""
+    rng = random.Random(seed)
+    open_cases: List[Iterator[str]] = []
+    next_case = 0
+
+    def case_rows(case: int) -> Iterator[str]:
+        ts = START + dti.timedelta(seconds=rng.randrange(cases * 60))
+        for _ in range(rng.randint(1, trace_length)):
+            ts += dti.timedelta(seconds=rng.randrange(1, 7200))
+            yield f'c{case},a{rng.randrange(activities)},u{rng.randrange(users)},{ts:%Y-%m-%d %H:%M:%S}'
+
+    while next_case < cases or open_cases:
+        while next_case < cases and len(open_cases) < interleave:
+            open_cases.append(case_rows(next_case))
+            next_case += 1
+        k = rng.randrange(len(open_cases))
+        row = next(open_cases[k], None)
+        if row is None:
+            open_cases.pop(k)
+            continue
+        yield row
+
+
+def write_eventlog(path: pathlib.Path, **parameters: int) -> int:
+    """Write the synthetic eventlog to path and return the number of events."""
+    events = 0
+    with open(path, 'wt', encoding=ENCODING) as handle:
+        handle.write(f'{HEADER}\n')
+        for row in generate_rows(**parameters):
+            handle.write(f'{row}\n')
+            events += 1
+    return events
+
+
+def generate_network(seed: int, nodes: int, fan_out: int) -> cpa.Node:
+    """Build a random acyclic precedence network linking each node to up to fan_out of the next nodes."""
+    rng = random.Random(seed)
+    network = cpa.Node('benchmark')
+    members = [network.add(cpa.Node(f'n{k}', duration=rng.randint(1, 10))) for k in range(nodes)]
+    for k, node in enumerate(members[:-1]):
+        for target in rng.sample(members[k + 1 : k + 1 + 2 * fan_out], min(fan_out, nodes - k - 1)):
+            network.link(node, target)
+    return network
+
+
+def generate_ladder(nodes: int) -> tuple[cpa.Node, list[cpa.Node], list[cpa.Node]]:
+    """Build a critical chain of half the nodes with a side node bypassing every chain node (bounded cones)."""
+    network = cpa.Node('ladder')
+    chain = [network.add(cpa.Node('c0', duration=10)), network.add(cpa.Node('c1', duration=10))]
+    sides = []
+    for k in range(nodes // 2 - 2):
+        sides.append(network.add(cpa.Node(f's{k}', duration=5)))
+        chain.append(network.add(cpa.Node(f'c{k + 2}', duration=10)))
+    for k, node in enumerate(chain[1:]):
+        network.link(chain[k], node)
+    for k, side in enumerate(sides):
+        network.link(chain[k], side)
+        network.link(side, chain[k + 2])
+    return network, chain, sides
+
+
+def measure(stage: Callable[[], Any], repeat: int) -> tuple[float, int, Any]:
+    """Time the stage (minimum of repeat runs) and measure its peak traced memory in an extra run."""
+    seconds = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        stage()
+        seconds = min(seconds, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    value = stage()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, value
+
+
+def bench_extraction(folder: pathlib.Path, cases: int, options: argparse.Namespace) -> List[Result]:
+    """Measure the stages of the extraction (parse, aggregate, every report section, write) for cases."""
+    parameters = {
+        'seed': options.seed,
+        'cases': cases,
+        'trace_length': options.trace_length,
+        'activities': options.activities,
+        'users': options.users,
+        'interleave': options.interleave,
+    }
+    source = folder / f'eventlog-{cases}.csv'
+    events = write_eventlog(source, **parameters)
+    common = {'benchmark': 'extract', 'cases': cases, 'events': events, 'bytes': source.stat().st_size}
+
+    results = []
+
+    def record(stage: str, run: Callable[[], Any]) -> Any:
+        seconds, peak, value = measure(run, options.repeat)
+        results.append({**common, 'stage': stage, 'seconds': seconds, 'peak_bytes': peak})
+        return value
+
+    eventlog = record('parse', lambda: pm.parse_eventlog_csv(MappedSource(source)))
+    agg = record('aggregate', lambda: pm.aggregate(eventlog))
+    report = {name: record(f'section:{name}', lambda: compute(agg)) for name, compute in SECTIONS.items()}
+    target = folder / f'report-{cases}.json'
+    record('write', lambda: pm.write_report(iter(report.items()), target))
+    argv = ['extract', str(source), str(target), '']
+    record('main', lambda: (target.unlink(missing_ok=True), pm.main(argv)))
+    return results
+
+
+def bench_cpa(nodes: int, options: argparse.Namespace) -> List[Result]:
+    """Measure the update of all timings of a random network with nodes."""
+    seconds, peak, network = measure(lambda: generate_network(options.seed, nodes, options.fan_out), 1)
+    common = {'benchmark': 'cpa', 'nodes': nodes, 'edges': sum(len(node.to_nodes) for node in network.nodes)}
+    results = [{**common, 'stage': 'build', 'seconds': seconds, 'peak_bytes': peak}]
+    seconds, peak, _ = measure(lambda: generate_network(options.seed, nodes, options.fan_out).update_all(), 1)
+    results.append({**common, 'stage': 'build+update_all', 'seconds': seconds, 'peak_bytes': peak})
+    seconds, peak, _ = measure(lambda: CompactNetwork.of_node(network).update_all(), 1)
+    results.append({**common, 'stage': 'compact+update_all', 'seconds': seconds, 'peak_bytes': peak})
+    network.update_all()
+    rng = random.Random(options.seed)
+    edits = [(network.nodes[rng.randrange(nodes)], rng.randint(1, 10)) for _ in range(WHAT_IF_EDITS)]
+    seconds, peak, _ = measure(lambda: [network.update_activity(node, duration=d) for node, d in edits], 1)
+    results.append({**common, 'stage': f'update_activity*{WHAT_IF_EDITS}', 'seconds': seconds, 'peak_bytes': peak})
+    ladder, chain, sides = generate_ladder(nodes)
+    ladder.update_all()
+    ladder.update_activity(sides[0], duration=5)
+    assert chain[1].drag == 5  # nosec (builds the index of the paths avoiding the nodes before measuring)
+    edits = [(k, rng.randint(1, 9)) for k in (rng.randrange(len(sides)) for _ in range(WHAT_IF_EDITS))]
+
+    def what_if() -> list[Any]:
+        drags = []
+        for k, duration in edits:
+            ladder.update_activity(sides[k], duration=duration)
+            drags.append(chain[k + 1].drag)
+        return drags
+
+    seconds, peak, _ = measure(what_if, 1)
+    common = {'benchmark': 'cpa-ladder', 'nodes': len(ladder.nodes), 'edges': 3 * len(sides) + len(chain) - 1}
+    results.append({**common, 'stage': f'update_activity+drag*{WHAT_IF_EDITS}', 'seconds': seconds, 'peak_bytes': peak})
+    return results
+
+
+def commit() -> str:
+    """Identify the commit of the working tree (empty if not available)."""
+    try:
+        return subprocess.run(  # nosec
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def parse_options(argv: List[str]) -> argparse.Namespace:
+    """Parse the command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000', help='comma separated numbers of cases')
+    parser.add_argument('--trace-length', type=int, default=12, help='maximal number of events per case')
+    parser.add_argument('--activities', type=int, default=20, help='size of the activity alphabet')
+    parser.add_argument('--users', type=int, default=50, help='number of users')
+    parser.add_argument('--interleave', type=int, default=1, help='number of cases open at the same time')
+    parser.add_argument('--cpa-sizes', default='1000,10000', help='comma separated numbers of network nodes')
+    parser.add_argument('--fan-out', type=int, default=2, help='number of successors per network node')
+    parser.add_argument('--seed', type=int, default=42, help='seed of the generators')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs per stage (minimum wins)')
+    parser.add_argument('--output', default='', help='path to the JSON results (default is standard out)')
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    """Run the benchmarks and write the results as JSON."""
+    options = parse_options(argv)
+    results: List[Result] = []
+    with tempfile.TemporaryDirectory() as folder:
+        for cases in (int(size) for size in options.sizes.split(',') if size):
+            print(f'extract: {cases} cases', file=sys.stderr)
+            results.extend(bench_extraction(pathlib.Path(folder), cases, options))
+    for nodes in (int(size) for size in options.cpa_sizes.split(',') if size):
+        print(f'cpa: {nodes} nodes', file=sys.stderr)
+        results.extend(bench_cpa(nodes, options))
+
+    document = {
+        'commit': commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {key: value for key, value in vars(options).items() if key != 'output'},
+        'results': results,
+    }
+    if not options.output:
+        json.dump(document, sys.stdout, indent=2)
+        return 0
+    with open(options.output, 'wt', encoding=ENCODING) as handle:
+        json.dump(document, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
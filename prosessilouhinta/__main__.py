@@ -1,6 +1,6 @@
 import sys
 
-from prosessilouhinta.cli import app
+from prosessilouhinta.cli import main
 
 if __name__ == '__main__':
-    sys.exit(app(prog_name='prosessilouhinta'))  # pragma: no cover
+    sys.exit(main())  # pragma: no cover
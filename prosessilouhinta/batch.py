@@ -0,0 +1,156 @@
+"""Batch extraction of many eventlogs in a process pool with wun report per eventlog and an optional merged report."""
+
+import concurrent.futures
+import glob
+import itertools
+import os
+import pathlib
+import sys
+from typing import Any, List, Optional, Tuple
+
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.compression import ZSTD, sniff, zstd_available
+from prosessilouhinta.mapped import MappedSource
+from prosessilouhinta.report import BINARY, FORMATS, JSON, NDJSON, write_report
+
+MANIFEST_PREFIX = '@'
+EXTENSIONS = {JSON: '.json', NDJSON: '.ndjson', BINARY: '.bin'}
+SOURCE_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst', '.csv')
+
+
+def sources_of(spec: str) -> List[pathlib.Path]:
+    """List the eventlogs matching the glob pattern or named in the @manifest (wun path per line).
+
+    Relative paths in a manifest are relative to the folder of the manifest, empty lines and # comments are skipped.
+    """
+    if spec.startswith(MANIFEST_PREFIX):
+        manifest = pathlib.Path(spec[len(MANIFEST_PREFIX) :])
+        with open(manifest, 'rt', encoding=pm.ENCODING) as handle:
+            entries = [line.strip() for line in handle]
+        return [manifest.parent / entry for entry in entries if entry and not entry.startswith('#')]
+    return [pathlib.Path(name) for name in sorted(glob.glob(spec, recursive=True)) if pathlib.Path(name).is_file()]
+
+
+def target_of(source: pathlib.Path, folder: pathlib.Path, fmt: str = JSON) -> pathlib.Path:
+    """Name the report of the eventlog in the folder (site-a.csv.gz becomes site-a.json)."""
+    name = source.name
+    for suffix in SOURCE_SUFFIXES:
+        if name.endswith(suffix) and len(name) > len(suffix):
+            name = name[: -len(suffix)]
+    return folder / f'{name}{EXTENSIONS[fmt]}'
+
+
+def extract_one(
+    source: pathlib.Path,
+    target: pathlib.Path,
+    fmt: str = JSON,
+    summaries: bool = False,
+    cache: bool = False,
+    keep: bool = False,
+) -> Optional[pm.Aggregate]:
+    """Extract the report of the eventlog to target and return the aggregate with all cases closed if keep."""
+    eventlog: pm.Events
+    if cache:
+        from prosessilouhinta.cache import parse_cached
+
+        eventlog = parse_cached(source)
+    else:
+        eventlog = pm.parse_eventlog_csv(source if sniff(source) else MappedSource(source))
+    agg = pm.Aggregate.of_events(eventlog, summaries)
+    write_report(agg.sections(), target, fmt)
+    if not keep:
+        return None
+    for caseid in list(agg.case_users):
+        agg.close_case(caseid)
+    return agg
+
+
+def verify_request(argv: Optional[List[str]], options: Optional[pm.Options] = None) -> Tuple[int, str, List[Any]]:
+    """Fail with grace for batches."""
+    if not argv or len(argv) != 5:
+        return 2, 'received wrong number of arguments', ['']
+
+    command, spec, folder, merged, dryrun = argv
+
+    if command not in ('batch',):
+        return 2, 'received unknown command', ['']
+
+    jobs = (options or {}).get('jobs', 1)
+    if not isinstance(jobs, int) or jobs < 0:
+        return 2, 'received invalid number of jobs', ['']
+
+    fmt = (options or {}).get('format', JSON)
+    if fmt not in FORMATS:
+        return 2, 'received unknown format', ['']
+
+    if not spec or not folder:
+        return 2, 'batch requires sources and a target folder', ['']
+
+    if spec.startswith(MANIFEST_PREFIX) and not pathlib.Path(spec[len(MANIFEST_PREFIX) :]).is_file():
+        return 1, 'manifest is no file', ['']
+
+    sources = sources_of(spec)
+    if not sources:
+        return 1, 'no eventlogs match the sources', ['']
+
+    if not all(source.is_file() for source in sources):
+        return 1, 'source is no file', ['']
+
+    if not zstd_available() and any(sniff(source) == ZSTD for source in sources):
+        return 1, 'zstd compressed source requires zstandard', ['']
+
+    if pathlib.Path(folder).exists() and not pathlib.Path(folder).is_dir():
+        return 1, 'target folder is no folder', ['']
+
+    targets = [target_of(source, pathlib.Path(folder), fmt) for source in sources]
+    if len(set(targets)) < len(targets):
+        return 2, 'sources map to the same target', ['']
+
+    if any(target.is_file() for target in targets) or (merged and pathlib.Path(merged).is_file()):
+        return 1, 'target file exists', ['']
+
+    return 0, '', [command, sources, targets, merged, dryrun]
+
+
+def main(argv: Optional[List[str]] = None, options: Optional[pm.Options] = None) -> int:
+    """Drive the batch extraction."""
+    error, message, strings = verify_request(argv, options)
+    if error:
+        print(message, file=sys.stderr)
+        return error
+
+    command, sources, targets, merged, dryrun = strings
+    fmt = (options or {}).get('format', JSON)
+    summaries = (options or {}).get('summaries', False)
+    cache = (options or {}).get('cache', False)
+    jobs = min((options or {}).get('jobs', 1) or os.cpu_count() or 1, len(sources))
+
+    if dryrun:
+        print('dryrun requested\n# ---', file=sys.stderr)
+        print('* resources used:', file=sys.stderr)
+        print(f'  - eventlogs:        {len(sources)}', file=sys.stderr)
+        print(f'  - reports to:       "{targets[0].parent}"', file=sys.stderr)
+        merged_disp = 'NONE' if not merged else f'"{merged}"'
+        print(f'  - merged report:    {merged_disp}', file=sys.stderr)
+        print(f'  - jobs:             {jobs}', file=sys.stderr)
+        print(f'  - time differences: {"summaries" if summaries else "lists"}', file=sys.stderr)
+        print(f'  - format:           {fmt}', file=sys.stderr)
+        return 0
+
+    targets[0].parent.mkdir(parents=True, exist_ok=True)
+    settings = [itertools.repeat(value) for value in (fmt, summaries, cache, bool(merged))]
+    total = pm.Aggregate(summaries)
+    if jobs == 1:
+        for agg in map(extract_one, sources, targets, *settings):
+            if agg is not None:
+                total.merge(agg)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            for agg in pool.map(extract_one, sources, targets, *settings):
+                if agg is not None:
+                    total.merge(agg)
+
+    if merged:
+        write_report(total.sections(), pathlib.Path(merged), fmt)
+
+    return 0
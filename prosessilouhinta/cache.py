@@ -0,0 +1,182 @@
+"""On disk cache of parsed columnar eventlogs per input path, size, and modification time with LRU eviction."""
+
+import array
+import hashlib
+import io
+import json
+import os
+import pathlib
+import struct
+import sys
+import tempfile
+from typing import IO, Any, Optional
+
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.columnar import CODE_TYPE, OFFSET_TYPE, TS_TYPE, ColumnarEventLog
+from prosessilouhinta.compression import sniff
+from prosessilouhinta.mapped import MappedSource
+
+CACHE_ENV = 'PROSESSILOUHINTA_CACHE'
+LIMIT_BYTES = 1 << 30  # total size of the bundles kept in the cache folder
+SUFFIX = '.plc'
+MAGIC = b'PLC1'
+PREAMBLE = struct.Struct('<4sQ')  # the magic and the byte length of the JSON header
+HASH_CHUNK = 1 << 20
+COLUMNS = (
+    ('activity_codes', CODE_TYPE),
+    ('user_codes', CODE_TYPE),
+    ('timestamps', TS_TYPE),
+    ('offsets', OFFSET_TYPE),
+)
+
+Header = dict[str, Any]  # the stamp of the source (path, size, mtime_ns, digest) and the layout of the columns
+
+
+def default_folder() -> pathlib.Path:
+    """Determine the cache folder (environment variable, XDG cache home, or ~/.cache below)."""
+    if os.getenv(CACHE_ENV):
+        return pathlib.Path(os.environ[CACHE_ENV])
+    return pathlib.Path(os.getenv('XDG_CACHE_HOME') or pathlib.Path.home() / '.cache', 'prosessilouhinta')
+
+
+def source_key(path: pathlib.Path) -> str:
+    """Derive the name of the bundle from the resolved path of the file."""
+    return hashlib.blake2b(str(path.resolve()).encode(pm.ENCODING), digest_size=16).hexdigest()
+
+
+def stamp_of(path: pathlib.Path, content: Optional[str] = None) -> Header:
+    """Describe the file per resolved path, size, and modification time (and the content digest if known)."""
+    stat = path.stat()
+    return {'source': str(path.resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': content}
+
+
+def digest(path: pathlib.Path) -> str:
+    """Hash the content of the file."""
+    content = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK), b''):
+            content.update(chunk)
+    return content.hexdigest()
+
+
+def dump(log: ColumnarEventLog, stamp: Header) -> bytes:
+    """Pack the log into a bundle of the JSON header (stamp, dictionaries, column lengths) and the raw columns."""
+    buffer = io.BytesIO()
+    write(buffer, log, stamp)
+    return buffer.getvalue()
+
+
+def write(handle: IO[bytes], log: ColumnarEventLog, stamp: Header) -> None:
+    """Write the bundle of the log to the handle (the columns without intermediate copies)."""
+    header = {
+        **stamp,
+        'byteorder': sys.byteorder,
+        'cases': list(log.cases),
+        'activities': log.activities,
+        'users': log.users,
+        'columns': {name: len(getattr(log, name)) for name, _ in COLUMNS},
+    }
+    head = json.dumps(header).encode(pm.ENCODING)
+    handle.write(PREAMBLE.pack(MAGIC, len(head)))
+    handle.write(head)
+    for name, _ in COLUMNS:
+        getattr(log, name).tofile(handle)
+
+
+def header_of(data: bytes) -> Optional[tuple[Header, int]]:
+    """Read the header and the start of the columns from the bundle (None if the bundle is foreign or truncated)."""
+    if len(data) < PREAMBLE.size:
+        return None
+    magic, head_length = PREAMBLE.unpack_from(data)
+    start = PREAMBLE.size + head_length
+    if magic != MAGIC or len(data) < start:
+        return None
+    header: Header = json.loads(data[PREAMBLE.size : start])
+    if header.get('byteorder') != sys.byteorder:
+        return None
+    return header, start
+
+
+def load(data: bytes, header: Header, start: int) -> Optional[ColumnarEventLog]:
+    """Unpack the log from the columns of the bundle starting at start (None if the bundle is truncated)."""
+    log = ColumnarEventLog()
+    view = memoryview(data)
+    for name, typecode in COLUMNS:
+        column = array.array(typecode)
+        end = start + header['columns'][name] * column.itemsize
+        if len(data) < end:
+            return None
+        column.frombytes(view[start:end])
+        setattr(log, name, column)
+        start = end
+    log.cases = {caseid: k for k, caseid in enumerate(header['cases'])}
+    log.activities, log.users = header['activities'], header['users']
+    log.activity_code = {activity: k for k, activity in enumerate(log.activities)}
+    log.user_code = {user: k for k, user in enumerate(log.users)}
+    return log
+
+
+def evict(folder: pathlib.Path, limit: int) -> None:
+    """Remove the least recently used bundles until the bundles in the folder fit into limit bytes."""
+    bundles = []
+    for path in folder.glob(f'*{SUFFIX}'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:  # removed concurrently
+            continue
+        bundles.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in bundles)
+    for _, size, path in sorted(bundles):
+        if total <= limit:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def parse_cached(
+    path: pathlib.Path, folder: Optional[pathlib.Path] = None, limit: int = LIMIT_BYTES
+) -> ColumnarEventLog:
+    """Load the parsed columnar eventlog of the file from the cache or parse it and store the bundle.
+
+    A bundle is valid if the size and modification time of the file are unchanged, so hits read no source bytes.
+    Only if these changed the content is hashed and compared with the digest recorded in the bundle, and misses
+    record the digest, so touching an unchanged file costs wun hash but no parse.
+    Hits refresh the modification time of the bundle, which is the recency the eviction orders by.
+    """
+    folder = folder or default_folder()
+    bundle = folder / f'{source_key(path)}{SUFFIX}'
+    stamp = stamp_of(path)
+    try:
+        data = bundle.read_bytes()
+    except OSError:
+        data = b''
+    found = header_of(data)
+    if found is not None and found[0].get('source') == stamp['source']:
+        header, start = found
+        unchanged = (header.get('size'), header.get('mtime_ns')) == (stamp['size'], stamp['mtime_ns'])
+        if not unchanged:
+            stamp['digest'] = digest(path)
+        if unchanged or header.get('digest') == stamp['digest']:
+            log = load(data, header, start)
+            if log is not None:
+                if unchanged:
+                    os.utime(bundle)
+                else:
+                    store(folder, bundle, log, stamp, limit)
+                return log
+
+    stamp['digest'] = stamp['digest'] or digest(path)
+    log = ColumnarEventLog.from_events(pm.iter_events(path if sniff(path) else MappedSource(path)))
+    store(folder, bundle, log, stamp, limit)
+    return log
+
+
+def store(folder: pathlib.Path, bundle: pathlib.Path, log: ColumnarEventLog, stamp: Header, limit: int) -> None:
+    """Write the bundle of the log atomically (if it fits into limit bytes) and evict the least recently used."""
+    if sum(len(getattr(log, name)) * getattr(log, name).itemsize for name, _ in COLUMNS) > limit:
+        return
+    folder.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=folder, suffix='.tmp', delete=False) as handle:
+        write(handle, log, stamp)
+    os.replace(handle.name, bundle)
+    evict(folder, limit)
@@ -0,0 +1,122 @@
+"""Columnar dictionary encoded eventlog representation."""
+
+import array
+import datetime as dti
+from collections.abc import Iterable, Iterator, Mapping
+
+EPOCH = dti.datetime(1970, 1, 1)
+SECOND = dti.timedelta(seconds=1)
+CODE_TYPE = 'i'  # 32 bit signed integer codes for activities and users
+TS_TYPE = 'q'  # 64 bit signed integer epoch seconds
+OFFSET_TYPE = 'q'
+
+Event = tuple[str, str, str, dti.datetime]
+Trace = list[tuple[str, str, dti.datetime]]
+
+
+class ColumnarEventLog(Mapping[str, Trace]):
+    """Eventlog with interned activities and users, epoch second timestamps, and case offsets.
+
+    The events of the k-th case occupy the positions offsets[k] up to (excluding) offsets[k + 1] of the
+    activity_codes, user_codes, and timestamps columns.
+    Cases keep the order of their first appearance and events the source order within each case.
+    Reading a case through the mapping interface yields the same trace the eventlog map holds.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the empty log."""
+        self.cases: dict[str, int] = {}
+        self.activities: list[str] = []
+        self.users: list[str] = []
+        self.activity_code: dict[str, int] = {}
+        self.user_code: dict[str, int] = {}
+        self.activity_codes = array.array(CODE_TYPE)
+        self.user_codes = array.array(CODE_TYPE)
+        self.timestamps = array.array(TS_TYPE)
+        self.offsets = array.array(OFFSET_TYPE, [0])
+
+    @classmethod
+    def from_events(cls, events: Iterable[Event]) -> 'ColumnarEventLog':
+        """Build the log from events in source order (grouping the rows of interleaved cases)."""
+        log = cls()
+        cases, activity_code, user_code = log.cases, log.activity_code, log.user_code
+        activities, users = log.activities, log.users
+        acts, usrs, stamps = log.activity_codes, log.user_codes, log.timestamps
+        case_codes = array.array(CODE_TYPE)
+        contiguous, current = True, None
+        for caseid, activity, user, timestamp in events:
+            case = cases.get(caseid)
+            if case is None:
+                case = cases[caseid] = len(cases)
+            elif case != current:
+                contiguous = False
+            current = case
+            code = activity_code.get(activity)
+            if code is None:
+                code = activity_code[activity] = len(activities)
+                activities.append(activity)
+            acts.append(code)
+            code = user_code.get(user)
+            if code is None:
+                code = user_code[user] = len(users)
+                users.append(user)
+            usrs.append(code)
+            stamps.append((timestamp - EPOCH) // SECOND)
+            case_codes.append(case)
+
+        counts = [0] * len(cases)
+        for case in case_codes:
+            counts[case] += 1
+        offsets = log.offsets
+        for count in counts:
+            offsets.append(offsets[-1] + count)
+
+        if not contiguous:
+            slots = list(offsets[:-1])
+            order = [0] * len(case_codes)
+            for position, case in enumerate(case_codes):
+                order[slots[case]] = position
+                slots[case] += 1
+            log.activity_codes = array.array(CODE_TYPE, (acts[i] for i in order))
+            log.user_codes = array.array(CODE_TYPE, (usrs[i] for i in order))
+            log.timestamps = array.array(TS_TYPE, (stamps[i] for i in order))
+
+        return log
+
+    def __getitem__(self, caseid: str) -> Trace:
+        """Decode the trace of the case."""
+        return self.trace(self.cases[caseid])
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the case ids in order of first appearance."""
+        return iter(self.cases)
+
+    def __len__(self) -> int:
+        """Count the cases."""
+        return len(self.cases)
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}(cases={len(self.cases)}, events={len(self.timestamps)},'
+            f' activities={len(self.activities)}, users={len(self.users)})'
+        )
+
+    def trace(self, case: int) -> Trace:
+        """Decode the trace of the k-th case."""
+        activities, users = self.activities, self.users
+        acts, usrs, stamps = self.activity_codes, self.user_codes, self.timestamps
+        return [
+            (activities[acts[i]], users[usrs[i]], EPOCH + dti.timedelta(seconds=stamps[i]))
+            for i in range(self.offsets[case], self.offsets[case + 1])
+        ]
+
+    def events(self) -> Iterator[Event]:
+        """Decode all events as (caseid, activity, user, timestamp) tuples in case order."""
+        for k, caseid in enumerate(self.cases):
+            for activity, user, timestamp in self.trace(k):
+                yield caseid, activity, user, timestamp
+
+    @property
+    def event_count(self) -> int:
+        """Count the events."""
+        return len(self.timestamps)
@@ -0,0 +1,270 @@
+"""Commands of the commandline API for prosessilouhnita (loaded by the gateway only when a command needs them)."""
+
+import sys
+from typing import Optional
+
+import typer
+
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.cli import version_text
+
+app = typer.Typer(
+    add_completion=False,
+    context_settings={'help_option_names': ['-h', '--help']},
+    no_args_is_help=True,
+)
+
+
+@app.callback(invoke_without_command=True)
+def callback(
+    version: bool = typer.Option(
+        False,
+        '-V',
+        '--version',
+        help='Display the prosessilouhinta version and exit',
+        is_eager=True,
+    )
+) -> None:
+    """
+    Process mining (Finnish prosessilouhinta) from eventlogs.
+    """
+    if version:
+        typer.echo(version_text())
+        raise typer.Exit()
+
+
+@app.command('extract')
+def extract(
+    source: str = typer.Argument(pm.STDIN),
+    target: str = typer.Argument(pm.STDOUT),
+    inp: str = typer.Option(
+        '',
+        '-i',
+        '--input',
+        help='Path to input eventlog file (default is reading from standard in)',
+        metavar='<sourcepath>',
+    ),
+    out: str = typer.Option(
+        '',
+        '-o',
+        '--output',
+        help='Path to non-existing output report file (default is writing to standard out)',
+        metavar='<targetpath>',
+    ),
+    dry: bool = typer.Option(
+        False,
+        '-n',
+        '--dryrun',
+        help='Flag to execute without writing the extraction but a summary instead (default is False)',
+        metavar='bool',
+    ),
+    backend: str = typer.Option(
+        pm.PYTHON,
+        '-b',
+        '--backend',
+        help=f'Compute engine for the metrics, one of ({", ".join(pm.BACKENDS)}) (default is {pm.PYTHON})',
+        metavar='<backend>',
+    ),
+    jobs: int = typer.Option(
+        1,
+        '-j',
+        '--jobs',
+        help=(
+            'Number of worker processes extracting shards of at least 8 MiB of an input file in parallel'
+            ' (default is 1, smaller files and machines with one CPU are extracted sequentially)'
+        ),
+        metavar='<count>',
+    ),
+    incremental: bool = typer.Option(
+        False,
+        '-a',
+        '--incremental',
+        help='Flag to only extract lines appended since the last run per state persisted next to the report',
+        metavar='bool',
+    ),
+    summaries: Optional[bool] = typer.Option(
+        None,
+        '-s',
+        '--summaries/--lists',
+        help=(
+            'Flag to report bounded memory statistics per transition instead of all time differences'
+            ' (default is lists, but summaries for incremental extraction so the state does not keep every duration)'
+        ),
+        show_default=False,
+    ),
+    external: bool = typer.Option(
+        False,
+        '-e',
+        '--external-sort',
+        help='Flag to sort the events per case and timestamp in spilled runs (for unordered or huge eventlogs)',
+        metavar='bool',
+    ),
+    fmt: str = typer.Option(
+        pm.JSON,
+        '-f',
+        '--format',
+        help=f'Format of the report, one of ({", ".join(pm.FORMATS)}) (default is {pm.JSON})',
+        metavar='<format>',
+    ),
+    variants: int = typer.Option(
+        0,
+        '-t',
+        '--top-variants',
+        help='Number of most frequent trace variants to report with their throughput times (default is 0 for none)',
+        metavar='<count>',
+    ),
+    cache: bool = typer.Option(
+        False,
+        '-c',
+        '--cache',
+        help='Flag to load and store the parsed eventlog in the on disk parse cache (default is False)',
+        metavar='bool',
+    ),
+    profile: bool = typer.Option(
+        False,
+        '-p',
+        '--profile',
+        help=f'Flag to report wall time, CPU time, rows per second, and memory peak per stage (or set {pm.DEBUG_VAR})',
+        metavar='bool',
+    ),
+    profile_output: str = typer.Option(
+        '',
+        '--profile-output',
+        help='Path to the JSON timing report file (implies --profile, default is writing to standard error)',
+        metavar='<targetpath>',
+    ),
+) -> int:
+    """
+    Translate from a language to a 'langauge'.
+    """
+    command = 'extract'
+    incoming = inp if inp else (source if source != pm.STDIN else '')
+    outgoing = out if out else (target if target != pm.STDOUT else '')
+    dryrun = 'DRYRUN' if dry else ''
+    action = [command, incoming, outgoing, dryrun]
+    options = {
+        'backend': backend,
+        'jobs': jobs,
+        'incremental': incremental,
+        'summaries': summaries,
+        'format': fmt,
+        'external': external,
+        'variants': variants,
+        'cache': cache,
+        'profile': profile,
+        'profile_output': profile_output,
+    }
+    return sys.exit(pm.main(action, options))
+
+
+@app.command('batch')
+def batch(
+    sources: str = typer.Argument(
+        ..., help='Glob pattern of input eventlog files or @manifest listing one eventlog path per line'
+    ),
+    folder: str = typer.Argument(..., help='Path to the folder receiving one report per eventlog'),
+    merged: str = typer.Option(
+        '',
+        '-m',
+        '--merged',
+        help='Path to non-existing report file merged across all eventlogs (default is no merged report)',
+        metavar='<targetpath>',
+    ),
+    dry: bool = typer.Option(
+        False,
+        '-n',
+        '--dryrun',
+        help='Flag to execute without writing the extraction but a summary instead (default is False)',
+        metavar='bool',
+    ),
+    jobs: int = typer.Option(
+        0,
+        '-j',
+        '--jobs',
+        help='Number of worker processes extracting eventlogs concurrently (default is 0 for all CPUs)',
+        metavar='<count>',
+    ),
+    summaries: bool = typer.Option(
+        False,
+        '-s',
+        '--summaries',
+        help='Flag to report bounded memory statistics per transition instead of all time differences',
+        metavar='bool',
+    ),
+    fmt: str = typer.Option(
+        pm.JSON,
+        '-f',
+        '--format',
+        help=f'Format of the reports, one of ({", ".join(pm.FORMATS)}) (default is {pm.JSON})',
+        metavar='<format>',
+    ),
+    cache: bool = typer.Option(
+        False,
+        '-c',
+        '--cache',
+        help='Flag to load and store the parsed eventlogs in the on disk parse cache (default is False)',
+        metavar='bool',
+    ),
+) -> int:
+    """
+    Extract one report per eventlog of many eventlogs concurrently (optionally merged into one more report).
+    """
+    from prosessilouhinta.batch import main as batch_main
+
+    action = ['batch', sources, folder, merged, 'DRYRUN' if dry else '']
+    options = {
+        'jobs': jobs,
+        'summaries': summaries,
+        'format': fmt,
+        'cache': cache,
+    }
+    return sys.exit(batch_main(action, options))
+
+
+@app.command('cpa')
+def cpa_dia(
+    source: str = typer.Argument(pm.STDIN),
+    inp: str = typer.Option(
+        '',
+        '-i',
+        '--input',
+        help='Path to input eventlog file (default is reading from standard in)',
+        metavar='<sourcepath>',
+    ),
+    profile: bool = typer.Option(
+        False,
+        '-p',
+        '--profile',
+        help=f'Flag to report wall time, CPU time, rows per second, and memory peak per stage (or set {pm.DEBUG_VAR})',
+        metavar='bool',
+    ),
+    profile_output: str = typer.Option(
+        '',
+        '--profile-output',
+        help='Path to the JSON timing report file (implies --profile, default is writing to standard error)',
+        metavar='<targetpath>',
+    ),
+) -> int:
+    """
+    Apply Critical Path Analysis (CPA) on input and produce activity-on-nodes diagram for critical path.
+    """
+    command = 'cpa'
+    incoming = inp if inp else (source if source != pm.STDIN else '')
+    if not incoming:
+        print('No file path given to load the activities and dependencies from')
+        return sys.exit(2)
+
+    action = [command, incoming]
+    options = {
+        'profile': profile,
+        'profile_output': profile_output,
+    }
+    return sys.exit(pm.cpa_dia(action, options))
+
+
+@app.command('version')
+def app_version() -> None:
+    """
+    Display the prosessilouhinta  version and exit
+    """
+    callback(True)
@@ -0,0 +1,107 @@
+"""Detection of compressed eventlog files and streaming decompression in a background thread."""
+
+import pathlib
+from collections.abc import Iterator
+from typing import IO, Optional, Union
+
+ENCODING = 'utf-8'
+GZIP, BZIP2, XZ, ZSTD = 'gzip', 'bzip2', 'xz', 'zstd'
+MAGICS = (
+    (b'\x1f\x8b', GZIP),
+    *((b'BZh%d' % level, BZIP2) for level in range(1, 10)),  # the block size digit completes the magic
+    (b'\xfd7zXZ\x00', XZ),
+    (b'\x28\xb5\x2f\xfd', ZSTD),
+)
+CHUNK_CHARS = 1 << 20  # decompressed text handed over per queue item
+QUEUE_CHUNKS = 8  # bounds the decompressed text buffered ahead of the parser
+POLL_SECONDS = 0.1
+
+
+def sniff(path: pathlib.Path) -> Optional[str]:
+    """Detect the compression of the file per magic bytes (None for uncompressed files)."""
+    with open(path, 'rb') as handle:
+        head = handle.read(6)
+    for magic, kind in MAGICS:
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def zstd_available() -> bool:
+    """Determine if zstd compressed files can be read (requires the optional zstandard package)."""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def open_text(path: pathlib.Path, kind: str) -> IO[str]:
+    """Open the compressed file for reading decoded text lines (importing only the codec needed)."""
+    if kind == GZIP:
+        import gzip
+
+        return gzip.open(path, 'rt', encoding=ENCODING)
+    if kind == BZIP2:
+        import bz2
+
+        return bz2.open(path, 'rt', encoding=ENCODING)
+    if kind == XZ:
+        import lzma
+
+        return lzma.open(path, 'rt', encoding=ENCODING)
+    if kind == ZSTD:
+        import io
+
+        import zstandard
+
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(raw, encoding=ENCODING)
+    raise ValueError(f'unknown compression {kind}')
+
+
+def decompressed_lines(path: pathlib.Path, kind: str) -> Iterator[str]:
+    """Generate the lines of the compressed file decompressed ahead in a background thread.
+
+    The thread hands over chunks of complete lines through a bounded queue, so decompression (which releases
+    the GIL in the standard library codecs) overlaps with the parsing of the previous chunks.
+    """
+    import queue
+    import threading
+
+    chunks: queue.Queue[Union[list[str], BaseException, None]] = queue.Queue(maxsize=QUEUE_CHUNKS)
+    stop = threading.Event()
+
+    def hand_over(item: Union[list[str], BaseException, None]) -> bool:
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def pump() -> None:
+        try:
+            with open_text(path, kind) as handle:
+                while not stop.is_set():
+                    chunk = handle.readlines(CHUNK_CHARS)
+                    if not chunk or not hand_over(chunk):
+                        break
+        except BaseException as error:  # handed to the consumer and raised there
+            hand_over(error)
+        hand_over(None)
+
+    worker = threading.Thread(target=pump, name=f'decompress-{path.name}', daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is None:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield from item
+    finally:
+        stop.set()
+        worker.join()
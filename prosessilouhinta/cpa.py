@@ -1,12 +1,17 @@
 """Naive Critical Path Analysis (CPA) implementation."""
 
+import heapq
+import itertools
 import json
+import operator
 import pathlib
+from collections.abc import Iterator
 from typing import no_type_check  # Self when 3.11 is lowest bound
 
 ActOnNodeMap = dict[str, str | int | float | None]
 ActOnNodeTup = tuple[str, str, str, str, str, str, str, str, str]
 ENCODING = 'utf-8'
+NOTHING = float('-inf')  # the length of no path
 
 
 @no_type_check
@@ -46,6 +51,86 @@ def cyclic(digraph) -> bool:
     return False
 
 
+@no_type_check
+def read_network(file_path: str, name: str) -> dict:
+    """Read the network from JSON file with matching top level name value."""
+    if not file_path.strip():
+        raise ValueError('cannot load from empty file path string')
+    fp = pathlib.Path(file_path)
+    if not fp.is_file():
+        raise ValueError('cannot load from non existing file')
+    if not fp.stat().st_size:
+        raise ValueError('cannot load from empty file')
+    with open(fp, 'rt', encoding=ENCODING) as handle:
+        network = json.load(handle)
+    if not network:
+        raise ValueError('cannot load from empty network')
+    found = network.get('name', 'not-existing-name-key')
+    if found != name:
+        raise ValueError(f'cannot load network with name ({found}) into ({name})')
+    return network
+
+
+@no_type_check
+def network_edges(network: dict, known: dict) -> Iterator[tuple[str, str]]:
+    """Generate the directed edges of the network failing on edges with nodes not known."""
+    for edge in network.get('edges', []):
+        if len(edge) < 2:
+            if not edge:
+                raise ValueError('cannot build an empty edge')
+            raise ValueError(f'cannot build directed edge from ({edge[0]}) without a target')
+        if len(edge) == 2:
+            if any(edg not in known for edg in edge):
+                raise ValueError(f'cannot build edge with nodes not in {known}')
+            yield edge[0], edge[1]
+        else:
+            raise NotImplementedError('Compressed edges notation not yet implemented.')
+
+
+class AvoidingPaths:
+    """Longest paths avoiding the positions of a topological order as a segment tree of heaps (stabbing maximum).
+
+    Every path is recorded with its length under a key per the open interval of positions it jumps over.
+    Recording a key again replaces its path lazily, so outdated entries are dropped wunce they surface in a query.
+    """
+
+    def __init__(self, count: int) -> None:
+        """Initialize the empty index for count positions."""
+        self.size = 1 << max(count - 1, 0).bit_length()
+        self.segments: list[list[tuple[int | float, int, object]]] = [[] for _ in range(2 * self.size)]
+        self.current: dict[object, int] = {}  # per key the serial of its valid entries
+        self.serials = itertools.count()
+        self.outdated = 0  # number of keys recorded again since the build
+
+    def record(self, key: object, length: int | float, lower: int, upper: int) -> None:
+        """Record the path key of length avoiding the positions strictly between lower and upper."""
+        if key in self.current:
+            self.outdated += 1
+        serial = self.current[key] = next(self.serials)
+        entry, segments = (-length, serial, key), self.segments
+        lower, upper = lower + 1 + self.size, upper + self.size
+        while lower < upper:
+            if lower & 1:
+                heapq.heappush(segments[lower], entry)
+                lower += 1
+            if upper & 1:
+                upper -= 1
+                heapq.heappush(segments[upper], entry)
+            lower, upper = lower >> 1, upper >> 1
+
+    def longest(self, position: int) -> int | float:
+        """Provide the length of the longest path avoiding the position (NOTHING if none)."""
+        best, index, current = NOTHING, position + self.size, self.current
+        while index:
+            heap = self.segments[index]
+            while heap and current.get(heap[0][2]) != heap[0][1]:
+                heapq.heappop(heap)
+            if heap:
+                best = max(best, -heap[0][0])
+            index >>= 1
+        return best
+
+
 @no_type_check
 class Node:
     """Represents a task with linked nodes in an act precedence network."""
@@ -58,7 +143,7 @@ class Node:
         self.description: str | None = None
         self.duration: float | None = duration  # model.DUR in agreed time units
         self.lag: int | float | None = lag  # preceding.finished plus in agreed time units
-        self.drag: int | float | None = None  # model.DRAG in agreed time units
+        self._drag: int | float | None = None  # model.DRAG in agreed time units
         self._es: int | float | None = None  # model.ES
         self.ef: int | float | None = None  # model.EF
         self.ls: int | float | None = None  # model.LS
@@ -66,12 +151,22 @@ class Node:
         self._free_float: int | float | None = None  # act can delay without change start of any other act
         self._total_float: int | float | None = None  # act can delay without increase of overall project dur
         self.nodes: list[Node] = []
+        self.order: list[Node] = []  # the child nodes in topological order maintained per link
+        self.position: int | None = None  # index in the topological order of the parent
+        self.rank: int | None = None  # index in the order of addition to the parent
+        self.length: int | float | None = None  # longest path (sum of durations) from the start of the node
+        self.reach: int | float | None = None  # longest path (sum of durations) up to the finish of the node
+        self.next_node: Node | None = None  # successor along the longest path from the node
         self.name_to_node: dict[str, Node] = {}
         self.to_nodes: set[Node] = set()
         self.incoming_nodes: set[Node] = set()
         self.forward_pending: set[Node] = set()
         self.backward_pending: list[Node] = []
         self._critical_path = None
+        self._starts: list[tuple[int | float, int]] = []  # heap of (-length, rank) of the first child nodes
+        self._scheduled = False  # all timings are up to date (after update_all and the incremental updates)
+        self._drag_pending: bool = False  # the drag is queried per node (after incremental updates)
+        self._avoiding: AvoidingPaths | None = None  # index for the drag queries (maintained per propagate)
         self.exit_node: Node | None = None
 
     @no_type_check
@@ -97,6 +192,26 @@ class Node:
         if self.parent:
             self.parent.forward_pending.add(self)
 
+    @property
+    def drag(self) -> int | float | None:
+        parent = self.parent
+        if parent is not None and parent._drag_pending:
+            drag: int | float = parent.drag_of(self)
+            return drag
+        return self._drag
+
+    @drag.setter
+    def drag(self, v: int | float | None) -> None:
+        self._drag = v
+
+    @property
+    def total_float(self) -> int | float | None:
+        return self._total_float
+
+    @property
+    def free_float(self) -> int | float | None:
+        return self._free_float
+
     def __repr__(self) -> str:
         return str(self.name)
 
@@ -120,18 +235,23 @@ class Node:
             raise ValueError(f'tried to add non-Node instance {type(node).__name__}')
         if node.duration is None:
             raise ValueError('unspecified duration')
-        if node in self.nodes:
+        if node.name in self.name_to_node:
             return
+        node.rank = len(self.nodes)
         self.nodes.append(node)
         self.name_to_node[node.name] = node
         node.parent = self
+        node.position = len(self.order)
+        self.order.append(node)
         self.forward_pending.add(node)
         self._critical_path = None
+        self._avoiding = None
+        self._scheduled = False
         return node
 
     @no_type_check
     def link(self, from_node, to_node=None) -> 'Node':
-        """Directed link of two child nodes in the graph."""
+        """Directed link of two child nodes in the graph (rejecting links that would close a cycle)."""
         if not isinstance(from_node, Node):
             from_node = self.name_to_node[from_node]
         if not isinstance(from_node, Node):
@@ -141,46 +261,107 @@ class Node:
                 to_node = self.name_to_node[to_node]
             if not isinstance(to_node, Node):
                 raise ValueError(f'tried to link to non-Node instance {type(to_node).__name__}')
+            if from_node.parent is self and to_node.parent is self and to_node.position <= from_node.position:
+                self.reorder(from_node, to_node)
             from_node.to_nodes.add(to_node)
             to_node.incoming_nodes.add(from_node)
         else:
             self.to_nodes.add(from_node)
             from_node.incoming_nodes.add(self)
+        self._critical_path = None
+        self._avoiding = None
+        self._scheduled = False
+        return self
+
+    @no_type_check
+    def unlink(self, from_node, to_node) -> 'Node':
+        """Remove the directed link of two child nodes in the graph (the topological order stays valid)."""
+        if not isinstance(from_node, Node):
+            from_node = self.name_to_node[from_node]
+        if not isinstance(to_node, Node):
+            to_node = self.name_to_node[to_node]
+        from_node.to_nodes.discard(to_node)
+        to_node.incoming_nodes.discard(from_node)
+        self._critical_path = None
+        self._avoiding = None
+        self._scheduled = False
         return self
 
+    @no_type_check
+    def reorder(self, from_node, to_node) -> None:
+        """Restore the topological order for a new link against it or raise if the link would close a cycle.
+
+        Per Pearce and Kelly only the nodes positioned between the two ends are visited: the descendants of to_node
+        before from_node and the ancestors of from_node after to_node swap their positions among themselves.
+        """
+        if to_node is from_node:
+            raise ValueError(f'cannot link ({from_node}) to itself without closing a cycle')
+        lower, upper = to_node.position, from_node.position
+        forward, seen, stack = [], {to_node}, [to_node]
+        while stack:
+            node = stack.pop()
+            forward.append(node)
+            for successor in node.to_nodes:
+                if successor is from_node:
+                    raise ValueError(f'cannot link ({from_node}) to ({to_node}) without closing a cycle')
+                if successor.parent is self and successor.position < upper and successor not in seen:
+                    seen.add(successor)
+                    stack.append(successor)
+        backward, seen, stack = [], {from_node}, [from_node]
+        while stack:
+            node = stack.pop()
+            backward.append(node)
+            for predecessor in node.incoming_nodes:
+                if predecessor.parent is self and predecessor.position > lower and predecessor not in seen:
+                    seen.add(predecessor)
+                    stack.append(predecessor)
+        moved = sorted(backward, key=operator.attrgetter('position')) + sorted(
+            forward, key=operator.attrgetter('position')
+        )
+        for node, position in zip(moved, sorted(node.position for node in moved)):
+            node.position = position
+            self.order[position] = node
+
+    @no_type_check
+    def restore_order(self) -> None:
+        """Recompute the topological order of all child nodes from scratch (Kahn, ties in order of addition).
+
+        Bulk loads link without maintaining the order and restore it wunce in O(V+E) instead.
+        """
+        rank = {node: k for k, node in enumerate(self.nodes)}
+        pending = dict.fromkeys(self.nodes, 0)
+        for node in self.nodes:
+            for to_node in node.to_nodes:
+                pending[to_node] += 1
+        ready = [node for node in reversed(self.nodes) if not pending[node]]
+        order = []
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for to_node in sorted(node.to_nodes, key=rank.__getitem__, reverse=True):
+                pending[to_node] -= 1
+                if not pending[to_node]:
+                    ready.append(to_node)
+        if len(order) < len(self.nodes):
+            raise TypeError('Network contains cycles')
+        for position, node in enumerate(order):
+            node.position = position
+        self.order = order
+
     @no_type_check
     def load_network(self, file_path: str) -> None:
         """Load the network from JSON file with matching top level name value."""
-        if not file_path.strip():
-            raise ValueError('cannot load from empty file path string')
-        fp = pathlib.Path(file_path)
-        if not fp.is_file():
-            raise ValueError('cannot load from non existing file')
-        if not fp.stat().st_size:
-            raise ValueError('cannot load from empty file')
-        with open(fp, 'rt', encoding=ENCODING) as handle:
-            network = json.load(handle)
-        if not network:
-            raise ValueError('cannot load from empty network')
-        name = network.get('name', 'not-existing-name-key')
-        if name != self.name:
-            raise ValueError(f'cannot load network with name ({name}) into ({self.name})')
+        network = read_network(file_path, self.name)
         x_nodes = {}
         for x_key, x_node in network.get('nodes', {}).items():
             duration = x_node.get('duration', None)
             lag = x_node.get('lag', 0)
             x_nodes[x_key] = self.add(Node(x_key, duration=duration, lag=lag))
-        for edge in network.get('edges', []):
-            if len(edge) < 2:
-                if not edge:
-                    raise ValueError('cannot build an empty edge')
-                raise ValueError(f'cannot build directed edge from ({edge[0]}) without a target')
-            if len(edge) == 2:
-                if any(edg not in x_nodes for edg in edge):
-                    raise ValueError(f'cannot build edge with nodes not in {x_nodes}')
-                self.link(x_nodes[edge[0]], x_nodes[edge[1]])
-            else:
-                raise NotImplementedError('Compressed edges notation not yet implemented.')
+        for from_key, to_key in network_edges(network, x_nodes):
+            from_node, to_node = x_nodes[from_key], x_nodes[to_key]
+            from_node.to_nodes.add(to_node)  # the order is restored wunce for all edges below
+            to_node.incoming_nodes.add(from_node)
+        self.restore_order()
         self.update_all()
 
     @property
@@ -200,36 +381,33 @@ class Node:
 
     @no_type_check
     def update_forward(self) -> None:
-        """Updates forward timing calculations for the current node assuming min(es) is set."""
-        changed = False
-        if self.es is not None and self.duration is not None:
-            self.ef = self.es + self.duration
-            changed = True
-
-        if changed:
-            for to_node in self.to_nodes:
-                if to_node == self:
-                    continue
-                add_some_lag = self.ef + to_node.lag
-                to_node.es = add_some_lag if to_node.es is None else max(to_node.es, add_some_lag)
-
-                if self.parent:
-                    self.parent.forward_pending.add(to_node)
-
-            if self.parent:
-                self.parent.backward_pending.append(self)
+        """Updates forward timing calculations for the current node assuming all predecessors are up to date."""
+        parent = self.parent
+        predecessors = [node for node in self.incoming_nodes if node is not parent]
+        finishes = [node.ef + self.lag for node in predecessors]
+        self._es = max(finishes) if finishes else (parent.lag if parent else 0) + self.lag
+        self.ef = self._es + self.duration
+        self.reach = self.duration + max((node.reach for node in predecessors), default=0)
 
     @no_type_check
     def update_backward(self) -> None:
-        """Updates backward timing calculations for the current node."""
+        """Updates backward timing calculations for the current node assuming all successors are up to date."""
+        self.lf = min(target.ls for target in self.to_nodes) if self.to_nodes else self.ef
         if self.lf is None:
-            if self.to_nodes:
-                self.lf = min(target.ls for target in self.to_nodes)
-            else:
-                self.lf = self.ef
-            if self.lf is None:
-                raise ValueError('No latest finish time found')
+            raise ValueError('No latest finish time found')
         self.ls = self.lf - self.duration
+        self._total_float = self.ls - self._es
+        next_start = min(target.es - target.lag for target in self.to_nodes) if self.to_nodes else self.lf
+        self._free_float = next_start - self.ef
+
+    @no_type_check
+    def update_length(self) -> None:
+        """Updates the longest path from the start of the current node assuming all successors are up to date.
+
+        Among equally long continuations the successor added first wins.
+        """
+        self.next_node = max(self.to_nodes, key=lambda target: (target.length, -target.rank), default=None)
+        self.length = self.duration + (self.next_node.length if self.next_node is not None else 0)
 
     @no_type_check
     def add_exit(self) -> None:
@@ -245,66 +423,262 @@ class Node:
 
     @no_type_check
     def update_all(self) -> None:
-        """Updates timing calculations for all children nodes."""
-        if not self.is_acyclic():
-            raise TypeError('Network contains cycles')
+        """Updates timing calculations for all children nodes.
 
-        for node in list(self.forward_pending.intersection(self.first_nodes)):
-            node.es = self.lag + node.lag
+        A single forward sweep in topological order sets ES and EF of every node from its predecessors
+        and a single backward sweep in reverse order sets LF and LS from the successors (O(V+E)).
+        """
+        order = self.topological_order()
+        for node in order:
             node.update_forward()
-            self.forward_pending.remove(node)
-
-        forward_priors = set()
-        while self.forward_pending:
-            q = set(self.forward_pending)
-            self.forward_pending.clear()
-            while q:
-                node = q.pop()
-                if node in forward_priors:
-                    continue
-                node.update_forward()
-
-        backward_priors = set()
-        while self.backward_pending:
-            node = self.backward_pending.pop()
-            if node in backward_priors:
-                continue
+        for node in reversed(order):
             node.update_backward()
+        self.forward_pending.clear()
+        self.backward_pending.clear()
 
-        duration, path, priors = self.get_critical_path(as_item=True)
-        self._critical_path = duration, path, priors
+        duration, path, critical = self._critical_path = self.longest_path(order)
+        self.duration = duration
+        self.es = path[0].es
+        self.ls = path[0].ls
+        self.ef = path[-1].ef
+        self.lf = path[-1].lf
+        self.update_drag(order, path)
+        self._avoiding = None
+        self._scheduled = True
+        self._drag_pending = False
+
+    @no_type_check
+    def update_activity(self, node, duration=None, lag=None) -> None:
+        """Change the duration and or the lag of a child node and update the timings incrementally."""
+        if not isinstance(node, Node):
+            node = self.name_to_node[node]
+        if duration is not None:
+            node.duration = duration
+        if lag is not None:
+            node.lag = lag
+        if not self._scheduled:
+            return self.update_all()
+        self.propagate((node,), (node,))
+
+    @no_type_check
+    def update_link(self, from_node, to_node, linked: bool = True) -> None:
+        """Link (or unlink) two child nodes and update the timings incrementally."""
+        if not isinstance(from_node, Node):
+            from_node = self.name_to_node[from_node]
+        if not isinstance(to_node, Node):
+            to_node = self.name_to_node[to_node]
+        scheduled = self._scheduled
+        if linked:
+            self.link(from_node, to_node)
+        else:
+            self.unlink(from_node, to_node)
+        if not scheduled:
+            return self.update_all()
+        self.propagate((to_node,), (from_node, to_node))
+
+    @no_type_check
+    def propagate(self, forward, backward) -> None:
+        """Updates the timings after changes of the given child nodes visiting only the affected cones.
+
+        The forward pass updates ES, EF, and the reach from the forward nodes downstream in increasing position and
+        stops at nodes whose EF and reach did not change. The backward pass updates LF, LS, the floats, and the longest
+        paths from the backward nodes, the nodes with changed ES or EF, and their predecessors upstream in decreasing
+        position and stops at nodes whose LS and longest path did not change.
+        The critical path is kept up to the first of its nodes with a changed successor along the longest path and
+        only the paths avoiding nodes that start or end in the cones are recorded again for the drag queries.
+        """
+        queued = {node.position: node for node in forward}
+        heap = list(queued)
+        heapq.heapify(heap)
+        moved, touched = [], set(forward)
+        while heap:
+            node = queued.pop(heapq.heappop(heap))
+            es, ef, reach = node.es, node.ef, node.reach
+            node.update_forward()
+            if node.es != es or node.ef != ef:
+                moved.append(node)
+            if node.reach != reach:
+                touched.add(node)
+            if node.ef != ef or node.reach != reach:
+                for target in node.to_nodes:
+                    if target.position not in queued:
+                        queued[target.position] = target
+                        heapq.heappush(heap, target.position)
+
+        seeds, rerouted = set(backward), set()
+        for node in (*backward, *moved):
+            queued[node.position] = node
+            for predecessor in node.incoming_nodes:
+                if predecessor is not self:
+                    queued[predecessor.position] = predecessor
+        heap = [-position for position in queued]
+        heapq.heapify(heap)
+        while heap:
+            node = queued.pop(-heapq.heappop(heap))
+            ls, length, next_node = node.ls, node.length, node.next_node
+            node.update_backward()
+            node.update_length()
+            first = all(predecessor is self for predecessor in node.incoming_nodes)
+            if first and (node.length != length or node in seeds):
+                heapq.heappush(self._starts, (-node.length, node.rank))
+            if node.length != length:
+                touched.add(node)
+            if node.next_node is not next_node:
+                rerouted.add(node)
+            if node.ls != ls or node.length != length:
+                for predecessor in node.incoming_nodes:
+                    if predecessor is not self and predecessor.position not in queued:
+                        queued[predecessor.position] = predecessor
+                        heapq.heappush(heap, -predecessor.position)
+        if len(self._starts) > 2 * len(self.nodes):  # mostly outdated entries, rebuilt in amortized O(1 + E/V)
+            self.rebuild_starts()
+
+        duration, path, critical = self._critical_path = self.path_from(self.first_of_longest(), rerouted)
         self.duration = duration
         self.es = path[0].es
         self.ls = path[0].ls
         self.ef = path[-1].ef
         self.lf = path[-1].lf
+        self._scheduled = True
+        self._drag_pending = True
+        if self._avoiding is not None:
+            self.record_avoiding(touched)
+
+    @no_type_check
+    def first_of_longest(self):
+        """Provide the first child node starting the longest path (dropping outdated entries of the heap)."""
+        starts = self._starts
+        while starts:
+            length, rank = starts[0]
+            node = self.nodes[rank]
+            if node.length == -length and all(predecessor is self for predecessor in node.incoming_nodes):
+                return node
+            heapq.heappop(starts)
+
+    @no_type_check
+    def update_drag(self, order, path) -> None:
+        """Updates the drag of all children nodes given the topological order and the critical path.
+
+        The drag of a critical node is its duration, capped by the gap between the length of the critical path and
+        the longest path avoiding the node. Paths run in increasing position, so the paths avoiding the node at position
+        k end before k, start after k, or use wun of the links jumping over k. A single sweep over the positions with
+        a heap of the jumping links provides all these maxima (O((V+E) log E)). All other nodes have no drag.
+        """
+        count = len(order)
+        after = [NOTHING] * (count + 1)  # per position the longest of the paths starting there or later
+        following = [count] * (count + 1)  # per position the next critical position after it
+        critical = {node.position for node in path}
+        for position in range(count - 1, -1, -1):
+            node = order[position]
+            first = all(predecessor is self for predecessor in node.incoming_nodes)
+            after[position] = max(after[position + 1], node.length if first else NOTHING)
+            following[position] = position + 1 if position + 1 in critical else following[position + 1]
+        longest, before, jumps = path[0].length, NOTHING, []
+        for position, node in enumerate(order):
+            node.drag = 0
+            if position in critical:
+                while jumps and jumps[0][1] <= position:
+                    heapq.heappop(jumps)
+                avoiding = max(before, after[position + 1], -jumps[0][0] if jumps else NOTHING)
+                node.drag = min(node.duration, longest - avoiding)
+            before = max(before, node.reach)
+            for target in node.to_nodes:
+                if target.position > following[position]:  # only links jumping over a critical node matter
+                    heapq.heappush(jumps, (-(node.reach + target.length), target.position))
+
+    @no_type_check
+    def drag_of(self, node) -> int | float:
+        """Provide the drag of the child node per the longest path avoiding it (the index is built on first use)."""
+        duration, _, critical = self.get_critical_path(as_item=True)
+        if node not in critical:
+            return 0
+        if self._avoiding is None:
+            self._avoiding = AvoidingPaths(len(self.order))
+            self.record_avoiding(self.order)
+        return min(node.duration, duration - self._avoiding.longest(node.position))
+
+    @no_type_check
+    def record_avoiding(self, nodes) -> None:
+        """Record the paths avoiding positions that end with, start at, or use a link of the given child nodes.
+
+        As in update_drag the paths ending with a node avoid all later positions, the paths starting at a first node
+        all earlier positions, and the paths using a link the positions the link jumps over.
+        """
+        avoiding, count = self._avoiding, len(self.order)
+        if avoiding.outdated > len(avoiding.current):  # mostly outdated entries, rebuilt in amortized O(log V)
+            avoiding = self._avoiding = AvoidingPaths(count)
+            nodes = self.order
+        links = {}
+        for node in nodes:
+            avoiding.record((node.rank, -1), node.reach, node.position, count)
+            if all(predecessor is self for predecessor in node.incoming_nodes):
+                avoiding.record((-1, node.rank), node.length, -1, node.position)
+            for target in node.to_nodes:
+                links[node.rank, target.rank] = node, target
+            for source in node.incoming_nodes:
+                if source is not self:
+                    links[source.rank, node.rank] = source, node
+        for key, (source, target) in links.items():
+            avoiding.record(key, source.reach + target.length, source.position, target.position)
+
+    @no_type_check
+    def topological_order(self) -> list['Node']:
+        """Order the child nodes so every node precedes its successors (as maintained by link)."""
+        return list(self.order)
+
+    @no_type_check
+    def longest_path(self, order):
+        """Provide the duration, the nodes, and the node set of the longest path given a topological order.
+
+        The length of a path sums the durations of its nodes.
+        The longest paths starting at each node are computed wunce in reverse topological order (O(V+E)).
+        Among equally long paths the path visiting the earlier added nodes first wins.
+        """
+        for node in reversed(order):
+            node.update_length()
+        self.rebuild_starts()
+        return self.path_from(self.first_of_longest())
+
+    @no_type_check
+    def rebuild_starts(self) -> None:
+        """Rebuild the heap of the first child nodes by the longest path starting there (dropping outdated entries)."""
+        self._starts = [(-node.length, node.rank) for node in self.first_nodes]
+        heapq.heapify(self._starts)
+
+    @no_type_check
+    def path_from(self, node, rerouted=None):
+        """Provide the duration, the nodes, and the index per node of the longest path starting at the first node.
+
+        Given the nodes with a changed successor along their longest path, a cached critical path starting at the
+        same node is kept in place up to the first of these and only walked again from there.
+        """
+        duration, path, critical = node.length, [], {}
+        if rerouted is not None and self._critical_path is not None and self._critical_path[1][0] is node:
+            _, path, critical = self._critical_path
+            cut = min((critical[member] for member in rerouted if member in critical), default=None)
+            if cut is None:
+                return duration, path, critical
+            node = path[cut]
+            for member in path[cut:]:
+                del critical[member]
+            del path[cut:]
+        while node is not None:
+            critical[node] = len(path)
+            path.append(node)
+            node = node.next_node
+        return duration, path, critical
 
     @no_type_check
     def get_critical_path(self, as_item: bool = False):
-        """Finds the longest path in among the child nodes."""
+        """Finds the longest path in among the child nodes (kept up to date in place by the incremental updates)."""
+        if self._critical_path is None and self._scheduled:
+            self._critical_path = self.path_from(self.first_of_longest())
         if self._critical_path is not None:
-            return self._critical_path[1]
-        longest = None
-        q = [(_.duration, [_], set([_])) for _ in self.first_nodes]
-        while q:
-            item = length, path, priors = q.pop(0)
-            if longest is None:
-                longest = item
-            else:
-                try:
-                    longest = max(longest, item)
-                except TypeError:
-                    longest = longest
-            for to_node in path[-1].to_nodes:
-                if to_node in priors:
-                    continue
-                q.append((length + to_node.duration, path + [to_node], priors.union([to_node])))
-        if longest is None:
+            return self._critical_path if as_item else self._critical_path[1]
+        if not self.nodes:
             return
-        elif as_item:
-            return longest
-        else:
-            return longest[1]
+        longest = self.longest_path(self.topological_order())
+        return longest if as_item else longest[1]
 
     @no_type_check
     def activity(self, node) -> ActOnNodeMap:
@@ -317,6 +691,8 @@ class Node:
             'latest_start': node.ls,
             'latest_finish': node.lf,
             'drag': node.drag,
+            'total_float': node.total_float,
+            'free_float': node.free_float,
         }
 
     @no_type_check
@@ -331,7 +707,6 @@ class Node:
         return [self.activity(node) for node in cp] if cp else []
 
     @staticmethod
-    @no_type_check
     def aon_strings(aon: ActOnNodeMap) -> ActOnNodeTup:
         """Provide the activity-on-node element from map data as 9-tuple of strings.
 
@@ -346,13 +721,17 @@ class Node:
         latest_start = aon['latest_start']
         latest_finish = aon['latest_finish']
         drag = aon['drag']
+        total_float = aon.get('total_float')
+        free_float = aon.get('free_float')
+        tf_disp = f'TF={total_float}' if total_float is not None else ''
+        ff_disp = f'FF={free_float}' if free_float is not None else ''
 
         lk_width = max(len(f'{lk}=') for lk in ('ES', 'EF', 'LS', 'LF'))
         sp, hr, vr = ' ', '-', '|'
         bd_width = len(vr)
         max_width, lc_max_width, cc_max_width, rc_max_width = 0, 0, 0, 0
         lc_max_width = max(len(str(earliest_start)), len(str(latest_start))) + lk_width
-        cc_max_width = len(str(name))
+        cc_max_width = max(len(str(name)), len(tf_disp), len(ff_disp))
         rc_max_width = max(len(str(earliest_finish)), len(str(latest_finish))) + lk_width
         max_width = sum((lc_max_width, cc_max_width, rc_max_width)) + 2 * bd_width  # inner borders
 
@@ -364,7 +743,7 @@ class Node:
         ef_disp = f'EF={earliest_finish}'
         es_ef_sects = (
             f'{vr}{es_disp.center(lc_max_width, sp)}'
-            f'{vr}{sp.center(cc_max_width, sp)}'
+            f'{vr}{tf_disp.center(cc_max_width, sp)}'
             f'{vr}{ef_disp.center(rc_max_width, sp)}{vr}'
         )
         name_sect = (
@@ -376,7 +755,7 @@ class Node:
         lf_disp = f'LF={latest_finish}'
         ls_lf_sects = (
             f'{vr}{ls_disp.center(lc_max_width, sp)}'
-            f'{vr}{sp.center(cc_max_width, sp)}'
+            f'{vr}{ff_disp.center(cc_max_width, sp)}'
             f'{vr}{lf_disp.center(rc_max_width, sp)}{vr}'
         )
         drg_disp = f'DRAG={drag if drag is not None else "n/a"}'
@@ -399,62 +778,17 @@ class Node:
 
         Example:
 
-        +-----------------------+  # section_sep
-        |        DUR=31         |  # dur_sect
-        +-----------------------+  # section_sep
-        |ES=8308|       |EF=8339|  # es_ef_sects
-        |-------|  4696 |-------|  # name_sect
-        |LS=8308|       |LF=8339|  # ls_lf_sects
-        +-----------------------+  # section_sep
-        |       DRAG=None       |  # drg_sect
-        +-----------------------+  # section_sep
+        +--------------------+  # section_sep
+        |       DUR=31       |  # dur_sect
+        +--------------------+  # section_sep
+        |ES=8305|TF=0|EF=8336|  # es_ef_sects (with the total float)
+        |-------|4696|-------|  # name_sect
+        |LS=8305|FF=0|LF=8336|  # ls_lf_sects (with the free float)
+        +--------------------+  # section_sep
+        |       DRAG=4       |  # drg_sect
+        +--------------------+  # section_sep
         """
-        lk_width = max(len(f'{lk}=') for lk in ('ES', 'EF', 'LS', 'LF'))
-        sp, hr, vr = ' ', '-', '|'
-        bd_width = len(vr)
-        max_width, lc_max_width, cc_max_width, rc_max_width = 0, 0, 0, 0
-        lc_max_width = max(len(str(self.es)), len(str(self.ls))) + lk_width
-        cc_max_width = len(str(self.name))
-        rc_max_width = max(len(str(self.ef)), len(str(self.lf))) + lk_width
-        max_width = sum((lc_max_width, cc_max_width, rc_max_width)) + 2 * bd_width  # inner borders
-
-        section_sep = f'+{hr * max_width}+'
-
-        dur_disp = f'DUR={self.duration}'
-        dur_sect = f'{vr}{dur_disp.center(max_width, sp)}{vr}'
-        es_disp = f'ES={self.es}'
-        ef_disp = f'EF={self.ef}'
-        es_ef_sects = (
-            f'{vr}{es_disp.center(lc_max_width, sp)}'
-            f'{vr}{sp.center(cc_max_width, sp)}'
-            f'{vr}{ef_disp.center(rc_max_width, sp)}{vr}'
-        )
-        name_sect = (
-            f'{vr}{hr.center(lc_max_width, hr)}'
-            f'{vr}{str(self.name).center(cc_max_width, sp)}'
-            f'{vr}{hr.center(rc_max_width, hr)}{vr}'
-        )
-        ls_disp = f'LS={self.ls}'
-        lf_disp = f'LF={self.lf}'
-        ls_lf_sects = (
-            f'{vr}{ls_disp.center(lc_max_width, sp)}'
-            f'{vr}{sp.center(cc_max_width, sp)}'
-            f'{vr}{lf_disp.center(rc_max_width, sp)}{vr}'
-        )
-        drg_disp = f'DRAG={self.drag if self.drag is not None else "n/a"}'
-        drg_sect = f'{vr}{drg_disp.center(max_width, sp)}{vr}'
-
-        return (
-            section_sep,
-            dur_sect,
-            section_sep,
-            es_ef_sects,
-            name_sect,
-            ls_lf_sects,
-            section_sep,
-            drg_sect,
-            section_sep,
-        )
+        return self.aon_strings(self.activity_on_node())
 
     @staticmethod
     def aon_strings_with_link(aon_strings: ActOnNodeTup) -> ActOnNodeTup:
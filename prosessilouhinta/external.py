@@ -0,0 +1,78 @@
+"""External sort of eventlogs per (case, timestamp) with sorted runs spilled to temporary files."""
+
+import datetime as dti
+import heapq
+import itertools
+import operator
+import pathlib
+import tempfile
+from collections.abc import Iterable, Iterator
+from typing import Optional
+
+import prosessilouhinta.prosessilouhinta as pm
+
+RUN_EVENTS = 1 << 20  # events sorted in memory per run
+CSV_SEP = ','
+SORT_KEY = operator.itemgetter(0, 3)
+
+
+def spill(run: list[pm.Event], path: pathlib.Path) -> pathlib.Path:
+    """Sort the run per (case, timestamp) keeping the source order of ties and write it as CSV to path."""
+    run.sort(key=SORT_KEY)
+    with open(path, 'wt', encoding=pm.ENCODING) as handle:
+        handle.writelines(
+            f'{caseid}{CSV_SEP}{activity}{CSV_SEP}{user}{CSV_SEP}{timestamp.isoformat(sep=" ")}\n'
+            for caseid, activity, user, timestamp in run
+        )
+    return path
+
+
+def read_run(path: pathlib.Path) -> Iterator[pm.Event]:
+    """Generate the events of a spilled run."""
+    with open(path, 'rt', encoding=pm.ENCODING) as handle:
+        for line in handle:
+            caseid, activity, user, ts_text = line.rstrip('\n').split(CSV_SEP, 3)
+            yield caseid, activity, user, dti.datetime.fromisoformat(ts_text)
+
+
+def sorted_events(
+    events: Iterable[pm.Event], run_events: int = RUN_EVENTS, folder: Optional[pathlib.Path] = None
+) -> Iterator[pm.Event]:
+    """Generate the events sorted per (case, timestamp) keeping the source order of ties in bounded memory.
+
+    Runs of up to run_events events are sorted in memory and spilled to a temporary folder (below folder)
+    before the next run is read, then the spilled runs are merged per heap from the files,
+    so only wun run (while sorting) or wun event per spilled run (while merging) are held at any time.
+    Inputs fitting in wun run are sorted in memory without spilling.
+    """
+    stream = iter(events)
+    run = list(itertools.islice(stream, run_events))
+    following = next(stream, None)
+    if following is None:
+        run.sort(key=SORT_KEY)
+        yield from run
+        return
+
+    stream = itertools.chain([following], stream)
+    with tempfile.TemporaryDirectory(prefix='prosessilouhinta-', dir=folder) as spill_folder:
+        paths: list[pathlib.Path] = []
+        while run:
+            paths.append(spill(run, pathlib.Path(spill_folder, f'run-{len(paths)}.csv')))
+            run.clear()
+            run.extend(itertools.islice(stream, run_events))
+        yield from heapq.merge(*(read_run(path) for path in paths), key=SORT_KEY)
+
+
+def aggregate_sorted(
+    events: Iterable[pm.Event],
+    run_events: int = RUN_EVENTS,
+    folder: Optional[pathlib.Path] = None,
+    summaries: bool = False,
+    variants: int = 0,
+) -> pm.Aggregate:
+    """Aggregate the cases wun at a time from the externally sorted events closing each case after its events."""
+    agg = pm.Aggregate(summaries, variants)
+    for caseid, run in itertools.groupby(sorted_events(events, run_events, folder), key=operator.itemgetter(0)):
+        agg.add_case(caseid, map(operator.itemgetter(1, 2, 3), run))
+        agg.close_case(caseid)
+    return agg
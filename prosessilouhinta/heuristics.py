@@ -0,0 +1,126 @@
+"""Heuristics miner discovery of dependency graphs from the control flow (the directly follows counts)."""
+
+import bisect
+import operator
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any, Optional
+
+Flow = dict[str, dict[str, int]]
+Measures = dict[str, dict[str, float]]
+Trace = Sequence[tuple[str, str, Any]]
+Net = dict[str, Any]
+
+FREQUENCY = 1  # minimal number of directly follows observations per arc
+DEPENDENCY = 0.9
+LENGTH_ONE = 0.9
+LENGTH_TWO = 0.9
+
+
+def dependency(forward: int, backward: int) -> float:
+    """Measure the dependency a => b from the counts of a > b (forward) and b > a (backward)."""
+    return (forward - backward) / (forward + backward + 1)
+
+
+def loop_dependency(count: int) -> float:
+    """Measure a loop dependency from the count of a > a (length wun) or of a >> b plus b >> a (length two)."""
+    return count / (count + 1)
+
+
+def flow_and_loops(events: Mapping[str, Trace]) -> tuple[Flow, Flow]:
+    """Count the directly follows relations a > b and the length two loop patterns a b a (a >> b) in wun pass."""
+    flow: Flow = {}
+    loops: Flow = {}
+    for trace in events.values():
+        acts = list(map(operator.itemgetter(0), trace))
+        for a, b in zip(acts, acts[1:]):
+            row = flow.get(a)
+            if row is None:
+                row = flow[a] = {}
+            row[b] = row.get(b, 0) + 1
+        for a, b, c in zip(acts, acts[1:], acts[2:]):
+            if a == c and a != b:
+                row = loops.get(a)
+                if row is None:
+                    row = loops[a] = {}
+                row[b] = row.get(b, 0) + 1
+    return flow, loops
+
+
+class DependencyGraph:
+    """Dependency measures of the activity pairs of the control flow computed wunce for any thresholds.
+
+    Without the length two loop counts (a >> b) no length two loops are detected.
+    The discovered nets list the activities in name order.
+    """
+
+    def __init__(self, flow: Flow, loops: Optional[Flow] = None) -> None:
+        """Compute the dependency, length wun loop, and length two loop measures."""
+        self.flow = flow
+        self.dependency: Measures = {}
+        self.length_one: dict[str, float] = {}
+        self.length_two: Measures = {}
+        for a, targets in flow.items():
+            for b, count in targets.items():
+                if a == b:
+                    self.length_one[a] = loop_dependency(count)
+                else:
+                    self.dependency.setdefault(a, {})[b] = dependency(count, flow.get(b, {}).get(a, 0))
+        pairs: dict[tuple[str, str], int] = {}
+        for a, targets in (loops or {}).items():
+            for b, count in targets.items():
+                pair = (a, b) if a < b else (b, a)
+                pairs[pair] = pairs.get(pair, 0) + count
+        for (a, b), count in pairs.items():
+            self.length_two.setdefault(a, {})[b] = loop_dependency(count)
+
+    @classmethod
+    def of_events(cls, events: Mapping[str, Trace]) -> 'DependencyGraph':
+        """Measure the dependencies of the eventlog (including the length two loops)."""
+        return cls(*flow_and_loops(events))
+
+    def discover(
+        self,
+        frequency: int = FREQUENCY,
+        dependency: float = DEPENDENCY,
+        length_one: float = LENGTH_ONE,
+        length_two: float = LENGTH_TWO,
+    ) -> Net:
+        """Apply the thresholds providing the arcs with their measures and the length wun and two loops.
+
+        Arcs need at least frequency observations and a dependency measure of at least dependency.
+        Length two loops a => b => a are only detected between activities without length wun loops
+        and add both arcs (with the length two loop measure unless the arc is stronger already).
+        """
+        flow = self.flow
+        arcs: Measures = {}
+        for a, targets in self.dependency.items():
+            for b, measure in targets.items():
+                if measure >= dependency and flow[a][b] >= frequency:
+                    arcs.setdefault(a, {})[b] = measure
+        ones = sorted(a for a, measure in self.length_one.items() if measure >= length_one and flow[a][a] >= frequency)
+        for a in ones:
+            arcs.setdefault(a, {})[a] = self.length_one[a]
+        singles = set(ones)
+        twos = []
+        for a, targets in self.length_two.items():
+            for b, measure in targets.items():
+                if measure >= length_two and a not in singles and b not in singles:
+                    twos.append([a, b])
+                    for x, y in ((a, b), (b, a)):
+                        row = arcs.setdefault(x, {})
+                        row[y] = max(row.get(y, measure), measure)
+        return {
+            'arcs': {a: dict(sorted(arcs[a].items())) for a in sorted(arcs)},
+            'length_one_loops': ones,
+            'length_two_loops': sorted(twos),
+        }
+
+    def sweep(self, dependencies: Iterable[float], frequency: int = FREQUENCY) -> list[int]:
+        """Count the dependency arcs (excluding the loops) per dependency threshold."""
+        measures = sorted(
+            measure
+            for a, targets in self.dependency.items()
+            for b, measure in targets.items()
+            if self.flow[a][b] >= frequency
+        )
+        return [len(measures) - bisect.bisect_left(measures, threshold) for threshold in dependencies]
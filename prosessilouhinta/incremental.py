@@ -0,0 +1,311 @@
+"""Incremental extraction from appended eventlogs per persisted aggregate state."""
+
+import contextlib
+import datetime as dti
+import hashlib
+import itertools
+import json
+import operator
+import pathlib
+import sqlite3
+from collections.abc import Collection, Iterable
+from typing import Any, Tuple
+
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.social import CoOccurrence
+from prosessilouhinta.summaries import TransitionStats
+
+STATE_SUFFIX = '.state.db'
+STATE_VERSION = 2
+FINGERPRINT_BYTES = 4096
+MICROSECOND = dti.timedelta(microseconds=1)
+NOBODY: frozenset[str] = frozenset()
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS cases ('
+    ' caseid TEXT PRIMARY KEY, ordinal INTEGER NOT NULL, activity TEXT NOT NULL, timestamp TEXT NOT NULL,'
+    ' users TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS pairs ('
+    ' user TEXT NOT NULL, other TEXT NOT NULL, count INTEGER NOT NULL, first INTEGER NOT NULL,'
+    ' PRIMARY KEY (user, other))',
+    'CREATE TABLE IF NOT EXISTS durations (source TEXT NOT NULL, target TEXT NOT NULL, us INTEGER NOT NULL)',
+)
+TABLES = ('meta', 'cases', 'pairs', 'durations')
+USER_SEPARATOR = '\n'  # the lines of the eventlog contain no newlines
+LOOKUP_BATCH = 500  # below the default limit of bound parameters per statement
+
+State = dict[str, Any]
+
+
+class StateAggregate(pm.Aggregate):
+    """Aggregate continuing the persisted state that holds only the cases of the delta in memory.
+
+    The counts of the user pairs working together are kept up to date per case with added users, each with the index
+    of the first case of the pair, so working together needs no users of the cases outside the delta.
+    """
+
+    def __init__(self, summaries: bool = False, cases: int = 0) -> None:
+        """Initialize the empty aggregate continuing after the given number of cases seen before."""
+        super().__init__(summaries)
+        self.cases = self.seen = cases
+        self.ordinals: dict[str, int] = {}  # per case of the delta the index in the order of first appearance
+        self.before: dict[str, frozenset[str]] = {}  # per case of the delta the users already counted in pairs
+        self.pairs: pm.Flow = {}  # per lesser and other user the number of cases of both
+        self.firsts: pm.Flow = {}  # per lesser and other user the index of the first case of both
+        self.stored: pm.Flow = {}  # the pair counts as persisted
+
+    def add_case(self, caseid: str, trace: Iterable[Tuple[str, str, dti.datetime]]) -> None:
+        """Account for the events of case caseid in order (the user pairs are counted on request)."""
+        if caseid not in self.before:
+            users = self.case_users.get(caseid)
+            self.before[caseid] = frozenset(users) if users else NOBODY
+            if caseid not in self.ordinals:
+                self.ordinals[caseid] = self.cases
+                self.cases += 1
+        super().add_case(caseid, trace)
+
+    def count_pairs(self) -> None:
+        """Count the user pairs added to the cases since the last count (distinct changes of users wunce).
+
+        Cases seen before are counted first, in case order, and may lower the first case of a pair.
+        The new cases follow in case order, so they only count their pairs and meet new pairs in their first case.
+        """
+        changes: dict[tuple[frozenset[str], frozenset[str]], list[int]] = {}
+        fresh: dict[frozenset[str], list[int]] = {}
+        for caseid, before in self.before.items():
+            users = self.case_users[caseid]
+            if len(users) > len(before) and len(users) > 1:
+                ordinal = self.ordinals[caseid]
+                if before:
+                    changes.setdefault((before, frozenset(users)), [0, ordinal])[0] += 1
+                    continue
+                members = frozenset(users)
+                change = fresh.get(members)
+                if change is None:
+                    fresh[members] = [1, ordinal]
+                else:
+                    change[0] += 1
+        self.before = {}
+        pairs, firsts = self.pairs, self.firsts
+        for (before, members), (weight, ordinal) in sorted(changes.items(), key=lambda item: item[1][1]):
+            L = sorted(members)  # noqa
+            for k in range(len(L) - 1):
+                user = L[k]
+                row = pairs.setdefault(user, {})
+                starts = firsts.setdefault(user, {})
+                known = user in before
+                for other in L[k + 1 :]:
+                    if known and other in before:
+                        continue
+                    row[other] = row.get(other, 0) + weight
+                    if ordinal < starts.get(other, ordinal + 1):
+                        starts[other] = ordinal
+        for members, (weight, ordinal) in fresh.items():
+            L = sorted(members)  # noqa
+            for k in range(len(L) - 1):
+                user = L[k]
+                counts = pairs.get(user)
+                if counts is None:
+                    counts = pairs[user] = {}
+                    firsts[user] = {}
+                starts = firsts[user]
+                for other in L[k + 1 :]:
+                    count = counts.get(other)
+                    if count is None:
+                        counts[other] = weight
+                        starts[other] = ordinal
+                    else:
+                        counts[other] = count + weight
+
+    def co_occurrence(self) -> CoOccurrence:
+        """Provide the sparse counts of the users working together in cases from the maintained pair counts."""
+        self.count_pairs()
+        return CoOccurrence.of_pairs(self.pairs, self.firsts)
+
+
+def state_path(report_path: pathlib.Path) -> pathlib.Path:
+    """Derive the path of the state store persisted next to the report."""
+    return report_path.with_name(report_path.name + STATE_SUFFIX)
+
+
+def fingerprint(path: pathlib.Path, offset: int) -> str:
+    """Digest the bytes at the start and before the offset to detect rewritten or truncated sources."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as handle:
+        digest.update(handle.read(min(offset, FINGERPRINT_BYTES)))
+        handle.seek(max(0, offset - FINGERPRINT_BYTES))
+        digest.update(handle.read(min(offset, FINGERPRINT_BYTES)))
+    return digest.hexdigest()
+
+
+def connect(path: pathlib.Path) -> sqlite3.Connection:
+    """Open the state store creating the tables (replacing a file that is no state store)."""
+    connection = sqlite3.connect(path)
+    try:
+        for statement in SCHEMA:
+            connection.execute(statement)
+    except sqlite3.DatabaseError:
+        connection.close()
+        path.unlink()
+        connection = sqlite3.connect(path)
+        for statement in SCHEMA:
+            connection.execute(statement)
+    return connection
+
+
+def read_meta(connection: sqlite3.Connection) -> State:
+    """Read the meta data (version, source, offset, fingerprint, mode, number of cases, and the small aggregates)."""
+    return {key: json.loads(value) for key, value in connection.execute('SELECT key, value FROM meta')}
+
+
+def write_meta(connection: sqlite3.Connection, meta: State) -> None:
+    """Write the meta data."""
+    rows = ((key, json.dumps(value)) for key, value in meta.items())
+    connection.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', rows)
+
+
+def load_state(
+    connection: sqlite3.Connection, source: pathlib.Path, summaries: bool = False
+) -> Tuple[StateAggregate, int]:
+    """Load the aggregate and consumed byte offset if the state matches the source and mode (else start afresh).
+
+    Only the counts, flows, duration statistics, work distribution, and user pairs are read, the cases on demand.
+    """
+    meta = read_meta(connection)
+    offset = meta.get('offset', 0)
+    if not (
+        meta.get('version') == STATE_VERSION
+        and offset <= source.stat().st_size
+        and meta.get('fingerprint') == fingerprint(source, offset)
+        and meta.get('summaries') == summaries
+    ):
+        for table in TABLES:
+            connection.execute(f'DELETE FROM {table}')  # constant table names
+        return StateAggregate(summaries), 0
+
+    data = meta['aggregate']
+    agg = StateAggregate(summaries, meta['cases'])
+    agg.A = data['activity_counts']
+    agg.F = data['control_flow']
+    if summaries:
+        agg.S = {
+            ai: {aj: TransitionStats.from_state(state) for aj, state in targets.items()}
+            for ai, targets in data['time_difference_stats'].items()
+        }
+    else:  # the report lists every single duration
+        agg.D = {ai: {aj: [] for aj in targets} for ai, targets in agg.F.items()}
+        for ai, aj, us in connection.execute('SELECT source, target, us FROM durations ORDER BY rowid'):
+            agg.D[ai][aj].append(dti.timedelta(microseconds=us))
+    agg.UAC = data['work_distribution']
+    for user, other, count, first in connection.execute('SELECT user, other, count, first FROM pairs'):
+        agg.pairs.setdefault(user, {})[other] = count
+        agg.firsts.setdefault(user, {})[other] = first
+    agg.stored = {user: dict(row) for user, row in agg.pairs.items()}
+    return agg, offset
+
+
+def load_cases(connection: sqlite3.Connection, agg: StateAggregate, caseids: Collection[str]) -> None:
+    """Restore the last event, the users, and the ordinal of the given cases (if seen before)."""
+    keys = list(caseids)
+    for start in range(0, len(keys), LOOKUP_BATCH):
+        batch = keys[start : start + LOOKUP_BATCH]
+        query = f'SELECT * FROM cases WHERE caseid IN ({", ".join("?" * len(batch))})'
+        for caseid, ordinal, activity, timestamp, users in connection.execute(query, batch):
+            agg.ordinals[caseid] = ordinal
+            agg.last[caseid] = (activity, dti.datetime.fromisoformat(timestamp))
+            agg.case_users[caseid] = set(users.split(USER_SEPARATOR))
+
+
+def dump_state(
+    connection: sqlite3.Connection,
+    agg: StateAggregate,
+    source: pathlib.Path,
+    offset: int,
+    known: dict[tuple[str, str], int],
+) -> None:
+    """Persist the cases of the delta, the changed user pairs, the new durations, and the small aggregates."""
+    connection.executemany(
+        'INSERT OR REPLACE INTO cases (caseid, ordinal, activity, timestamp, users) VALUES (?, ?, ?, ?, ?)',
+        (
+            (
+                caseid,
+                agg.ordinals[caseid],
+                ai,
+                ti.isoformat(sep=' '),
+                USER_SEPARATOR.join(sorted(agg.case_users[caseid])),
+            )
+            for caseid, (ai, ti) in agg.last.items()
+        ),
+    )
+    connection.executemany(
+        'INSERT OR REPLACE INTO pairs (user, other, count, first) VALUES (?, ?, ?, ?)',
+        (
+            (user, other, count, agg.firsts[user][other])
+            for user, row in agg.pairs.items()
+            for other, count in row.items()
+            if count != agg.stored.get(user, {}).get(other)
+        ),
+    )
+    durations: State = {}
+    if agg.summaries:
+        durations = {
+            'time_difference_stats': {
+                ai: {aj: stats.state() for aj, stats in targets.items()} for ai, targets in agg.S.items()
+            }
+        }
+    else:
+        connection.executemany(
+            'INSERT INTO durations (source, target, us) VALUES (?, ?, ?)',
+            (
+                (ai, aj, delta // MICROSECOND)
+                for ai, targets in agg.D.items()
+                for aj, deltas in targets.items()
+                for delta in deltas[known.get((ai, aj), 0) :]
+            ),
+        )
+    aggregate = {'activity_counts': agg.A, 'control_flow': agg.F, **durations, 'work_distribution': agg.UAC}
+    meta = {
+        'version': STATE_VERSION,
+        'source': str(source),
+        'offset': offset,
+        'fingerprint': fingerprint(source, offset),
+        'summaries': agg.summaries,
+        'cases': agg.cases,
+        'aggregate': aggregate,
+    }
+    write_meta(connection, meta)
+
+
+def appended_lines(path: pathlib.Path, offset: int) -> Tuple[list[str], int]:
+    """Read the newline terminated lines appended after offset and the offset after the last wun.
+
+    A partially appended last line is left for a later run.
+    """
+    with open(path, 'rb') as handle:
+        handle.seek(offset)
+        delta = handle.read()
+    end = delta.rfind(b'\n') + 1
+    return delta[:end].decode(pm.ENCODING).splitlines(), offset + end
+
+
+def extract(source: pathlib.Path, state_file: pathlib.Path, summaries: bool = False) -> pm.Aggregate:
+    """Update the persisted aggregate with the lines appended to source since the last run.
+
+    A run reads and writes only the cases of the appended lines (besides the small aggregates and user pairs)
+    in wun transaction, so its cost follows the delta and not the history (except for the duration lists).
+    """
+    with contextlib.closing(connect(state_file)) as connection:
+        with connection:  # commits or rolls back the run as a whole
+            agg, offset = load_state(connection, source, summaries)
+            lines, offset = appended_lines(source, offset)
+            runs = [
+                (caseid, list(map(operator.itemgetter(1, 2, 3), run)))
+                for caseid, run in itertools.groupby(pm.iter_events(iter(lines)), key=operator.itemgetter(0))
+            ]
+            load_cases(connection, agg, {caseid for caseid, _ in runs})
+            known = {(ai, aj): len(deltas) for ai, targets in agg.D.items() for aj, deltas in targets.items()}
+            for caseid, trace in runs:
+                agg.add_case(caseid, trace)
+            agg.count_pairs()
+            dump_state(connection, agg, source, offset, known)
+    return agg
@@ -0,0 +1,287 @@
+"""Compact array backed activity network for the critical path analysis of large schedules."""
+
+import array
+import heapq
+from collections.abc import Iterable
+from typing import Any, Optional, Union
+
+import prosessilouhinta.cpa as cpa
+
+INDEX_TYPE = 'i'  # 32 bit signed integer node indices
+OFFSET_TYPE = 'q'
+INTEGRAL_TYPE = 'q'  # timings of networks with integer durations and lags only
+REAL_TYPE = 'd'
+NOTHING = cpa.NOTHING
+
+Number = Union[int, float]
+Activity = tuple[str, Optional[Number], Number]  # name, duration, lag
+
+
+def integral(network: dict[str, Any]) -> bool:
+    """Determine if all durations and lags of the network data are integers.
+
+    Only then the timing arrays keep the values of the node based model, which computes
+    with the int and float values as given and reports e.g. DUR=2 next to ES=1.5.
+    """
+    nodes = network.get('nodes', {})
+    values = (node.get(key, 0) for node in nodes.values() for key in ('duration', 'lag'))
+    return not any(isinstance(value, float) for value in (network.get('lag', 0), *values))
+
+
+class CompactNetwork:
+    """Activity network with integer indexed nodes, parallel timing arrays, and successors in CSR form.
+
+    The successors of node k are targets[offsets[k]:offsets[k + 1]] and the k-th entries of the arrays hold
+    the duration, lag, timings, floats, and drag of node k. Nodes are indexed in order of addition, so ties
+    between equally long paths are broken as in the node based model and the diagram data are the same.
+    Timings use integer arrays unless any duration or lag is a float.
+    """
+
+    def __init__(self, name: str, lag: Number = 0) -> None:
+        """Initialize the empty network."""
+        self.name = name
+        self.lag = lag
+        self.names: list[str] = []
+        self.index: dict[str, int] = {}
+        self.typecode: str = INTEGRAL_TYPE
+        self.durations: 'array.array[float]' = array.array(self.typecode)
+        self.lags: 'array.array[float]' = array.array(self.typecode)
+        self.offsets: 'array.array[int]' = array.array(OFFSET_TYPE, [0])
+        self.targets: 'array.array[int]' = array.array(INDEX_TYPE)
+        self.order: 'array.array[int]' = array.array(INDEX_TYPE)
+        self.earliest_starts: 'array.array[float]' = array.array(self.typecode)
+        self.earliest_finishes: 'array.array[float]' = array.array(self.typecode)
+        self.latest_starts: 'array.array[float]' = array.array(self.typecode)
+        self.latest_finishes: 'array.array[float]' = array.array(self.typecode)
+        self.total_floats: 'array.array[float]' = array.array(self.typecode)
+        self.free_floats: 'array.array[float]' = array.array(self.typecode)
+        self.drags: 'array.array[float]' = array.array(self.typecode)
+        self.path: list[int] = []
+        self.duration: Number | None = None
+        self.es: Number | None = None
+        self.ef: Number | None = None
+        self.ls: Number | None = None
+        self.lf: Number | None = None
+
+    @classmethod
+    def of_activities(
+        cls, name: str, activities: Iterable[Activity], edges: Iterable[tuple[str, str]], lag: Number = 0
+    ) -> 'CompactNetwork':
+        """Build the network from the activities (name, duration, lag) and the directed edges between their names."""
+        network = cls(name, lag)
+        names, index = network.names, network.index
+        durations: list[Number] = []
+        lags: list[Number] = []
+        for key, duration, node_lag in activities:
+            if duration is None:
+                raise ValueError('unspecified duration')
+            if key in index:
+                continue
+            index[key] = len(names)
+            names.append(key)
+            durations.append(duration)
+            lags.append(node_lag)
+        if any(isinstance(value, float) for value in (*durations, *lags, lag)):
+            network.typecode = REAL_TYPE
+        network.durations = array.array(network.typecode, durations)
+        network.lags = array.array(network.typecode, lags)
+
+        sources, sinks = array.array(INDEX_TYPE), array.array(INDEX_TYPE)
+        for from_key, to_key in edges:
+            sources.append(index[from_key])
+            sinks.append(index[to_key])
+        counts = [0] * (len(names) + 1)
+        for source in sources:
+            counts[source + 1] += 1
+        for k in range(len(names)):
+            counts[k + 1] += counts[k]
+        network.offsets = array.array(OFFSET_TYPE, counts)
+        slots = counts[:-1]
+        targets = [0] * len(sinks)
+        for source, sink in zip(sources, sinks):
+            targets[slots[source]] = sink
+            slots[source] += 1
+        network.targets = array.array(INDEX_TYPE, targets)
+        return network
+
+    @classmethod
+    def of_node(cls, project: cpa.Node) -> 'CompactNetwork':
+        """Build the network from the child nodes and links of the node based model."""
+        nodes = project.nodes
+        activities = ((node.name, node.duration, node.lag if node.lag is not None else 0) for node in nodes)
+        edges = ((node.name, target.name) for node in nodes for target in node.to_nodes)
+        return cls.of_activities(project.name, activities, edges, project.lag if project.lag is not None else 0)
+
+    @classmethod
+    def load_network(cls, file_path: str, name: str) -> 'CompactNetwork':
+        """Load the network from JSON file with matching top level name value and update all timings."""
+        data = cpa.read_network(file_path, name)
+        nodes = data.get('nodes', {})
+        activities = ((key, node.get('duration', None), node.get('lag', 0)) for key, node in nodes.items())
+        network = cls.of_activities(name, activities, cpa.network_edges(data, nodes))
+        network.update_all()
+        return network
+
+    def __len__(self) -> int:
+        """Count the nodes."""
+        return len(self.names)
+
+    def successors(self, node: int) -> 'array.array[int]':
+        """Provide the indices of the successors of the node."""
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def topological_order(self) -> 'array.array[int]':
+        """Order the node indices so every node precedes its successors (Kahn, ties in index order)."""
+        count, offsets, targets = len(self.names), self.offsets, self.targets
+        pending = [0] * count
+        for target in targets:
+            pending[target] += 1
+        ready = [node for node in range(count - 1, -1, -1) if not pending[node]]
+        order = array.array(INDEX_TYPE)
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for target in targets[offsets[node] : offsets[node + 1]]:
+                pending[target] -= 1
+                if not pending[target]:
+                    ready.append(target)
+        if len(order) < count:
+            raise TypeError('Network contains cycles')
+        return order
+
+    def update_all(self) -> None:
+        """Updates the timings, floats, drag, and critical path of all nodes in sweeps over wun topological order."""
+        count, offsets, targets = len(self.names), self.offsets, self.targets
+        durations, lags, typecode = self.durations, self.lags, self.typecode
+        order = self.order = self.topological_order()
+        reached = bytearray(count)
+        for target in targets:
+            reached[target] = 1
+        es: list[Number] = [self.lag + lags[node] if not reached[node] else 0 for node in range(count)]
+        ef: list[Number] = [0] * count
+        for node in order:
+            finish = ef[node] = es[node] + durations[node]
+            for target in targets[offsets[node] : offsets[node + 1]]:
+                start = finish + lags[target]
+                if reached[target] == 1 or start > es[target]:
+                    es[target] = start
+                    reached[target] = 2
+        ls: list[Number] = [0] * count
+        lf: list[Number] = [0] * count
+        tf: list[Number] = [0] * count
+        ff: list[Number] = [0] * count
+        for node in reversed(order):
+            successors = targets[offsets[node] : offsets[node + 1]]
+            if successors:
+                lf[node] = min(ls[target] for target in successors)
+                next_start = min(es[target] - lags[target] for target in successors)
+            else:
+                lf[node] = next_start = ef[node]
+            ls[node] = lf[node] - durations[node]
+            tf[node] = ls[node] - es[node]
+            ff[node] = next_start - ef[node]
+
+        length: list[Number] = [0] * count  # the longest path (sum of durations) from the start of a node
+        best = [-1] * count
+        longest: Number
+        for node in reversed(order):
+            tail, longest = -1, 0
+            for target in targets[offsets[node] : offsets[node + 1]]:
+                if tail < 0 or length[target] > longest or length[target] == longest and target < tail:
+                    tail, longest = target, length[target]
+            length[node] = durations[node] + longest
+            best[node] = tail
+        node = -1
+        for first in range(count):
+            if not reached[first] and (node < 0 or length[first] > length[node]):
+                node = first
+        path = []
+        if node >= 0:
+            self.duration = length[node]
+        while node >= 0:
+            path.append(node)
+            node = best[node]
+        self.path = path
+
+        self.earliest_starts = array.array(typecode, es)
+        self.earliest_finishes = array.array(typecode, ef)
+        self.latest_starts = array.array(typecode, ls)
+        self.latest_finishes = array.array(typecode, lf)
+        self.total_floats = array.array(typecode, tf)
+        self.free_floats = array.array(typecode, ff)
+        self.drags = array.array(typecode, self.drag_of(order, path, length, bytes(reached)))
+        if path:
+            self.es, self.ls = es[path[0]], ls[path[0]]
+            self.ef, self.lf = ef[path[-1]], lf[path[-1]]
+
+    def drag_of(self, order: 'array.array[int]', path: list[int], length: list[Number], reached: bytes) -> list[Number]:
+        """Compute the drag of all nodes as the node based model does (cf. cpa.Node.update_drag)."""
+        count, offsets, targets, durations = len(order), self.offsets, self.targets, self.durations
+        position = [0] * count
+        for k, node in enumerate(order):
+            position[node] = k
+        critical = {position[node] for node in path}
+        after = [NOTHING] * (count + 1)
+        following = [count] * (count + 1)
+        for k in range(count - 1, -1, -1):
+            node = order[k]
+            after[k] = max(after[k + 1], length[node] if not reached[node] else NOTHING)
+            following[k] = k + 1 if k + 1 in critical else following[k + 1]
+        reach: list[Number] = [0] * count  # the longest path ending with a node
+        drags: list[Number] = [0] * count
+        jumps: list[tuple[Number, int]] = []  # heap of (-length, position of the target) of the jumping links
+        longest, before = length[path[0]] if path else 0, NOTHING
+        for k, node in enumerate(order):
+            reach[node] += durations[node]
+            if k in critical:
+                while jumps and jumps[0][1] <= k:
+                    heapq.heappop(jumps)
+                avoiding = max(before, after[k + 1], -jumps[0][0] if jumps else NOTHING)
+                drags[node] = min(durations[node], longest - avoiding)
+            before = max(before, reach[node])
+            for target in targets[offsets[node] : offsets[node + 1]]:
+                reach[target] = max(reach[target], reach[node])
+                if position[target] > following[k]:
+                    heapq.heappush(jumps, (-(reach[node] + length[target]), position[target]))
+        return drags
+
+    def get_critical_path(self) -> list[str]:
+        """Provide the names of the nodes along the critical path."""
+        return [self.names[node] for node in self.path]
+
+    def activity(self, node: int) -> cpa.ActOnNodeMap:
+        """Provide the activity-on-node element of the node with given index as JSON serializable dict."""
+        return {
+            'duration': self.durations[node],
+            'earliest_start': self.earliest_starts[node],
+            'earliest_finish': self.earliest_finishes[node],
+            'name': self.names[node],
+            'latest_start': self.latest_starts[node],
+            'latest_finish': self.latest_finishes[node],
+            'drag': self.drags[node],
+            'total_float': self.total_floats[node],
+            'free_float': self.free_floats[node],
+        }
+
+    def activity_on_node(self) -> cpa.ActOnNodeMap:
+        """Provide the activity-on-node element of the whole network as JSON serializable dict."""
+        return {
+            'duration': self.duration,
+            'earliest_start': self.es,
+            'earliest_finish': self.ef,
+            'name': self.name,
+            'latest_start': self.ls,
+            'latest_finish': self.lf,
+            'drag': None,
+            'total_float': None,
+            'free_float': None,
+        }
+
+    def activity_on_node_diagram_data(self) -> list[cpa.ActOnNodeMap]:
+        """Provide the activity-on-node diagram as JSON serializable list of dicts."""
+        return [self.activity(node) for node in self.path]
+
+    def aon_diagram_text_dump(self) -> str:
+        """Build a text representation for the critical path with activity-on-nodes linked directionally."""
+        text: str = cpa.Node.aon_diagram_text(self.activity_on_node_diagram_data())  # Node is not type checked
+        return text
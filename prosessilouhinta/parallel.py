@@ -0,0 +1,163 @@
+"""Parallel extraction per shards of the eventlog file aggregated in a process pool and merged in order."""
+
+import array
+import concurrent.futures
+import datetime as dti
+import itertools
+import operator
+import os
+import pathlib
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+import prosessilouhinta.prosessilouhinta as pm
+
+MIN_SHARD_BYTES = 8 << 20  # smaller shards do not amortize starting the worker and transferring its results
+MICROSECOND = dti.timedelta(microseconds=1)
+
+Packed = dict[str, dict[str, 'array.array[int]']]
+
+
+class Shard(NamedTuple):
+    """Partial aggregate of a byte range with the raw events of the (possibly cut) first and last cases."""
+
+    case_ids: set[str]
+    contiguous: bool
+    head: Tuple[Optional[str], pm.Trace]
+    interior: pm.Aggregate
+    durations: Packed
+    tail: Tuple[Optional[str], pm.Trace]
+
+
+def pack(D: pm.TimeDifference) -> Packed:  # noqa
+    """Encode the durations per transition as arrays of integer microseconds (cheap to transfer between processes)."""
+    return {
+        ai: {aj: array.array('q', [delta // MICROSECOND for delta in deltas]) for aj, deltas in targets.items()}
+        for ai, targets in D.items()
+    }
+
+
+def unpack(durations: Packed) -> pm.TimeDifference:
+    """Decode the durations per transition from the arrays of integer microseconds."""
+    return {
+        ai: {aj: [dti.timedelta(microseconds=us) for us in values] for aj, values in targets.items()}
+        for ai, targets in durations.items()
+    }
+
+
+def shard_bounds(path: pathlib.Path, shards: int) -> List[Tuple[int, int]]:
+    """Split the file into at most shards byte ranges each starting at a line start."""
+    size = path.stat().st_size
+    starts = [0]
+    with open(path, 'rb') as handle:
+        for k in range(1, shards):
+            handle.seek(max(k * size // shards - 1, starts[-1]))
+            handle.readline()
+            position = handle.tell()
+            if position >= size:
+                break
+            if position > starts[-1]:
+                starts.append(position)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def lines_of(path: pathlib.Path, start: int, stop: int) -> Iterator[str]:
+    """Generate the decoded lines starting within the byte range."""
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        position = start
+        for line in handle:
+            if position >= stop:
+                break
+            position += len(line)
+            yield line.decode(pm.ENCODING)
+
+
+def extract_shard(path: pathlib.Path, start: int, stop: int, summaries: bool = False) -> Shard:
+    """Aggregate the cases of the byte range keeping the raw events of the first and last cases for stitching.
+
+    The durations are returned packed (with summaries the interior aggregate holds the compact statistics instead).
+    """
+    interior = pm.Aggregate(summaries)
+    case_ids: set[str] = set()
+    contiguous = True
+    head: Tuple[Optional[str], pm.Trace] = (None, [])
+    held: Tuple[Optional[str], pm.Trace] = (None, [])
+    runs = itertools.groupby(pm.iter_events(lines_of(path, start, stop)), key=operator.itemgetter(0))
+    for caseid, run in runs:
+        if caseid in case_ids:
+            contiguous = False
+        case_ids.add(caseid)
+        trace = [(activity, user, timestamp) for _, activity, user, timestamp in run]
+        if head[0] is None:
+            head = (caseid, trace)
+            continue
+        if held[0] is not None:
+            interior.add_case(held[0], held[1])
+        held = (caseid, trace)
+    durations, interior.D = pack(interior.D), {}
+    return Shard(case_ids, contiguous, head, interior, durations, held)
+
+
+def stitch(shards: List[Shard], summaries: bool = False) -> Optional[pm.Aggregate]:
+    """Merge the shard aggregates in file order stitching cases cut at the shard boundaries.
+
+    Returns None if some case appears in non-adjacent places, as only the sequential grouping matches then.
+    """
+    result = pm.Aggregate(summaries)
+    seen: set[str] = set()
+    carry: Tuple[Optional[str], pm.Trace] = (None, [])
+
+    def flush(case: Tuple[Optional[str], pm.Trace]) -> None:
+        if case[0] is not None:
+            result.add_case(case[0], case[1])
+
+    for shard in shards:
+        if not shard.contiguous:
+            return None
+        first, trace = shard.head
+        if first is None:
+            continue
+        if seen.intersection(shard.case_ids).difference({carry[0]}):
+            return None
+        if first == carry[0]:
+            carry[1].extend(trace)
+        else:
+            if carry[0] in shard.case_ids:
+                return None
+            flush(carry)
+            carry = (first, trace)
+        if shard.tail[0] is not None:
+            flush(carry)
+            shard.interior.D = unpack(shard.durations)
+            result.merge(shard.interior)
+            carry = shard.tail
+        seen.update(shard.case_ids)
+    flush(carry)
+    return result
+
+
+def sequential(path: pathlib.Path, summaries: bool = False) -> pm.Aggregate:
+    """Aggregate the eventlog file in the calling process."""
+    agg = pm.Aggregate(summaries)
+    for caseid, trace in pm.parse_eventlog_csv(path).items():
+        agg.add_case(caseid, trace)
+    return agg
+
+
+def aggregate_file(
+    path: pathlib.Path, jobs: int, min_shard_bytes: int = MIN_SHARD_BYTES, summaries: bool = False
+) -> pm.Aggregate:
+    """Aggregate the eventlog file per up to jobs worker processes (equal to the sequential aggregate).
+
+    Falls back to the sequential aggregation if there is only wun CPU or the file is too small for two shards.
+    """
+    shards = max(1, min(jobs, os.cpu_count() or 1, path.stat().st_size // max(1, min_shard_bytes)))
+    bounds = shard_bounds(path, shards)
+    if len(bounds) < 2:
+        return sequential(path, summaries)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=len(bounds)) as pool:
+        parts = list(pool.map(extract_shard, itertools.repeat(path), *zip(*bounds), itertools.repeat(summaries)))
+
+    stitched = stitch(parts, summaries)
+    return stitched if stitched is not None else sequential(path, summaries)
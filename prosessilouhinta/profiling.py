@@ -0,0 +1,94 @@
+"""Instrumentation of the stages of the commands with wall time, CPU time, rows per second, and memory peaks."""
+
+import contextlib
+import json
+import pathlib
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator
+from typing import Any, Optional
+
+ENCODING = 'utf-8'
+STDERR = '-'
+
+Record = dict[str, Any]
+
+
+class Profile:
+    """Recorder of the stages of wun command emitting a structured JSON timing report.
+
+    While enabled the memory allocations are traced (which slows the stages down noticeably),
+    so the peaks are the maxima of traced memory per stage.
+    A disabled profile records nothing and only yields throw away records from stage.
+    """
+
+    def __init__(self, command: str, enabled: bool = False, target: str = STDERR) -> None:
+        """Initialize the profile of the command (tracing memory if enabled) reporting to target (- is stderr)."""
+        self.command = command
+        self.enabled = enabled
+        self.target = target or STDERR
+        self.stages: list[Record] = []
+        self.started = (time.perf_counter(), time.process_time())
+        self.tracing = enabled and not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[Record]:
+        """Measure the stage (callers may set the processed rows in the yielded record, also later on)."""
+        record: Record = {'stage': name, 'rows': None}
+        if not self.enabled:
+            yield record
+            return
+        tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall
+            record['cpu_seconds'] = time.process_time() - cpu
+            record['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            self.stages.append(record)
+
+    def report(self) -> Record:
+        """Provide the timing report of the stages recorded so far and the totals."""
+        stages = [
+            {
+                **record,
+                'rows_per_second': (
+                    record['rows'] / record['wall_seconds'] if record['rows'] and record['wall_seconds'] else None
+                ),
+            }
+            for record in self.stages
+        ]
+        return {
+            'command': self.command,
+            'stages': stages,
+            'total': {
+                'wall_seconds': time.perf_counter() - self.started[0],
+                'cpu_seconds': time.process_time() - self.started[1],
+                'peak_bytes': max((record['peak_bytes'] for record in self.stages), default=0),
+            },
+        }
+
+    def emit(self) -> None:
+        """Write the timing report (as wun line to stderr or indented to the target file) and stop tracing."""
+        if not self.enabled:
+            return
+        report = self.report()
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+        if self.target == STDERR:
+            print(json.dumps(report), file=sys.stderr)
+            return
+        with open(pathlib.Path(self.target), 'wt', encoding=ENCODING) as handle:
+            json.dump(report, handle, indent=2)
+
+
+def profile_of(command: str, options: Optional[dict[str, Any]], debug: Optional[str] = None) -> Profile:
+    """Create the profile of the command as requested per options (profile, profile_output) or the debug variable."""
+    target = (options or {}).get('profile_output', '')
+    enabled = bool((options or {}).get('profile', False) or target or debug)
+    return Profile(command, enabled, target)
@@ -1,13 +1,28 @@
 """Process mining (Finnish prosessilouhinta) from eventlogs. API."""
 
 import datetime as dti
+import functools
+import itertools
 import json
+import operator
 import os
 import pathlib
 import sys
-from typing import Any, Iterator, List, Optional, Tuple, Union
-
-import prosessilouhinta.cpa as cpa
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+from prosessilouhinta.columnar import EPOCH, ColumnarEventLog
+from prosessilouhinta.compression import ZSTD, decompressed_lines, sniff, zstd_available
+from prosessilouhinta.mapped import MappedSource
+from prosessilouhinta.profiling import profile_of
+from prosessilouhinta.report import FORMATS, JSON, write_report
+from prosessilouhinta.social import CoOccurrence
+from prosessilouhinta.summaries import Summary, TransitionStats, summarize
+from prosessilouhinta.variants import Node, VariantSummary, VariantTrie, end as end_variant
+
+if TYPE_CHECKING:  # pragma: no cover
+    from prosessilouhinta.heuristics import DependencyGraph
+    from prosessilouhinta.vectorized import VectorizedAggregate
 
 DEBUG_VAR = 'PROSESSILOUHINTA_DEBUG'
 DEBUG = os.getenv(DEBUG_VAR)
@@ -16,66 +31,337 @@ ENCODING = 'utf-8'
 ENCODING_ERRORS_POLICY = 'ignore'
 CSV_HEAD_TOKEN = '#'  # nosec B105
 CSV_SEP = ','
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 STDIN, STDOUT = 'STDIN', 'STDOUT'
+PYTHON, NUMPY = 'python', 'numpy'
+BACKENDS = (PYTHON, NUMPY)
 DISPATCH = {
     STDIN: sys.stdin,
     STDOUT: sys.stdout,
 }
 
-EventLog = dict[str, List[Tuple[str, str, dti.datetime]]]
+Event = Tuple[str, str, str, dti.datetime]
+Trace = List[Tuple[str, str, dti.datetime]]
+EventLog = dict[str, Trace]
+Events = Union[EventLog, ColumnarEventLog]
 Activity = dict[str, int]
 Flow = dict[str, dict[str, int]]
 TimeDifference = dict[str, dict[str, List[dti.timedelta]]]
+TimeDifferenceStats = dict[str, dict[str, TransitionStats]]
 TimeDifferenceFloats = dict[str, dict[str, List[float]]]
 AverageTimeDifference = dict[str, dict[str, dti.timedelta]]
 AverageTimeDifferenceFloats = dict[str, dict[str, float]]
 UserActivity = dict[str, list[str]]
-
-
-def activity_counts(events: EventLog) -> Activity:
+Report = dict[str, Any]
+Options = dict[str, Any]
+
+
+class Aggregate:
+    """Accumulate all report sections in a single traversal of the events per case.
+
+    The per event sections (activity counts, control flow, time differences, and work distribution)
+    are updated on every event, while the per case sections (user activities and working together)
+    are derived from the accumulated state on request.
+    The insertion order of all maps equals the order of the separate per section traversals.
+    With summaries the time differences per transition are bounded memory statistics instead of lists.
+    With variants the trace variants are indexed in a prefix tree and the top variants are reported.
+    Closing completed cases folds their users into counted memberships and forgets their state.
+    """
+
+    def __init__(self, summaries: bool = False, variants: int = 0) -> None:
+        """Initialize the empty accumulator (tracking the trace variants to report the top variants if positive)."""
+        self.summaries = summaries
+        self.top_variants = variants
+        self.trie: Optional[VariantTrie] = VariantTrie() if variants > 0 else None
+        self.case_variants: dict[str, Tuple[Node, dti.datetime]] = {}
+        self.A: Activity = {}  # noqa
+        self.F: Flow = {}  # noqa
+        self.D: TimeDifference = {}  # noqa
+        self.S: TimeDifferenceStats = {}  # noqa
+        self.UAC: Flow = {}  # noqa
+        self.case_users: dict[str, set[str]] = {}
+        self.last: dict[str, Tuple[str, dti.datetime]] = {}
+        self.memberships: Counter[frozenset[str]] = Counter()
+
+    @classmethod
+    def of_events(cls, events: Events, summaries: bool = False, variants: int = 0) -> 'Aggregate':
+        """Accumulate all report sections from eventlog in a single traversal per case."""
+        agg = cls(summaries, variants)
+        if isinstance(events, ColumnarEventLog):
+            agg.add_columnar(events)
+            return agg
+
+        for caseid, trace in events.items():
+            agg.add_case(caseid, trace)
+
+        return agg
+
+    def add(self, caseid: str, activity: str, user: str, timestamp: dti.datetime) -> None:
+        """Account for the next event of case caseid."""
+        self.add_case(caseid, [(activity, user, timestamp)])
+
+    def add_case(self, caseid: str, trace: Iterable[Tuple[str, str, dti.datetime]]) -> None:
+        """Account for the events of case caseid in order (continuing the case if seen before)."""
+        A, F, UAC = self.A, self.F, self.UAC  # noqa
+        D: dict[str, dict[str, Any]] = self.S if self.summaries else self.D  # noqa
+        if self.trie is not None:
+            trace = list(trace)
+            if trace:
+                node, first = self.case_variants.get(caseid) or (self.trie.root, trace[0][2])
+                self.case_variants[caseid] = (self.trie.extend(node, map(operator.itemgetter(0), trace)), first)
+        samples = TransitionStats.of if self.summaries else _samples
+        users = self.case_users.get(caseid)
+        if users is None:
+            users = self.case_users[caseid] = set()
+        previous = self.last.get(caseid)
+        for event in trace:
+            ai, ui, ti = event
+            A[ai] = A.get(ai, 0) + 1
+            UA = UAC.get(ui)  # noqa
+            if UA is None:
+                UA = UAC[ui] = {}  # noqa
+            UA[ai] = UA.get(ai, 0) + 1
+            users.add(ui)
+            if previous is not None:
+                ah, th = previous
+                Fh = F.get(ah)  # noqa
+                if Fh is None:
+                    Fh = F[ah] = {}  # noqa
+                    Dh = D[ah] = {}  # noqa
+                else:
+                    Dh = D[ah]  # noqa
+                if ai not in Fh:
+                    Fh[ai] = 1
+                    Dh[ai] = samples(ti - th)
+                else:
+                    Fh[ai] += 1
+                    Dh[ai].append(ti - th)
+            previous = (ai, ti)
+        if previous is not None:
+            self.last[caseid] = previous
+
+    def add_columnar(self, log: ColumnarEventLog) -> None:
+        """Account for the cases of the columnar log in order (working on the codes if nothing was added before)."""
+        if self.trie is not None or self.A:
+            for caseid, trace in log.items():
+                self.add_case(caseid, trace)
+            return
+
+        offsets, names, people = log.offsets, log.activities, log.users
+        events = zip(log.activity_codes.tolist(), log.user_codes.tolist(), log.timestamps.tolist())
+        counts: dict[int, int] = {}
+        flows: dict[int, dict[int, int]] = {}
+        deltas: dict[int, dict[int, list[int]]] = {}
+        work: dict[int, dict[int, int]] = {}
+        for k, caseid in enumerate(log.cases):
+            previous, before = -1, 0
+            users: set[int] = set()
+            for ai, ui, ts in itertools.islice(events, offsets[k + 1] - offsets[k]):
+                counts[ai] = counts.get(ai, 0) + 1
+                UA = work.get(ui)  # noqa
+                if UA is None:
+                    UA = work[ui] = {}  # noqa
+                UA[ai] = UA.get(ai, 0) + 1
+                if previous >= 0:
+                    Fh = flows.get(previous)  # noqa
+                    if Fh is None:
+                        Fh = flows[previous] = {}  # noqa
+                        Dh = deltas[previous] = {}  # noqa
+                    else:
+                        Dh = deltas[previous]  # noqa
+                    if ai not in Fh:
+                        Fh[ai] = 1
+                        Dh[ai] = [ts - before]
+                    else:
+                        Fh[ai] += 1
+                        Dh[ai].append(ts - before)
+                users.add(ui)
+                previous, before = ai, ts
+            self.case_users[caseid] = {people[ui] for ui in users}
+            if previous >= 0:
+                self.last[caseid] = (names[previous], EPOCH + dti.timedelta(seconds=before))
+
+        self.A = {names[ai]: count for ai, count in counts.items()}  # noqa
+        self.F = {names[ah]: {names[ai]: count for ai, count in Fh.items()} for ah, Fh in flows.items()}  # noqa
+        self.UAC = {people[ui]: {names[ai]: count for ai, count in UA.items()} for ui, UA in work.items()}  # noqa
+        D: dict[str, dict[str, Any]] = self.S if self.summaries else self.D  # noqa
+        seconds: dict[int, dti.timedelta] = {}  # shared immutable durations
+        for ah, Dh in deltas.items():
+            Di = D[names[ah]] = {}  # noqa
+            for ai, samples in Dh.items():
+                durations = []
+                for s in samples:
+                    delta = seconds.get(s)
+                    if delta is None:
+                        delta = seconds[s] = dti.timedelta(seconds=s)
+                    durations.append(delta)
+                Di[names[ai]] = summarize(durations) if self.summaries else durations
+
+    def close_case(self, caseid: str) -> None:
+        """Fold the users (and the variant) of the completed case caseid into the memberships and forget the case."""
+        variant = self.case_variants.pop(caseid, None)
+        if variant is not None:
+            node, first = variant
+            end_variant(node, self.last[caseid][1] - first)
+        users = self.case_users.pop(caseid, None)
+        self.last.pop(caseid, None)
+        if users is not None and len(users) > 1:
+            self.memberships[frozenset(users)] += 1
+
+    def merge(self, other: 'Aggregate') -> 'Aggregate':
+        """Fold the aggregate of later cases (disjoint from the cases seen so far) into this wun."""
+        A, F, UAC = self.A, self.F, self.UAC  # noqa
+        for ai, count in other.A.items():
+            A[ai] = A.get(ai, 0) + count
+        for ai, targets in other.F.items():
+            Fi = F.setdefault(ai, {})  # noqa
+            for aj, count in targets.items():
+                Fi[aj] = Fi.get(aj, 0) + count
+        _extend(self.D, other.D)
+        _extend(self.S, other.S)
+        for ui, counts in other.UAC.items():
+            UA = UAC.setdefault(ui, {})  # noqa
+            for ai, count in counts.items():
+                UA[ai] = UA.get(ai, 0) + count
+        self.case_users.update(other.case_users)
+        self.last.update(other.last)
+        self.memberships.update(other.memberships)
+        if self.trie is not None and other.trie is not None:
+            nodes = self.trie.merge(other.trie)
+            self.case_variants.update(
+                (caseid, (nodes[id(node)], first)) for caseid, (node, first) in other.case_variants.items()
+            )
+        return self
+
+    def activity_counts(self) -> Activity:
+        """Provide the activity counts A."""
+        return self.A
+
+    def control_flow(self) -> Flow:
+        """Provide the control flow F."""
+        return self.F
+
+    def time_differences(self) -> TimeDifference:
+        """Provide the time differences D (empty with summaries)."""
+        return self.D
+
+    def time_difference_stats(self) -> TimeDifferenceStats:
+        """Provide the statistics S of the time differences per transition."""
+        if self.summaries:
+            return self.S
+        return {ai: {aj: summarize(samples) for aj, samples in targets.items()} for ai, targets in self.D.items()}
+
+    def time_difference_summaries(self) -> dict[str, dict[str, Summary]]:
+        """Provide the summaries (count, sum, min, max, mean, stdev, and quantiles) of the time differences."""
+        return {
+            ai: {aj: stats.summary() for aj, stats in targets.items()}
+            for ai, targets in self.time_difference_stats().items()
+        }
+
+    def user_activities(self) -> UserActivity:
+        """Provide the sorted activities UA performed by each user."""
+        return {ui: sorted(counts) for ui, counts in self.UAC.items()}
+
+    def work_distribution(self) -> Flow:
+        """Provide the count of activities UAC performed by each user."""
+        return self.UAC
+
+    def co_occurrence(self) -> CoOccurrence:
+        """Provide the sparse counts of the users working together in cases (closed cases first)."""
+        if not self.memberships:
+            return CoOccurrence.of_cases(self.case_users.values())
+        memberships = Counter(self.memberships)
+        memberships.update(frozenset(users) for users in self.case_users.values() if len(users) > 1)
+        return CoOccurrence.of_memberships(memberships)
+
+    def working_together(self) -> Flow:
+        """Provide the working together matrix W."""
+        return self.co_occurrence().nested()
+
+    def dependency_graph(self) -> 'DependencyGraph':
+        """Provide the heuristics miner dependency measures of the control flow (without length two loops)."""
+        from prosessilouhinta.heuristics import DependencyGraph
+
+        return DependencyGraph(self.F)
+
+    def variants(self, top: Optional[int] = None) -> VariantSummary:
+        """Summarize the trace variants (number of variants, cases, and prefixes) listing the top variants."""
+        if self.trie is None:
+            raise ValueError('the trace variants are only tracked by aggregates created with variants')
+        pending: dict[int, List[dti.timedelta]] = {}
+        for caseid, (node, first) in self.case_variants.items():
+            pending.setdefault(id(node), []).append(self.last[caseid][1] - first)
+        return self.trie.summary(top, pending)
+
+    def sections(self) -> Iterator[Tuple[str, Any]]:
+        """Generate the named sections of the extraction report in order, each computed only when reached."""
+        yield 'activity_counts', self.activity_counts()
+        D = self.S if self.summaries else self.D  # noqa
+        yield 'average_time_differences', average_time_differences_as_float(average_time_differences(D))
+        yield 'control_flow', self.control_flow()
+        if self.summaries:
+            yield 'time_difference_summaries', self.time_difference_summaries()
+        else:
+            yield 'time_differences', time_differences_as_float(self.D)
+        yield 'user_activities', self.user_activities()
+        yield 'work_distribution', self.work_distribution()
+        yield 'working_together', self.working_together()
+        if self.trie is not None:
+            yield 'variants', self.variants(self.top_variants)
+
+    def report(self) -> Report:
+        """Provide all sections of the extraction report (time difference summaries instead of lists if requested)."""
+        return dict(self.sections())
+
+
+def _samples(delta: dti.timedelta) -> List[dti.timedelta]:
+    """Start the list of durations of a transition."""
+    return [delta]
+
+
+def _extend(D: dict[str, dict[str, Any]], other: dict[str, dict[str, Any]]) -> None:  # noqa
+    """Extend the durations (lists or statistics) per transition of D by those of other."""
+    for ai, targets in other.items():
+        Di = D.setdefault(ai, {})  # noqa
+        for aj, samples in targets.items():
+            if aj in Di:
+                Di[aj].extend(samples)
+            else:
+                Di[aj] = samples
+
+
+def aggregate(
+    events: Events, backend: str = PYTHON, summaries: bool = False, variants: int = 0
+) -> Union[Aggregate, 'VectorizedAggregate']:
+    """Accumulate all report sections from eventlog in a single traversal per case (or vectorized per backend)."""
+    if backend == NUMPY:
+        from prosessilouhinta.vectorized import VectorizedAggregate
+
+        if not isinstance(events, ColumnarEventLog):
+            events = ColumnarEventLog.from_events(
+                (caseid, activity, user, timestamp)
+                for caseid, trace in events.items()
+                for activity, user, timestamp in trace
+            )
+        return VectorizedAggregate(events)
+
+    return Aggregate.of_events(events, summaries, variants)
+
+
+def activity_counts(events: Events) -> Activity:
     """Calculate the activity counts A from eventlog."""
-    A: Activity = {}  # noqa
-    for caseid in events:
-        for i in range(0, len(events[caseid])):
-            ai = events[caseid][i][0]
-            if ai not in A:
-                A[ai] = 0
-            A[ai] += 1
-
-    return A
+    return aggregate(events).activity_counts()
 
 
-def control_flow(events: EventLog) -> Flow:
+def control_flow(events: Events) -> Flow:
     """Calculate the control flow from eventlog."""
-    F: Flow = {}  # noqa
-    for caseid in events:
-        for i in range(0, len(events[caseid]) - 1):
-            ai = events[caseid][i][0]
-            aj = events[caseid][i + 1][0]
-            if ai not in F:
-                F[ai] = {}
-            if aj not in F[ai]:
-                F[ai][aj] = 0
-            F[ai][aj] += 1
+    return aggregate(events).control_flow()
 
-    return F
 
-
-def time_differences(events: EventLog) -> TimeDifference:
+def time_differences(events: Events) -> TimeDifference:
     """Calculate time differences D from eventlog."""
-    D: TimeDifference = {}  # noqa
-    for caseid in events:
-        for i in range(0, len(events[caseid]) - 1):
-            (ai, _, ti) = events[caseid][i]
-            (aj, _, tj) = events[caseid][i + 1]
-            if ai not in D:
-                D[ai] = {}
-            if aj not in D[ai]:
-                D[ai][aj] = []
-            D[ai][aj].append(tj - ti)
-
-    return D
+    return aggregate(events).time_differences()
 
 
 def time_differences_as_float(D: TimeDifference) -> TimeDifferenceFloats:  # noqa
@@ -89,14 +375,15 @@ def time_differences_as_float(D: TimeDifference) -> TimeDifferenceFloats:  # noq
     return DF
 
 
-def average_time_differences(D: TimeDifference) -> AverageTimeDifference:  # noqa
-    """Average the time differences from D per case transitions."""
+def average_time_differences(D: Union[TimeDifference, TimeDifferenceStats]) -> AverageTimeDifference:  # noqa
+    """Average the time differences from D per case transitions (lists or statistics)."""
     AD: AverageTimeDifference = {}  # noqa
     for ai in sorted(D.keys()):
         AD[ai] = {}
         for aj in sorted(D[ai].keys()):
-            sum_td = sum(D[ai][aj], dti.timedelta(0))
-            count_td = len(D[ai][aj])
+            samples = D[ai][aj]
+            sum_td = samples.total if isinstance(samples, TransitionStats) else sum(samples, dti.timedelta(0))
+            count_td = len(samples)
             avg_td = sum_td / count_td
             avg_td -= dti.timedelta(microseconds=avg_td.microseconds)
             AD[ai][aj] = avg_td
@@ -115,85 +402,170 @@ def average_time_differences_as_float(AD: AverageTimeDifference) -> AverageTimeD
     return ADF
 
 
-def user_activities(events: EventLog) -> UserActivity:
+def user_activities(events: Events) -> UserActivity:
     """Calculate the set of activities UA performed by each user from the eventlog."""
-    UA: UserActivity = {}  # noqa
-    for caseid in events:
-        for i in range(0, len(events[caseid])):
-            ai = events[caseid][i][0]
-            ui = events[caseid][i][1]
-            if ui not in UA:
-                UA[ui] = []
-            if ai not in UA[ui]:
-                UA[ui].append(ai)
+    return aggregate(events).user_activities()
 
-    for u in UA:
-        UA[u].sort()
 
-    return UA
+def work_distribution(events: Events) -> Flow:
+    """Calculate the count of activities UAC performed by each user from the eventlog."""
+    return aggregate(events).work_distribution()
 
 
-def work_distribution(events: EventLog) -> Flow:
-    """Calculate the count of activities UAC performed by each user from the eventlog."""
-    UAC: Flow = {}  # noqa
-    for caseid in events:
-        for i in range(0, len(events[caseid])):
-            ai = events[caseid][i][0]
-            ui = events[caseid][i][1]
-            if ui not in UAC:
-                UAC[ui] = {}
-            if ai not in UAC[ui]:
-                UAC[ui][ai] = 0
-            UAC[ui][ai] += 1
+def working_together(events: Events) -> Flow:
+    """Calculate the working together matrix W from eventlog."""
+    return aggregate(events).working_together()
 
-    return UAC
 
+def aggregate_events(events: Iterable[Event]) -> Aggregate:
+    """Accumulate all report sections from a stream of events without materializing the eventlog.
 
-def working_together(events: EventLog) -> Flow:
-    """Calculate the working together matrix W from eventlog."""
-    W: Flow = {}  # noqa
-    for caseid in events:
-        S = set()  # noqa
-        for i in range(0, len(events[caseid])):
-            ui = events[caseid][i][1]
-            S.add(ui)
-        L = sorted(list(S))  # noqa
-        for i in range(0, len(L) - 1):
-            for j in range(i + 1, len(L)):
-                ui = L[i]
-                uj = L[j]
-                if ui not in W:
-                    W[ui] = {}
-                if uj not in W[ui]:
-                    W[ui][uj] = 0
-                W[ui][uj] += 1
-
-    return W
-
-
-def parse_eventlog_csv(source: Union[pathlib.Path, Iterator[str]]) -> Union[EventLog, Any]:
-    """Parse the eventlog into a map, matching the translation headers to columns."""
-    evemtlog: EventLog = {}
+    For eventlogs with the rows of each case in consecutive lines the result equals the aggregate of the eventlog.
+    """
+    agg = Aggregate()
+    for caseid, run in itertools.groupby(events, key=operator.itemgetter(0)):
+        agg.add_case(caseid, map(operator.itemgetter(1, 2, 3), run))
+
+    return agg
+
+
+@functools.lru_cache(maxsize=None)
+def _date_parts(text: str) -> Tuple[int, int, int]:
+    """Validate and split the date prefix YYYY-mm-dd of a timestamp (memoized per distinct day)."""
+    if len(text) != 10 or text[4] != '-' or text[7] != '-' or not text.isascii() or not text.replace('-', '').isdigit():
+        raise ValueError(f'no date prefix: {text}')
+    return int(text[:4]), int(text[5:7]), int(text[8:])
+
+
+@functools.lru_cache(maxsize=None)
+def _clock_parts(text: str) -> Tuple[int, int, int]:
+    """Validate and split the time of day HH:MM:SS of a timestamp (memoized per distinct second of the day)."""
+    if len(text) != 8 or text[2] != ':' or text[5] != ':' or not text.isascii() or not text.replace(':', '').isdigit():
+        raise ValueError(f'no time of day: {text}')
+    return int(text[:2]), int(text[3:5]), int(text[6:])
+
+
+def parse_timestamp(ts_text: str) -> dti.datetime:
+    """Parse the fixed layout timestamp per memoized date and time parts falling back to strptime (and its errors)."""
+    if len(ts_text) == 19 and ts_text[10] == ' ':
+        try:
+            return dti.datetime(*_date_parts(ts_text[:10]), *_clock_parts(ts_text[11:]))
+        except ValueError:
+            pass
+    return dti.datetime.strptime(ts_text, TS_FORMAT)
+
+
+@functools.lru_cache(maxsize=None)
+def _hour_of_bytes(data: bytes) -> dti.datetime:
+    """Validate and convert the prefix YYYY-mm-dd HH of a byte timestamp to the full hour (memoized per hour)."""
+    if (
+        len(data) != 13
+        or data[4] != 0x2D
+        or data[7] != 0x2D
+        or data[10] != 0x20
+        or not (data[:4] + data[5:7] + data[8:10] + data[11:]).isdigit()
+    ):
+        raise ValueError(f'no date and hour prefix: {data!r}')
+    return dti.datetime(int(data[:4]), int(data[5:7]), int(data[8:10]), int(data[11:]))
+
+
+@functools.lru_cache(maxsize=None)
+def _minutes_of_bytes(data: bytes) -> dti.timedelta:
+    """Validate and convert the suffix MM:SS of a byte timestamp to the offset from the full hour (memoized)."""
+    if len(data) != 5 or data[2] != 0x3A or not (data[:2] + data[3:]).isdigit():
+        raise ValueError(f'no minutes and seconds: {data!r}')
+    minutes, seconds = int(data[:2]), int(data[3:])
+    if minutes > 59 or seconds > 59:
+        raise ValueError(f'minutes or seconds out of range: {data!r}')
+    return dti.timedelta(minutes=minutes, seconds=seconds)
+
+
+def parse_timestamp_bytes(ts_bytes: bytes) -> dti.datetime:
+    """Parse the fixed layout timestamp directly from bytes falling back to the text parser (and its errors).
+
+    Adding the memoized minutes and seconds to the memoized full hour avoids constructing from parts and
+    keeps both memo tables small (at most 3600 entries for the suffixes).
+    """
+    if len(ts_bytes) == 19 and ts_bytes[13] == 0x3A:
+        try:
+            return _hour_of_bytes(ts_bytes[:13]) + _minutes_of_bytes(ts_bytes[14:])
+        except ValueError:
+            pass
+    return parse_timestamp(ts_bytes.decode(ENCODING))
+
+
+def iter_mapped_events(source: MappedSource) -> Iterator[Event]:
+    """Generate the events of the memory mapped eventlog splitting rows and fields on bytes.
+
+    Activities and users are decoded only once per distinct value and shared per intern tables.
+    """
+    head, sep = CSV_HEAD_TOKEN.encode(ENCODING), CSV_SEP.encode(ENCODING)
+    activities: dict[bytes, str] = {}
+    users: dict[bytes, str] = {}
+    case_bytes, caseid = b'', ''
+    for line in source.lines():
+        line = line.strip()
+        if not line or line.startswith(head):
+            continue
+        try:
+            case_b, task_b, user_b, ts_b = line.split(sep, 3)
+            if sep in ts_b:
+                ts_b = ts_b.partition(sep)[0]
+            if case_b != case_bytes:
+                case_bytes, caseid = case_b, case_b.decode(ENCODING)
+            task = activities.get(task_b)
+            if task is None:
+                task = activities[task_b] = task_b.decode(ENCODING)
+            user = users.get(user_b)
+            if user is None:
+                user = users[user_b] = user_b.decode(ENCODING)
+            timestamp = parse_timestamp_bytes(ts_b)
+        except ValueError:  # All statements may raise that wun (including the decoding errors)
+            print(line.decode(ENCODING, errors='replace'))
+            raise
+        yield caseid, task, user, timestamp
+
+
+def iter_events(source: Union[pathlib.Path, Iterator[str], MappedSource]) -> Iterator[Event]:
+    """Generate the events (caseid, activity, user, timestamp) of the eventlog in source order."""
+    if isinstance(source, MappedSource):
+        yield from iter_mapped_events(source)
+        return
     for line in reader(source):
         line = line.strip()
         if not line or line.startswith(CSV_HEAD_TOKEN):
             continue
         try:
-            caseid, task, user, ts_text = line.split(CSV_SEP)[:4]
-            timestamp = dti.datetime.strptime(ts_text, '%Y-%m-%d %H:%M:%S')
+            caseid, task, user, ts_text = line.split(CSV_SEP, 3)
+            if CSV_SEP in ts_text:
+                ts_text = ts_text.partition(CSV_SEP)[0]
+            timestamp = parse_timestamp(ts_text)
         except ValueError:  # Both statements may raise that wun
             print(line)
             raise
-        if caseid not in evemtlog:
-            evemtlog[caseid] = []
-        event = (task, user, timestamp)
-        evemtlog[caseid].append(event)
+        yield caseid, task, user, timestamp
+
+
+def parse_eventlog_csv(source: Union[pathlib.Path, Iterator[str], MappedSource], columnar: bool = False) -> Events:
+    """Parse the eventlog into a map, matching the translation headers to columns (optionally columnar encoded)."""
+    if columnar:
+        return ColumnarEventLog.from_events(iter_events(source))
+    evemtlog: EventLog = {}
+    for caseid, task, user, timestamp in iter_events(source):
+        trace = evemtlog.get(caseid)
+        if trace is None:
+            trace = evemtlog[caseid] = []
+        trace.append((task, user, timestamp))
     return evemtlog
 
 
 def reader(source: Union[pathlib.Path, Iterator[str]]) -> Iterator[str]:
-    """Context wrapper / generator to read the lines."""
+    """Context wrapper / generator to read the lines (decompressing compressed files in a background thread)."""
     if isinstance(source, pathlib.Path):
+        compression = sniff(source)
+        if compression:
+            yield from decompressed_lines(source, compression)
+            return
         with open(source, 'rt', encoding=ENCODING) as handle:
             for line in handle:
                 yield line
@@ -202,7 +574,7 @@ def reader(source: Union[pathlib.Path, Iterator[str]]) -> Iterator[str]:
             yield line
 
 
-def verify_request(argv: Optional[List[str]]) -> Tuple[int, str, List[str]]:
+def verify_request(argv: Optional[List[str]], options: Optional[Options] = None) -> Tuple[int, str, List[str]]:
     """Fail with grace."""
     if not argv or len(argv) != 4:
         return 2, 'received wrong number of arguments', ['']
@@ -212,26 +584,89 @@ def verify_request(argv: Optional[List[str]]) -> Tuple[int, str, List[str]]:
     if command not in ('extract',):
         return 2, 'received unknown command', ['']
 
+    backend = (options or {}).get('backend', PYTHON)
+    if backend not in BACKENDS:
+        return 2, 'received unknown backend', ['']
+
+    if backend == NUMPY:
+        from prosessilouhinta.vectorized import available
+
+        if not available():
+            return 1, 'numpy backend requires numpy', ['']
+
+    jobs = (options or {}).get('jobs', 1)
+    if not isinstance(jobs, int) or jobs < 1:
+        return 2, 'received invalid number of jobs', ['']
+
+    if jobs > 1 and backend != PYTHON:
+        return 2, 'parallel jobs require the python backend', ['']
+
+    if (options or {}).get('summaries', False) and backend != PYTHON:
+        return 2, 'time difference summaries require the python backend', ['']
+
+    if (options or {}).get('format', JSON) not in FORMATS:
+        return 2, 'received unknown format', ['']
+
+    variants = (options or {}).get('variants', 0)
+    if not isinstance(variants, int) or variants < 0:
+        return 2, 'received invalid number of top variants', ['']
+
     if inp:
         if not pathlib.Path(str(inp)).is_file():
             return 1, 'source is no file', ['']
 
-    if out:
-        if pathlib.Path(str(out)).is_file():
+    incremental = (options or {}).get('incremental', False)
+    compression = sniff(pathlib.Path(str(inp))) if inp else None
+    if compression == ZSTD and not zstd_available():
+        return 1, 'zstd compressed source requires zstandard', ['']
+
+    if compression and (jobs > 1 or incremental):
+        return 2, 'compressed source requires a single job and no incremental extraction', ['']
+    if incremental and (not inp or not out):
+        return 2, 'incremental extraction requires source and target files', ['']
+
+    if incremental and (jobs > 1 or backend != PYTHON):
+        return 2, 'incremental extraction requires a single job and the python backend', ['']
+
+    if (options or {}).get('external', False) and (jobs > 1 or backend != PYTHON or incremental):
+        return 2, 'external sort requires a single job, the python backend, and no incremental extraction', ['']
+
+    if variants and (jobs > 1 or backend != PYTHON or incremental):
+        return 2, 'variants require a single job, the python backend, and no incremental extraction', ['']
+
+    if out and pathlib.Path(str(out)).is_file():
+        if not incremental:
             return 1, 'target file exists', ['']
+        from prosessilouhinta.incremental import state_path
+
+        if not state_path(pathlib.Path(str(out))).is_file():  # only reports of earlier incremental runs are updated
+            return 1, 'target file exists without incremental state', ['']
 
     return 0, '', argv
 
 
-def main(argv: Union[List[str], None] = None) -> int:
+def main(argv: Union[List[str], None] = None, options: Optional[Options] = None) -> int:
     """Drive the extraction."""
-    error, message, strings = verify_request(argv)
+    error, message, strings = verify_request(argv, options)
     if error:
         print(message, file=sys.stderr)
         return error
 
     command, inp, out, dryrun = strings
-    source = sys.stdin if not inp else reader(pathlib.Path(inp))
+    backend = (options or {}).get('backend', PYTHON)
+    jobs = (options or {}).get('jobs', 1) if inp else 1
+    incremental = (options or {}).get('incremental', False)
+    summaries = (options or {}).get('summaries')
+    if summaries is None:
+        summaries = incremental  # the state of incremental runs keeps no list of all durations per default
+    fmt = (options or {}).get('format', JSON)
+    external = (options or {}).get('external', False)
+    variants = (options or {}).get('variants', 0)
+    cached = bool(inp) and (options or {}).get('cache', False) and not incremental and jobs == 1 and not external
+    compression = sniff(pathlib.Path(inp)) if inp else None
+    source: Union[pathlib.Path, Iterator[str], MappedSource] = sys.stdin
+    if inp:
+        source = pathlib.Path(inp) if compression else MappedSource(pathlib.Path(inp))
 
     if dryrun:
         print('dryrun requested\n# ---', file=sys.stderr)
@@ -239,25 +674,62 @@ def main(argv: Union[List[str], None] = None) -> int:
         inp_disp = 'STDIN' if not inp else f'"{inp}"'
         out_disp = 'STDOUT' if not out else f'"{out}"'
         print(f'  - input from:       {inp_disp}', file=sys.stderr)
+        if compression:
+            print(f'  - compression:      {compression}', file=sys.stderr)
         print(f'  - output to:        {out_disp}', file=sys.stderr)
+        print(f'  - backend:          {backend}', file=sys.stderr)
+        print(f'  - jobs:             {jobs}', file=sys.stderr)
+        print(f'  - time differences: {"summaries" if summaries else "lists"}', file=sys.stderr)
+        print(f'  - format:           {fmt}', file=sys.stderr)
+        if variants:
+            print(f'  - top variants:     {variants}', file=sys.stderr)
+        if external:
+            print('  - events sorted:    per case and timestamp (external)', file=sys.stderr)
+        if cached:
+            from prosessilouhinta.cache import default_folder
+
+            print(f'  - parse cache:      "{default_folder()}"', file=sys.stderr)
+        if incremental:
+            from prosessilouhinta.incremental import state_path
+
+            print(f'  - state file:       "{state_path(pathlib.Path(out))}"', file=sys.stderr)
         return 0
 
-    eventlog = parse_eventlog_csv(source)
-    D = time_differences(eventlog)  # noqa
-    report = {
-        'activity_counts': activity_counts(eventlog),
-        'average_time_differences': average_time_differences_as_float(average_time_differences(D)),
-        'control_flow': control_flow(eventlog),
-        'time_differences': time_differences_as_float(D),
-        'user_activities': user_activities(eventlog),
-        'work_distribution': work_distribution(eventlog),
-        'working_together': working_together(eventlog),
-    }
-    if not out:
-        json.dump(report, sys.stdout)
-    else:
-        with open(pathlib.Path(out), 'wt', encoding=ENCODING) as handle:
-            json.dump(report, handle)
+    profile = profile_of(command, options, DEBUG)
+    agg: Union[Aggregate, 'VectorizedAggregate']
+    try:
+        if incremental or jobs > 1 or external:
+            with profile.stage('extract') as record:
+                if incremental:
+                    from prosessilouhinta.incremental import extract as extract_incremental, state_path
+
+                    agg = extract_incremental(pathlib.Path(inp), state_path(pathlib.Path(out)), summaries)
+                elif jobs > 1:
+                    from prosessilouhinta.parallel import aggregate_file
+
+                    agg = aggregate_file(pathlib.Path(inp), jobs, summaries=summaries)
+                else:
+                    from prosessilouhinta.external import aggregate_sorted
+
+                    agg = aggregate_sorted(iter_events(source), summaries=summaries, variants=variants)
+                record['rows'] = sum(agg.activity_counts().values())
+        else:
+            eventlog: Events
+            with profile.stage('parse') as parsed:
+                if cached:
+                    from prosessilouhinta.cache import parse_cached
+
+                    eventlog = parse_cached(pathlib.Path(inp))
+                else:
+                    eventlog = parse_eventlog_csv(source, columnar=backend == NUMPY)
+            with profile.stage('aggregate') as record:
+                agg = aggregate(eventlog, backend, summaries, variants)
+                parsed['rows'] = record['rows'] = sum(agg.activity_counts().values())
+
+        with profile.stage('report'):  # the sections are computed wun at a time while written
+            write_report(agg.sections(), pathlib.Path(out) if out else None, fmt)
+    finally:
+        profile.emit()  # also the stages up to a failure (and stops tracing)
 
     return 0
 
@@ -279,7 +751,7 @@ def verify_cpa_request(argv: Optional[List[str]]) -> Tuple[int, str, List[str]]:
     return 0, '', argv
 
 
-def cpa_dia(argv: Union[List[str], None] = None) -> int:
+def cpa_dia(argv: Union[List[str], None] = None, options: Optional[Options] = None) -> int:
     """Drive the CPA diagramming."""
     error, message, strings = verify_cpa_request(argv)
     if error:
@@ -288,11 +760,37 @@ def cpa_dia(argv: Union[List[str], None] = None) -> int:
 
     command, inp = strings
 
-    with open(inp, 'rt', encoding='utf-8') as handle:
-        peek = json.load(handle)  # TODO not elegant and plausible use case to not state the name ...
-
-    p = cpa.Node(peek.get('name', 'no-name-found-for-project - check your data'))
-    p.load_network(str(inp))
-    print(p.aon_diagram_text_dump())
+    import prosessilouhinta.cpa as cpa
+    from prosessilouhinta.network import CompactNetwork, integral
+
+    profile = profile_of(command, options, DEBUG)
+    try:
+        with profile.stage('load') as record:  # includes the update of all timings
+            with open(inp, 'rt', encoding='utf-8') as handle:
+                peek = json.load(handle)  # TODO not elegant and plausible use case to not state the name ...
+
+            name = peek.get('name', 'no-name-found-for-project - check your data')
+            p: Union[CompactNetwork, cpa.Node]
+            if integral(peek):
+                p = CompactNetwork.load_network(str(inp), name)
+            else:  # the node based model keeps the int and float values per node
+                p = project = cpa.Node(name)
+                project.load_network(str(inp))
+            rows = len(p) if isinstance(p, CompactNetwork) else len(p.nodes)
+            record['rows'] = rows
+        with profile.stage('diagram') as record:
+            print(p.aon_diagram_text_dump())
+            record['rows'] = rows
+    finally:
+        profile.emit()  # also the stages up to a failure (and stops tracing)
 
     return 0
+
+
+def __getattr__(name: str) -> Any:
+    """Provide the CPA module as attribute cpa on first access (kept out of the imports of the extraction)."""
+    if name == 'cpa':
+        import prosessilouhinta.cpa as cpa
+
+        return cpa
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
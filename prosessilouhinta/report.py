@@ -0,0 +1,183 @@
+"""Streaming report writers (JSON, NDJSON, and a binary container) and loaders of selected sections."""
+
+import array
+import json
+import pathlib
+import struct
+import sys
+from collections.abc import Collection, Iterable
+from typing import IO, Any, Optional
+
+JSON = 'json'
+NDJSON = 'ndjson'
+BINARY = 'binary'
+FORMATS = (JSON, NDJSON, BINARY)
+
+ENCODING = 'utf-8'
+MAGIC = b'PLR1'
+TRAILER = struct.Struct('<Q4s')  # byte length of the JSON footer index and the magic
+FLOAT64 = 'float64'
+ARRAY_SECTIONS = ('time_differences',)
+
+Section = tuple[str, Any]
+Report = dict[str, Any]
+
+
+def write_json(sections: Iterable[Section], handle: IO[str]) -> None:
+    """Write the sections wun at a time as JSON object (identical to json.dump of the complete report)."""
+    encoder = json.JSONEncoder()
+    handle.write('{')
+    for k, (name, value) in enumerate(sections):
+        handle.write(f'{", " if k else ""}{encoder.encode(name)}: ')
+        for chunk in encoder.iterencode(value):
+            handle.write(chunk)
+    handle.write('}')
+
+
+def write_ndjson(sections: Iterable[Section], handle: IO[str]) -> None:
+    """Write the sections as wun JSON record per line and entry (per transition for the nested sections).
+
+    Every section starts with a record holding only the section name, followed by records with key and value,
+    or key, item, and value for the entries of nested maps.
+    """
+    encode = json.JSONEncoder().encode
+    for name, value in sections:
+        handle.write(f'{encode({"section": name})}\n')
+        for key, entry in value.items():
+            if isinstance(entry, dict) and entry:
+                for item, leaf in entry.items():
+                    handle.write(f'{encode({"section": name, "key": key, "item": item, "value": leaf})}\n')
+            else:
+                handle.write(f'{encode({"section": name, "key": key, "value": entry})}\n')
+
+
+def write_binary(sections: Iterable[Section], handle: IO[bytes]) -> None:
+    """Write the sections as blobs followed by a JSON footer index and the trailer (requires no seeking).
+
+    The numeric arrays of the time differences are stored as wun little endian float64 blob in entry order
+    with the counts per transition in a separate JSON blob, all other sections as JSON blobs.
+    """
+    position = len(MAGIC)
+    handle.write(MAGIC)
+    index: list[dict[str, Any]] = []
+
+    def blob(data: bytes) -> tuple[int, int]:
+        nonlocal position
+        handle.write(data)
+        offset, position = position, position + len(data)
+        return offset, len(data)
+
+    for name, value in sections:
+        if name in ARRAY_SECTIONS:
+            start = position
+            counts: dict[str, dict[str, int]] = {}
+            for ai, targets in value.items():
+                counts[ai] = {}
+                for aj, samples in targets.items():
+                    values = array.array('d', samples)
+                    if sys.byteorder != 'little':  # pragma: no cover
+                        values.byteswap()
+                    blob(values.tobytes())
+                    counts[ai][aj] = len(values)
+            keys_offset, keys_length = blob(json.dumps(counts).encode(ENCODING))
+            entry = {'offset': start, 'length': keys_offset - start, 'keys_offset': keys_offset}
+            index.append({'name': name, 'encoding': FLOAT64, **entry, 'keys_length': keys_length})
+        else:
+            offset, length = blob(json.dumps(value).encode(ENCODING))
+            index.append({'name': name, 'encoding': JSON, 'offset': offset, 'length': length})
+
+    footer = json.dumps({'sections': index}).encode(ENCODING)
+    handle.write(footer)
+    handle.write(TRAILER.pack(len(footer), MAGIC))
+
+
+def write_report(sections: Iterable[Section], target: Optional[pathlib.Path], fmt: str = JSON) -> None:
+    """Write the report sections in the format to the target file (or standard out)."""
+    if fmt == BINARY:
+        if target is None:
+            write_binary(sections, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+            return
+        with open(target, 'wb') as raw:
+            write_binary(sections, raw)
+        return
+
+    writer = write_ndjson if fmt == NDJSON else write_json
+    if target is None:
+        writer(sections, sys.stdout)
+        return
+    with open(target, 'wt', encoding=ENCODING) as handle:
+        writer(sections, handle)
+
+
+def sniff(path: pathlib.Path) -> str:
+    """Detect the format of the report file."""
+    with open(path, 'rb') as handle:
+        head = handle.read(len(MAGIC) + 12)
+    if head.startswith(MAGIC):
+        return BINARY
+    return NDJSON if head.startswith(b'{"section": ') else JSON
+
+
+def load_binary(path: pathlib.Path, names: Optional[Collection[str]] = None) -> Report:
+    """Load the named sections (default all) from the binary report reading only their blobs."""
+    report: Report = {}
+    with open(path, 'rb') as handle:
+        handle.seek(-TRAILER.size, 2)
+        footer_length, magic = TRAILER.unpack(handle.read(TRAILER.size))
+        if magic != MAGIC:
+            raise ValueError(f'no binary report: {path}')
+        handle.seek(-TRAILER.size - footer_length, 2)
+        index = json.loads(handle.read(footer_length))
+        for entry in index['sections']:
+            if names is not None and entry['name'] not in names:
+                continue
+            handle.seek(entry['offset'])
+            data = handle.read(entry['length'])
+            if entry['encoding'] != FLOAT64:
+                report[entry['name']] = json.loads(data)
+                continue
+            values = array.array('d')
+            values.frombytes(data)
+            if sys.byteorder != 'little':  # pragma: no cover
+                values.byteswap()
+            handle.seek(entry['keys_offset'])
+            counts = json.loads(handle.read(entry['keys_length']))
+            section: dict[str, dict[str, list[float]]] = {}
+            start = 0
+            for ai, targets in counts.items():
+                section[ai] = {}
+                for aj, count in targets.items():
+                    section[ai][aj] = values[start : start + count].tolist()
+                    start += count
+            report[entry['name']] = section
+    return report
+
+
+def load_ndjson(path: pathlib.Path, names: Optional[Collection[str]] = None) -> Report:
+    """Load the named sections (default all) from the NDJSON report parsing only their records."""
+    report: Report = {}
+    wanted = None if names is None else tuple(f'{{"section": {json.dumps(name)}' for name in names)
+    with open(path, 'rt', encoding=ENCODING) as handle:
+        for line in handle:
+            if wanted is not None and not line.startswith(wanted):
+                continue
+            record = json.loads(line)
+            section = report.setdefault(record['section'], {})
+            if 'item' in record:
+                section.setdefault(record['key'], {})[record['item']] = record['value']
+            elif 'key' in record:
+                section[record['key']] = record['value']
+    return report
+
+
+def load_sections(path: pathlib.Path, names: Optional[Collection[str]] = None, fmt: Optional[str] = None) -> Report:
+    """Load the named sections (default all) of the report file in the format (default sniffed)."""
+    fmt = fmt or sniff(path)
+    if fmt == BINARY:
+        return load_binary(path, names)
+    if fmt == NDJSON:
+        return load_ndjson(path, names)
+    with open(path, 'rt', encoding=ENCODING) as handle:
+        report = json.load(handle)
+    return report if names is None else {name: value for name, value in report.items() if name in names}
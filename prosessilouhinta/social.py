@@ -0,0 +1,86 @@
+"""Sparse engine for the social network metrics (users working together in cases)."""
+
+import array
+from collections import Counter
+from collections.abc import Collection, Iterable, Mapping
+
+Flow = dict[str, dict[str, int]]
+Triplet = tuple[str, str, int]
+CODE_TYPE = 'i'  # 32 bit signed integer codes of users
+COUNT_TYPE = 'q'
+
+
+class CoOccurrence:
+    """Counts of user pairs working together in cases stored sparse per row (the lesser user of each pair).
+
+    Cases with the same set of users are counted wunce per distinct set (weighted by the number of cases).
+    Rows and columns keep the order of first appearance, so the rows are the original matrix W.
+    The users are integer coded in name order only for the coordinate export.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the empty engine."""
+        self.rows: Flow = {}
+
+    @classmethod
+    def of_cases(cls, cases: Iterable[Collection[str]]) -> 'CoOccurrence':
+        """Count the user pairs of the cases given as collections of the users per case."""
+        return cls.of_memberships(Counter(frozenset(users) for users in cases if len(users) > 1))
+
+    @classmethod
+    def of_memberships(cls, memberships: Mapping[frozenset[str], int]) -> 'CoOccurrence':
+        """Count the user pairs of the distinct sets of users per case weighted by their number of cases."""
+        engine = cls()
+        rows = engine.rows
+        for members, weight in memberships.items():
+            L = sorted(members)  # noqa
+            for k in range(len(L) - 1):
+                row = rows.get(L[k])
+                if row is None:
+                    row = rows[L[k]] = {}
+                for other in L[k + 1 :]:
+                    row[other] = row.get(other, 0) + weight
+        return engine
+
+    @classmethod
+    def of_pairs(
+        cls, counts: Mapping[str, Mapping[str, int]], firsts: Mapping[str, Mapping[str, int]]
+    ) -> 'CoOccurrence':
+        """Arrange the counts of the user pairs given per lesser and other user with the index of their first case.
+
+        A row starts at the first case of its first pair, so ordering the rows by that case and the user and the pairs
+        in a row by their first case and the other user equals the order of counting the cases wun by wun.
+        """
+        starts = {user: min(row.values()) for user, row in firsts.items() if row}
+        engine = cls()
+        for user in sorted(starts, key=lambda user: (starts[user], user)):
+            row, first = counts[user], firsts[user]
+            engine.rows[user] = {other: row[other] for other in sorted(row, key=lambda other: (first[other], other))}
+        return engine
+
+    def __len__(self) -> int:
+        """Count the user pairs that worked together (the non-zero entries)."""
+        return sum(len(row) for row in self.rows.values())
+
+    def users(self) -> list[str]:
+        """List the users of all pairs in name order (the index of a user is its code)."""
+        return sorted(set(self.rows).union(*self.rows.values()))
+
+    def nested(self) -> Flow:
+        """Export the counts as nested map (the working together matrix W)."""
+        return self.rows
+
+    def triplets(self) -> list[Triplet]:
+        """Export the counts as sparse triplets (user, other user, count) in the row order of the nested map."""
+        return [(user, other, count) for user, row in self.rows.items() for other, count in row.items()]
+
+    def coo(self) -> tuple[list[str], array.array, array.array, array.array]:  # type: ignore
+        """Export the users and the counts in coordinate format as row codes, column codes, and counts."""
+        users = self.users()
+        code = {user: k for k, user in enumerate(users)}
+        rows, cols, counts = array.array(CODE_TYPE), array.array(CODE_TYPE), array.array(COUNT_TYPE)
+        for user, row in self.rows.items():
+            rows.extend([code[user]] * len(row))
+            cols.extend(code[other] for other in row)
+            counts.extend(row.values())
+        return users, rows, cols, counts
@@ -0,0 +1,179 @@
+"""Bounded memory online statistics of transition durations with a mergeable quantile sketch."""
+
+import datetime as dti
+import math
+from typing import Any, Optional, Union
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+QUANTILES = (0.5, 0.9, 0.99)
+MICROSECOND = dti.timedelta(microseconds=1)
+
+Summary = dict[str, Union[int, float]]
+
+
+def bucket_of(seconds: float) -> int:
+    """Map the positive magnitude to the index of its logarithmic bucket."""
+    return math.ceil(math.log(seconds) / LOG_GAMMA)
+
+
+def value_of(bucket: int) -> float:
+    """Map the bucket index to the representative magnitude (within the relative accuracy of all members)."""
+    return 2 * GAMMA**bucket / (GAMMA + 1)
+
+
+def summarize(samples: Union[list[dti.timedelta], 'TransitionStats']) -> 'TransitionStats':
+    """Provide the statistics of the durations (as is if already statistics)."""
+    if isinstance(samples, TransitionStats):
+        return samples
+    stats = TransitionStats()
+    for delta in samples:
+        stats.append(delta)
+    return stats
+
+
+class TransitionStats:
+    """Online aggregates of the durations of a transition replacing the list of all durations.
+
+    Keeps count, exact sum, minimum, maximum, mean and variance per Welford, and a logarithmic
+    bucket sketch (quantiles within 1% relative error) that merges by adding bucket counts.
+    Provides append and extend like the list it replaces.
+    """
+
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'mean', 'm2', 'zeros', 'positive', 'negative')
+
+    def __init__(self) -> None:
+        """Initialize the empty statistics."""
+        self.count = 0
+        self.total = dti.timedelta(0)
+        self.minimum: Optional[dti.timedelta] = None
+        self.maximum: Optional[dti.timedelta] = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.zeros = 0
+        self.positive: dict[int, int] = {}
+        self.negative: dict[int, int] = {}
+
+    @classmethod
+    def of(cls, delta: dti.timedelta) -> 'TransitionStats':
+        """Start the statistics with a first duration."""
+        stats = cls()
+        stats.append(delta)
+        return stats
+
+    def append(self, delta: dti.timedelta) -> None:
+        """Account for the next duration."""
+        self.count += 1
+        self.total += delta
+        if self.minimum is None or delta < self.minimum:
+            self.minimum = delta
+        if self.maximum is None or delta > self.maximum:
+            self.maximum = delta
+        seconds = delta.total_seconds()
+        step = seconds - self.mean
+        self.mean += step / self.count
+        self.m2 += step * (seconds - self.mean)
+        if seconds > 0:
+            bucket = bucket_of(seconds)
+            self.positive[bucket] = self.positive.get(bucket, 0) + 1
+        elif seconds < 0:
+            bucket = bucket_of(-seconds)
+            self.negative[bucket] = self.negative.get(bucket, 0) + 1
+        else:
+            self.zeros += 1
+
+    def extend(self, other: 'TransitionStats') -> None:
+        """Merge the statistics of other (parallel variant of Welford for mean and variance)."""
+        if not other.count:
+            return
+        if not self.count:
+            self.mean, self.m2 = other.mean, other.m2
+        else:
+            count = self.count + other.count
+            step = other.mean - self.mean
+            self.mean += step * other.count / count
+            self.m2 += other.m2 + step * step * self.count * other.count / count
+        self.count += other.count
+        self.total += other.total
+        if self.minimum is None or (other.minimum is not None and other.minimum < self.minimum):
+            self.minimum = other.minimum
+        if self.maximum is None or (other.maximum is not None and other.maximum > self.maximum):
+            self.maximum = other.maximum
+        self.zeros += other.zeros
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for bucket, count in theirs.items():
+                mine[bucket] = mine.get(bucket, 0) + count
+
+    def __len__(self) -> int:
+        """Count the durations."""
+        return self.count
+
+    def variance(self) -> float:
+        """Estimate the sample variance (zero for less than two durations)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile of the durations in seconds (within the relative accuracy of the sketch)."""
+        if not self.count or self.minimum is None or self.maximum is None:
+            raise ValueError('no durations to estimate quantiles from')
+        rank = q * (self.count - 1)
+        seen = 0
+        estimate = 0.0
+        for bucket in sorted(self.negative, reverse=True):
+            seen += self.negative[bucket]
+            if seen > rank:
+                estimate = -value_of(bucket)
+                break
+        else:
+            seen += self.zeros
+            if seen <= rank:
+                for bucket in sorted(self.positive):
+                    seen += self.positive[bucket]
+                    if seen > rank:
+                        estimate = value_of(bucket)
+                        break
+        return min(max(estimate, self.minimum.total_seconds()), self.maximum.total_seconds())
+
+    def summary(self) -> Summary:
+        """Provide the statistics as JSON serializable map with durations in float seconds."""
+        if not self.count or self.minimum is None or self.maximum is None:
+            return {'count': 0}
+        summary: Summary = {
+            'count': self.count,
+            'sum': self.total.total_seconds(),
+            'min': self.minimum.total_seconds(),
+            'max': self.maximum.total_seconds(),
+            'mean': self.mean,
+            'stdev': math.sqrt(self.variance()),
+        }
+        for q in QUANTILES:
+            summary[f'p{round(q * 100)}'] = self.quantile(q)
+        return summary
+
+    def state(self) -> dict[str, Any]:
+        """Provide the complete (mergeable) state as JSON serializable map with durations in microseconds."""
+        return {
+            'count': self.count,
+            'total_us': self.total // MICROSECOND,
+            'min_us': None if self.minimum is None else self.minimum // MICROSECOND,
+            'max_us': None if self.maximum is None else self.maximum // MICROSECOND,
+            'mean': self.mean,
+            'm2': self.m2,
+            'zeros': self.zeros,
+            'positive': [[bucket, count] for bucket, count in self.positive.items()],
+            'negative': [[bucket, count] for bucket, count in self.negative.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> 'TransitionStats':
+        """Restore the statistics from the state map."""
+        stats = cls()
+        stats.count = state['count']
+        stats.total = dti.timedelta(microseconds=state['total_us'])
+        stats.minimum = None if state['min_us'] is None else dti.timedelta(microseconds=state['min_us'])
+        stats.maximum = None if state['max_us'] is None else dti.timedelta(microseconds=state['max_us'])
+        stats.mean, stats.m2, stats.zeros = state['mean'], state['m2'], state['zeros']
+        stats.positive = {bucket: count for bucket, count in state['positive']}
+        stats.negative = {bucket: count for bucket, count in state['negative']}
+        return stats
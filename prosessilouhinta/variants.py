@@ -0,0 +1,118 @@
+"""Prefix tree (trie) index of the trace variants counting the cases and throughput times per variant."""
+
+import datetime as dti
+import heapq
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any, Optional
+
+from prosessilouhinta.summaries import TransitionStats
+
+Node = dict[Any, Any]  # the child prefixes per next activity and the statistics of the cases ending here at END
+Variant = tuple[str, ...]
+VariantSummary = dict[str, Any]
+END = None
+
+
+def end(node: Node, throughput: dti.timedelta) -> None:
+    """Account for a case with the throughput time ending in the prefix node."""
+    stats = node.get(END)
+    if stats is None:
+        node[END] = TransitionStats.of(throughput)
+    else:
+        stats.append(throughput)
+
+
+def children(node: Node) -> Iterator[tuple[str, Node]]:
+    """Generate the next activities and the child prefixes of the prefix node in order of first appearance."""
+    return ((activity, child) for activity, child in node.items() if activity is not END)
+
+
+class VariantTrie:
+    """Trace variants stored as paths of a prefix tree so memory grows with the distinct prefixes only.
+
+    The children keep the order of first appearance, so the variants enumerate in order of first appearance
+    of their prefixes and equally frequent variants keep that order in the top k.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the empty index."""
+        self.root: Node = {}
+        self.prefixes = 0  # the distinct prefixes are the nodes without the root
+
+    def extend(self, node: Node, activities: Iterable[str]) -> Node:
+        """Provide the prefix of node extended by the activities in order (creating the unseen prefixes)."""
+        for activity in activities:
+            child = node.get(activity)
+            if child is None:
+                child = node[activity] = {}
+                self.prefixes += 1
+            node = child
+        return node
+
+    def add(self, activities: Iterable[str], throughput: dti.timedelta) -> Node:
+        """Account for a complete case with the activities in order and the throughput time."""
+        node = self.extend(self.root, activities)
+        end(node, throughput)
+        return node
+
+    def merge(self, other: 'VariantTrie') -> dict[int, Node]:
+        """Fold the other index into this wun and map the identities of the other nodes to the nodes here."""
+        mapping: dict[int, Node] = {}
+        stack = [(other.root, self.root)]
+        while stack:
+            theirs, ours = stack.pop()
+            mapping[id(theirs)] = ours
+            if END in theirs:
+                ours.setdefault(END, TransitionStats()).extend(theirs[END])
+            stack.extend((child, self.extend(ours, (activity,))) for activity, child in children(theirs))
+        return mapping
+
+    def walk(self) -> Iterator[tuple[int, str, Node]]:
+        """Generate the depth, the last activity, and the node of all prefixes (depth first in order of appearance)."""
+        stack = [(0, '', self.root)]
+        while stack:
+            depth, activity, node = stack.pop()
+            yield depth, activity, node
+            stack.extend((depth + 1, label, child) for label, child in reversed(list(children(node))))
+
+    def __len__(self) -> int:
+        """Count the distinct variants."""
+        return sum(1 for _, _, node in self.walk() if END in node)
+
+    def summary(
+        self, top: Optional[int] = None, pending: Optional[Mapping[int, list[dti.timedelta]]] = None
+    ) -> VariantSummary:
+        """Summarize the number of variants and cases and list the (top k) most frequent variants.
+
+        Each listed variant provides its activities, its number of cases, and the statistics of its throughput times.
+        Pending cases (not closed yet, given per end node identity) are only accounted in copies of the statistics,
+        so the index stays unchanged. Only the listed variants are spelled out and summarized.
+        """
+        pending = pending or {}
+        ranked: list[tuple[int, int, Variant, Node]] = []  # min heap of (cases, -rank, variant, node)
+        path: list[str] = []
+        variants = cases = 0
+        for rank, (depth, activity, node) in enumerate(self.walk()):
+            if depth:
+                del path[depth - 1 :]
+                path.append(activity)
+            count = (len(node[END]) if END in node else 0) + len(pending.get(id(node), ()))
+            if not count:
+                continue
+            variants += 1
+            cases += count
+            if top is None or len(ranked) < top:
+                heapq.heappush(ranked, (count, -rank, tuple(path), node))
+            elif top and (count, -rank) > ranked[0][:2]:
+                heapq.heapreplace(ranked, (count, -rank, tuple(path), node))
+
+        listed = []
+        for count, _, variant, node in sorted(ranked, key=lambda item: item[:2], reverse=True):
+            stats = node.get(END)
+            extra = pending.get(id(node))
+            if extra:
+                stats = TransitionStats() if stats is None else TransitionStats.from_state(stats.state())
+                for throughput in extra:
+                    stats.append(throughput)
+            listed.append({'activities': list(variant), 'cases': count, 'throughput': stats.summary()})  # type: ignore
+        return {'variants': variants, 'cases': cases, 'prefixes': self.prefixes, 'top': listed}
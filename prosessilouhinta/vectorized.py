@@ -0,0 +1,291 @@
+"""Vectorized (NumPy) backend computing the report sections from columnar eventlogs."""
+
+import datetime as dti
+from collections.abc import Iterator
+from typing import Any
+
+import prosessilouhinta.heuristics as heuristics
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.columnar import ColumnarEventLog
+from prosessilouhinta.social import CoOccurrence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]  # numpy is optional and available() guards every use
+
+
+def available() -> bool:
+    """Determine if the vectorized backend can be used."""
+    return np is not None
+
+
+def column(values: Any) -> Any:
+    """Provide a zero copy NumPy view on the array module buffer."""
+    return np.frombuffer(values, dtype=np.dtype(values.typecode))
+
+
+def first_seen_groups(keys: Any) -> tuple[Any, Any, Any]:
+    """Group equal keys providing the stable sort order, the group bounds, and the groups in order of first sight.
+
+    The positions order[bounds[g]:bounds[g + 1]] hold the key of group g in ascending position order.
+    """
+    order = np.argsort(keys, kind='stable')
+    ordered = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))[: keys.size]
+    bounds = np.append(starts, keys.size)
+    seen = np.argsort(order[starts], kind='stable')
+    return order, bounds, seen
+
+
+def transitions(log: ColumnarEventLog) -> tuple[Any, Any]:
+    """Provide the directly follows pair codes (from * |A| + to) and durations in seconds masked at case boundaries."""
+    acts = column(log.activity_codes).astype(np.int64)
+    if acts.size < 2:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    keep = np.ones(acts.size - 1, dtype=bool)
+    keep[column(log.offsets)[1:-1] - 1] = False
+    pairs = acts[:-1] * len(log.activities) + acts[1:]
+    deltas = np.diff(column(log.timestamps))
+    return pairs[keep], deltas[keep]
+
+
+def flow_matrix(log: ColumnarEventLog) -> Any:
+    """Count the directly follows relations as dense |A| x |A| matrix indexed by activity codes."""
+    n = len(log.activities)
+    pairs, _ = transitions(log)
+    return np.bincount(pairs, minlength=n * n).reshape(n, n)
+
+
+def loop_matrix(log: ColumnarEventLog) -> Any:
+    """Count the length two loop patterns a b a (a >> b) as dense |A| x |A| matrix indexed by activity codes."""
+    n = len(log.activities)
+    acts = column(log.activity_codes).astype(np.int64)
+    if acts.size < 3:
+        return np.zeros((n, n), dtype=np.int64)
+    keep = (acts[:-2] == acts[2:]) & (acts[:-2] != acts[1:-1])
+    inner = column(log.offsets)[1:-1].astype(np.int64)
+    crossing = np.concatenate((inner - 1, inner - 2))  # patterns starting wun or two events before a case start
+    keep[crossing[(crossing >= 0) & (crossing < keep.size)]] = False
+    return np.bincount(acts[:-2][keep] * n + acts[1:-1][keep], minlength=n * n).reshape(n, n)
+
+
+class MatrixDependencyGraph:
+    """Dependency measures of all activity pairs as dense matrices computed wunce per array operations.
+
+    Applying thresholds only compares the matrices, so sweeping thresholds stays interactive for large logs.
+    The discovered nets equal those of the heuristics.DependencyGraph of the eventlog.
+    """
+
+    def __init__(self, log: ColumnarEventLog) -> None:
+        """Compute the dependency, length wun loop, and length two loop measure matrices."""
+        if not available():
+            raise ImportError('the numpy backend requires numpy to be installed')
+        self.names = log.activities
+        self.counts = flow_matrix(log)
+        forward = self.counts.astype(np.float64)
+        self.dependency = (forward - forward.T) / (forward + forward.T + 1)
+        np.fill_diagonal(self.dependency, np.nan)
+        diagonal = np.diag(forward)
+        self.length_one = diagonal / (diagonal + 1)
+        loops = loop_matrix(log).astype(np.float64)
+        both = np.triu(loops + loops.T, 1)
+        self.length_two = np.where(both > 0, both / (both + 1), 0.0)
+
+    def discover(
+        self,
+        frequency: int = heuristics.FREQUENCY,
+        dependency: float = heuristics.DEPENDENCY,
+        length_one: float = heuristics.LENGTH_ONE,
+        length_two: float = heuristics.LENGTH_TWO,
+    ) -> heuristics.Net:
+        """Apply the thresholds providing the arcs with their measures and the length wun and two loops."""
+        names, frequent = self.names, self.counts >= max(frequency, 1)
+        measures = np.where(frequent & (self.dependency >= dependency), self.dependency, np.nan)
+        ones = np.flatnonzero(np.diag(frequent) & (self.length_one >= length_one))
+        measures[ones, ones] = self.length_one[ones]
+        singles = np.zeros(len(names), dtype=bool)
+        singles[ones] = True
+        rows, cols = np.nonzero((self.length_two > 0) & (self.length_two >= length_two))
+        twos = ~singles[rows] & ~singles[cols]
+        rows, cols = rows[twos], cols[twos]
+        loop_measures = self.length_two[rows, cols]
+        for x, y in ((rows, cols), (cols, rows)):
+            measures[x, y] = np.fmax(measures[x, y], loop_measures)
+        arcs: heuristics.Measures = {}
+        sources, targets = np.nonzero(~np.isnan(measures))
+        for a, b, measure in zip(sources.tolist(), targets.tolist(), measures[sources, targets].tolist()):
+            arcs.setdefault(names[a], {})[names[b]] = measure
+        return {
+            'arcs': {a: dict(sorted(arcs[a].items())) for a in sorted(arcs)},
+            'length_one_loops': sorted(names[a] for a in ones.tolist()),
+            'length_two_loops': sorted(sorted([names[a], names[b]]) for a, b in zip(rows.tolist(), cols.tolist())),
+        }
+
+    def sweep(self, dependencies: Any, frequency: int = heuristics.FREQUENCY) -> list[int]:
+        """Count the dependency arcs (excluding the loops) per dependency threshold per wun sort and binary search."""
+        measures = np.sort(self.dependency[(self.counts >= max(frequency, 1)) & ~np.isnan(self.dependency)])
+        thresholds = np.asarray(list(dependencies), dtype=np.float64)
+        return (measures.size - np.searchsorted(measures, thresholds, side='left')).tolist()  # type: ignore
+
+
+def co_occurrence(log: ColumnarEventLog) -> CoOccurrence:
+    """Count the user pairs working together per case from the sorted user codes of each case.
+
+    The users are recoded in name order and the pairs of all cases with the same number of users are
+    generated per wun fancy indexing step, placed in their sequential enumeration order, and counted.
+    The rows are then built per slice in order of first appearance (as the single pass engine does).
+    """
+    m = len(log.users)
+    if not m:
+        return CoOccurrence()
+    by_name = sorted(range(m), key=log.users.__getitem__)
+    rank = np.empty(m, dtype=np.int64)
+    rank[by_name] = np.arange(m, dtype=np.int64)
+    offsets = column(log.offsets)
+    case_of = np.repeat(np.arange(len(log.cases), dtype=np.int64), np.diff(offsets))
+    keys = np.unique(case_of * m + rank[column(log.user_codes)])
+    members = keys % m
+    starts = np.flatnonzero(np.concatenate(([True], np.diff(keys // m) != 0)))
+    sizes = np.diff(np.append(starts, keys.size))
+    pair_counts = sizes * (sizes - 1) // 2
+    pair_starts = np.concatenate(([0], np.cumsum(pair_counts)[:-1]))
+    pairs = np.empty(int(pair_counts.sum()), dtype=np.int64)
+    for size in np.unique(sizes[sizes > 1]).tolist():
+        groups = np.flatnonzero(sizes == size)
+        matrix = members[starts[groups][:, None] + np.arange(size)]
+        upper, lower = np.triu_indices(size, 1)
+        positions = pair_starts[groups][:, None] + np.arange(upper.size)
+        pairs[positions] = matrix[:, upper] * m + matrix[:, lower]
+    if not pairs.size:
+        return CoOccurrence()
+    order = np.argsort(pairs, kind='stable')
+    ordered = pairs[order]
+    distinct = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))
+    counts = np.diff(np.append(distinct, ordered.size))
+    codes, firsts = ordered[distinct], order[distinct]
+    within = np.argsort((codes // m) * pairs.size + firsts)
+    codes, firsts, counts = codes[within], firsts[within], counts[within]
+    row_codes = codes // m
+    row_starts = np.flatnonzero(np.concatenate(([True], row_codes[1:] != row_codes[:-1])))
+    bounds = np.append(row_starts, codes.size).tolist()
+    names = [log.users[k] for k in by_name]
+    others = list(map(names.__getitem__, (codes % m).tolist()))
+    tallies = counts.tolist()
+    engine = CoOccurrence()
+    for g in np.argsort(firsts[row_starts]).tolist():
+        lower, upper = bounds[g], bounds[g + 1]
+        engine.rows[names[int(row_codes[lower])]] = dict(zip(others[lower:upper], tallies[lower:upper]))
+    return engine
+
+
+class VectorizedAggregate:
+    """Provide the report sections of a columnar eventlog computed per NumPy array operations.
+
+    All sections stay in array form until requested and convert to the maps (in the same insertion
+    order as the single pass engine) only then.
+    """
+
+    def __init__(self, log: ColumnarEventLog) -> None:
+        """Group the transitions of the log."""
+        if not available():
+            raise ImportError('the numpy backend requires numpy to be installed')
+        self.log = log
+        pairs, deltas = transitions(log)
+        self.pairs = pairs
+        self.order, self.bounds, self.seen = first_seen_groups(pairs)
+        self.deltas = deltas[self.order]
+
+    def _pair_keys(self) -> list[tuple[int, int, int, int]]:
+        """List the (from code, to code, start, stop) of the transition groups in order of first sight."""
+        n = len(self.log.activities)
+        starts, bounds, pairs, order = self.bounds[:-1], self.bounds, self.pairs, self.order
+        keys = pairs[order[starts]].tolist()
+        lower, upper = bounds[:-1].tolist(), bounds[1:].tolist()
+        return [(keys[g] // n, keys[g] % n, lower[g], upper[g]) for g in self.seen.tolist()]
+
+    def activity_counts(self) -> pm.Activity:
+        """Provide the activity counts A."""
+        acts = column(self.log.activity_codes)
+        codes, firsts, counts = np.unique(acts, return_index=True, return_counts=True)
+        names, codes_l, counts_l = self.log.activities, codes.tolist(), counts.tolist()
+        return {names[codes_l[g]]: counts_l[g] for g in np.argsort(firsts, kind='stable').tolist()}
+
+    def control_flow(self) -> pm.Flow:
+        """Provide the control flow F."""
+        F: pm.Flow = {}  # noqa
+        names = self.log.activities
+        for ci, cj, start, stop in self._pair_keys():
+            F.setdefault(names[ci], {})[names[cj]] = stop - start
+        return F
+
+    def time_differences(self) -> pm.TimeDifference:
+        """Provide the time differences D."""
+        D: pm.TimeDifference = {}  # noqa
+        names, deltas = self.log.activities, self.deltas
+        for ci, cj, start, stop in self._pair_keys():
+            D.setdefault(names[ci], {})[names[cj]] = [dti.timedelta(seconds=d) for d in deltas[start:stop].tolist()]
+        return D
+
+    def time_differences_as_float(self) -> pm.TimeDifferenceFloats:
+        """Provide the time differences D as float seconds (without the detour per timedelta)."""
+        DF: pm.TimeDifferenceFloats = {}  # noqa
+        names, deltas = self.log.activities, self.deltas.astype(np.float64)
+        for ci, cj, start, stop in self._pair_keys():
+            DF.setdefault(names[ci], {})[names[cj]] = deltas[start:stop].tolist()
+        return DF
+
+    def average_time_differences(self) -> pm.AverageTimeDifference:
+        """Average the time differences from D per case transitions (same rounding as the single pass engine)."""
+        sums = np.add.reduceat(self.deltas, self.bounds[:-1]).tolist() if self.deltas.size else []
+        names = self.log.activities
+        averages: dict[tuple[str, str], dti.timedelta] = {}
+        for g, (ci, cj, start, stop) in zip(self.seen.tolist(), self._pair_keys()):
+            avg_td = dti.timedelta(seconds=sums[g]) / (stop - start)
+            averages[(names[ci], names[cj])] = avg_td - dti.timedelta(microseconds=avg_td.microseconds)
+        AD: pm.AverageTimeDifference = {}  # noqa
+        for ai, aj in sorted(averages):
+            AD.setdefault(ai, {})[aj] = averages[(ai, aj)]
+        return AD
+
+    def work_distribution(self) -> pm.Flow:
+        """Provide the count of activities UAC performed by each user."""
+        n = len(self.log.activities)
+        keys = column(self.log.user_codes).astype(np.int64) * n + column(self.log.activity_codes)
+        codes, firsts, counts = np.unique(keys, return_index=True, return_counts=True)
+        UAC: pm.Flow = {}  # noqa
+        users, names = self.log.users, self.log.activities
+        codes_l, counts_l = codes.tolist(), counts.tolist()
+        for g in np.argsort(firsts, kind='stable').tolist():
+            UAC.setdefault(users[codes_l[g] // n], {})[names[codes_l[g] % n]] = counts_l[g]
+        return UAC
+
+    def user_activities(self) -> pm.UserActivity:
+        """Provide the sorted activities UA performed by each user."""
+        return {ui: sorted(counts) for ui, counts in self.work_distribution().items()}
+
+    def co_occurrence(self) -> CoOccurrence:
+        """Provide the sparse counts of the users working together in cases."""
+        return co_occurrence(self.log)
+
+    def working_together(self) -> pm.Flow:
+        """Provide the working together matrix W."""
+        return self.co_occurrence().nested()
+
+    def dependency_graph(self) -> MatrixDependencyGraph:
+        """Provide the heuristics miner dependency measures (including the length two loops)."""
+        return MatrixDependencyGraph(self.log)
+
+    def sections(self) -> Iterator[tuple[str, Any]]:
+        """Generate the named sections of the extraction report in order, each computed only when reached."""
+        yield 'activity_counts', self.activity_counts()
+        yield 'average_time_differences', pm.average_time_differences_as_float(self.average_time_differences())
+        yield 'control_flow', self.control_flow()
+        yield 'time_differences', self.time_differences_as_float()
+        yield 'user_activities', self.user_activities()
+        yield 'work_distribution', self.work_distribution()
+        yield 'working_together', self.working_together()
+
+    def report(self) -> pm.Report:
+        """Provide all sections of the extraction report."""
+        return dict(self.sections())
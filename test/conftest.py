@@ -0,0 +1,24 @@
+import datetime as dti
+import random
+
+import pytest
+
+START = dti.datetime(2021, 11, 27, 12, 34, 56)
+
+
+def random_eventlog(seed, cases=50, activities=7, users=5, events=11):
+    rng = random.Random(seed)
+    eventlog = {}
+    for case in range(cases):
+        ts = START + dti.timedelta(seconds=rng.randrange(100_000))
+        trace = []
+        for _ in range(rng.randint(1, events)):
+            ts += dti.timedelta(seconds=rng.randrange(7_200))
+            trace.append((f't{rng.randrange(activities)}', f'u{rng.randrange(users)}', ts))
+        eventlog[f'c{case}'] = trace
+    return eventlog
+
+
+@pytest.fixture(name='random_eventlog')
+def random_eventlog_factory():
+    return random_eventlog
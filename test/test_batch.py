@@ -0,0 +1,87 @@
+import gzip
+import json
+import pathlib
+
+import prosessilouhinta.batch as batch
+import prosessilouhinta.prosessilouhinta as pm
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+
+
+def split_fixture(folder):
+    header, *rows = SMALL.read_text().splitlines(keepends=True)
+    first = [row for row in rows if row.split(',')[0] in ('c1', 'c2', 'c3', 'c4')]
+    second = [row for row in rows if row not in first]
+    (folder / 'site-a.csv').write_text(header + ''.join(first))
+    (folder / 'site-b.csv.gz').write_bytes(gzip.compress((header + ''.join(second)).encode()))
+    return first, second
+
+
+def test_sources_of_glob_and_manifest(tmp_path):
+    split_fixture(tmp_path)
+    manifest = tmp_path / 'manifest.txt'
+    manifest.write_text('# daily logs\nsite-b.csv.gz\n\nsite-a.csv\n')
+    assert batch.sources_of(str(tmp_path / 'site-*')) == [tmp_path / 'site-a.csv', tmp_path / 'site-b.csv.gz']
+    assert batch.sources_of(f'@{manifest}') == [tmp_path / 'site-b.csv.gz', tmp_path / 'site-a.csv']
+
+
+def test_target_of_strips_source_suffixes():
+    folder = pathlib.Path('reports')
+    assert batch.target_of(pathlib.Path('logs', 'site-b.csv.gz'), folder) == folder / 'site-b.json'
+    assert batch.target_of(pathlib.Path('site.log'), folder, batch.BINARY) == folder / 'site.log.bin'
+
+
+def test_main_writes_reports_per_eventlog_and_merged(tmp_path):
+    split_fixture(tmp_path)
+    folder, merged, whole = tmp_path / 'reports', tmp_path / 'merged.json', tmp_path / 'whole.json'
+    assert batch.main(['batch', str(tmp_path / 'site-*'), str(folder), str(merged), ''], {'jobs': 2}) == 0
+    assert sorted(path.name for path in folder.iterdir()) == ['site-a.json', 'site-b.json']
+    single = tmp_path / 'single.json'
+    assert pm.main(['extract', str(tmp_path / 'site-a.csv'), str(single), '']) == 0
+    assert (folder / 'site-a.json').read_text() == single.read_text()
+    assert pm.main(['extract', str(SMALL), str(whole), '']) == 0
+    assert merged.read_text() == whole.read_text()
+
+
+def test_main_merged_summaries_in_process(tmp_path):
+    split_fixture(tmp_path)
+    folder, merged = tmp_path / 'reports', tmp_path / 'merged.json'
+    options = {'jobs': 1, 'summaries': True}
+    assert batch.main(['batch', str(tmp_path / 'site-*'), str(folder), str(merged), ''], options) == 0
+    expected = pm.aggregate(pm.parse_eventlog_csv(SMALL), summaries=True).report()
+    assert json.loads(merged.read_text()) == json.loads(json.dumps(expected))
+
+
+def test_verify_request_failures(tmp_path):
+    split_fixture(tmp_path)
+    folder = str(tmp_path / 'reports')
+    assert batch.verify_request(['batch', str(tmp_path / 'none-*'), folder, '', ''])[:2] == (
+        1,
+        'no eventlogs match the sources',
+    )
+    assert batch.verify_request(['batch', f'@{tmp_path / "missing"}', folder, '', ''])[:2] == (1, 'manifest is no file')
+    (tmp_path / 'site-a.csv.xz').write_bytes(b'')
+    assert batch.verify_request(['batch', str(tmp_path / 'site-*'), folder, '', ''])[:2] == (
+        2,
+        'sources map to the same target',
+    )
+    assert batch.verify_request(['batch', str(tmp_path / 'site-b*'), str(tmp_path / 'site-a.csv'), '', ''])[:2] == (
+        1,
+        'target folder is no folder',
+    )
+    assert batch.verify_request(['batch', str(tmp_path / 'site-b*'), folder, str(SMALL), ''])[:2] == (
+        1,
+        'target file exists',
+    )
+    assert batch.verify_request(['batch', 'x', folder, '', ''], {'format': 'xml'})[:2] == (2, 'received unknown format')
+
+
+def test_verify_request_zstd_sources_need_zstandard(tmp_path, monkeypatch):
+    split_fixture(tmp_path)
+    (tmp_path / 'site-c.csv.zst').write_bytes(b'\x28\xb5\x2f\xfd' + b'\x00' * 8)
+    monkeypatch.setattr(batch, 'zstd_available', lambda: False)
+    request = ['batch', str(tmp_path / 'site-*'), str(tmp_path / 'reports'), '', '']
+    assert batch.verify_request(request)[:2] == (1, 'zstd compressed source requires zstandard')
+    (tmp_path / 'site-c.csv.zst').unlink()
+    assert batch.verify_request(request)[0] == 0
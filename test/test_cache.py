@@ -0,0 +1,83 @@
+import json
+import os
+import pathlib
+
+import prosessilouhinta.cache as cache
+import prosessilouhinta.prosessilouhinta as pm
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+
+
+def test_parse_cached_stores_and_loads_the_same_log(tmp_path):
+    folder = tmp_path / 'cache'
+    parsed = cache.parse_cached(SMALL, folder)
+    bundles = list(folder.glob(f'*{cache.SUFFIX}'))
+    assert len(bundles) == 1
+    loaded = cache.parse_cached(SMALL, folder)
+    assert loaded is not parsed
+    assert list(loaded.events()) == list(parsed.events()) == list(pm.parse_eventlog_csv(SMALL, columnar=True).events())
+    assert loaded.activity_code == parsed.activity_code and loaded.user_code == parsed.user_code
+
+
+def test_parse_cached_hits_without_reading_the_source(tmp_path, monkeypatch):
+    folder, source = tmp_path / 'cache', tmp_path / 'eventlog.csv'
+    source.write_bytes(SMALL.read_bytes())
+    parsed = cache.parse_cached(source, folder)
+    monkeypatch.setattr(cache, 'digest', None)
+    monkeypatch.setattr(cache.ColumnarEventLog, 'from_events', None)
+    assert list(cache.parse_cached(source, folder).events()) == list(parsed.events())
+
+
+def test_parse_cached_hashes_only_changed_stamps(tmp_path, monkeypatch):
+    folder, source = tmp_path / 'cache', tmp_path / 'eventlog.csv'
+    source.write_bytes(SMALL.read_bytes())
+    cache.parse_cached(source, folder)
+    expected = list(pm.parse_eventlog_csv(SMALL, columnar=True).events())
+    parse = cache.ColumnarEventLog.from_events
+    monkeypatch.setattr(cache.ColumnarEventLog, 'from_events', None)
+    for k in (1, 2):
+        os.utime(source, ns=(k * 10**9, k * 10**9))
+        touched = cache.parse_cached(source, folder)  # same content per digest recorded on the miss
+        assert list(touched.events()) == expected
+    monkeypatch.setattr(cache.ColumnarEventLog, 'from_events', parse)
+    source.write_bytes(SMALL.read_bytes().replace(b'u1', b'u9'))
+    changed = cache.parse_cached(source, folder)
+    assert 'u9' in changed.users and 'u1' not in changed.users
+    assert len(list(folder.glob(f'*{cache.SUFFIX}'))) == 1
+
+
+def test_load_rejects_foreign_and_truncated_bundles():
+    log = pm.parse_eventlog_csv(SMALL, columnar=True)
+    data = cache.dump(log, cache.stamp_of(SMALL))
+    header, start = cache.header_of(data)
+    assert header['source'] == str(SMALL.resolve()) and header['digest'] is None
+    assert list(cache.load(data, header, start).events()) == list(log.events())
+    assert cache.load(data[:-1], header, start) is None
+    assert cache.header_of(b'nothing') is None
+    assert cache.header_of(b'PLR1' + data[4:]) is None
+
+
+def test_evict_least_recently_used(tmp_path):
+    for k, name in enumerate(('old', 'mid', 'new')):
+        path = tmp_path / f'{name}{cache.SUFFIX}'
+        path.write_bytes(b'x' * 10)
+        os.utime(path, ns=(k * 10**9, k * 10**9))
+    cache.evict(tmp_path, 25)
+    assert sorted(path.stem for path in tmp_path.iterdir()) == ['mid', 'new']
+
+
+def test_parse_cached_skips_storing_bundles_above_limit(tmp_path):
+    folder = tmp_path / 'cache'
+    assert list(cache.parse_cached(SMALL, folder, limit=1).events())
+    assert not folder.exists()
+
+
+def test_main_with_cache_reports_like_without(tmp_path, monkeypatch):
+    monkeypatch.setenv(cache.CACHE_ENV, str(tmp_path / 'cache'))
+    plain, first, second = tmp_path / 'plain.json', tmp_path / 'first.json', tmp_path / 'second.json'
+    assert pm.main(['extract', str(SMALL), str(plain), '']) == 0
+    assert pm.main(['extract', str(SMALL), str(first), ''], {'cache': True}) == 0
+    assert pm.main(['extract', str(SMALL), str(second), ''], {'cache': True}) == 0
+    assert len(list((tmp_path / 'cache').iterdir())) == 1
+    assert json.loads(first.read_text()) == json.loads(second.read_text()) == json.loads(plain.read_text())
@@ -1,4 +1,7 @@
 import pathlib
+import subprocess  # nosec
+import sys
+import time
 
 from typer.testing import CliRunner
 
@@ -10,6 +13,17 @@ BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
 
 runner = CliRunner()
 
+STARTUP_BUDGET_FACTOR = 8  # times the bare interpreter start for the version (importing typer alone takes ~14)
+
+
+def startup_seconds(*args):
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)  # nosec
+        best = min(best, time.perf_counter() - start)
+    return best
+
 
 def test_app_version():
     result = runner.invoke(app, ['version'])
@@ -71,3 +85,41 @@ def test_cli_main_too_few_columns():
     result = runner.invoke(app, ['extract', str(BASIC_FIXTURES_PATH / 'single-too-short-data-line.csv')])
     assert result.exit_code == 1
     assert message in result.stdout
+
+
+def test_app_batch_dryrun():
+    result = runner.invoke(app, ['batch', str(BASIC_FIXTURES_PATH / 'small-*.csv'), 'reports-not-there', '-n'])
+    assert result.exit_code == 0
+    assert not pathlib.Path('reports-not-there').exists()
+
+
+def test_version_starts_within_budget_over_the_bare_interpreter():
+    bare = startup_seconds('-c', 'pass')
+    assert startup_seconds('-m', 'prosessilouhinta', 'version') < STARTUP_BUDGET_FACTOR * bare
+
+
+def test_main_version_fast_path_loads_no_commands():
+    probe = (
+        'import sys; import prosessilouhinta.cli as cli; cli.main(["version"]);'
+        ' heavy = ("typer", "prosessilouhinta.prosessilouhinta", "prosessilouhinta.cpa");'
+        ' print(sorted(m for m in heavy if m in sys.modules))'
+    )
+    result = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True)  # nosec
+    assert result.stdout.splitlines() == [cli.version_text(), '[]']
+
+
+def test_import_of_gateway_loads_no_commands():
+    probe = (
+        'import sys; import prosessilouhinta.cli;'
+        ' print(sorted(m for m in ("typer", "prosessilouhinta.prosessilouhinta") if m in sys.modules))'
+    )
+    result = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True)  # nosec
+    assert result.stdout.splitlines() == ['[]']
+
+
+def test_main_delegates_to_commands(capsys):
+    try:
+        cli.main(['extract', '-n'])
+    except SystemExit as exit_code:
+        assert exit_code.code == 0
+    assert 'dryrun requested' in capsys.readouterr().err
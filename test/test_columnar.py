@@ -0,0 +1,64 @@
+import datetime as dti
+import json
+import pathlib
+
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.columnar import ColumnarEventLog
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+
+
+def test_columnar_empty_eventlog_csv():
+    log = pm.parse_eventlog_csv(BASIC_FIXTURES_PATH / 'empty.csv', columnar=True)
+    assert isinstance(log, ColumnarEventLog)
+    assert len(log) == 0
+    assert log == {}
+    assert list(log.offsets) == [0]
+
+
+def test_columnar_equals_eventlog_map():
+    small = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+    log = pm.parse_eventlog_csv(small, columnar=True)
+    assert log == pm.parse_eventlog_csv(small)
+    assert log.event_count == 21
+    assert log.activities == ['t1', 't2', 't3', 't4']
+    assert log.users == ['u1', 'u2', 'u3', 'u4']
+    assert list(log.offsets[:3]) == [0, 3, 6]
+
+
+def test_columnar_groups_interleaved_cases():
+    ts = dti.datetime(2021, 11, 27, 12, 34, 56)
+    second = dti.timedelta(seconds=1)
+    events = [
+        ('c1', 't1', 'u1', ts),
+        ('c2', 't1', 'u2', ts + second),
+        ('c1', 't2', 'u1', ts + 2 * second),
+        ('c2', 't3', 'u2', ts + 3 * second),
+    ]
+    log = ColumnarEventLog.from_events(events)
+    assert list(log) == ['c1', 'c2']
+    assert log['c1'] == [('t1', 'u1', ts), ('t2', 'u1', ts + 2 * second)]
+    assert log['c2'] == [('t1', 'u2', ts + second), ('t3', 'u2', ts + 3 * second)]
+    assert list(log.events())[1] == ('c1', 't2', 'u1', ts + 2 * second)
+
+
+def test_columnar_report_matches_fixture_byte_for_byte():
+    log = pm.parse_eventlog_csv(BASIC_FIXTURES_PATH / 'small-eventlog.csv', columnar=True)
+    with open(BASIC_FIXTURES_PATH / 'small-eventlog-report.json', 'rt', encoding='utf-8') as handle:
+        expected = handle.read()
+    assert json.dumps(pm.aggregate(log).report()) == expected
+    assert pm.control_flow(log) == {'t1': {'t2': 6}, 't2': {'t3': 4}, 't3': {'t4': 1}}
+
+
+def test_columnar_aggregate_on_codes_equals_aggregate_of_traces(random_eventlog):
+    for seed, summaries in ((0, False), (1, True), (2, False)):
+        eventlog = random_eventlog(seed)
+        events = [(caseid, *event) for caseid, trace in eventlog.items() for event in trace]
+        log = ColumnarEventLog.from_events(events[1::2] + events[::2])  # interleaved cases
+        agg, expected = pm.aggregate(log, summaries=summaries), pm.aggregate(dict(log.items()), summaries=summaries)
+        assert json.dumps(agg.report()) == json.dumps(expected.report())
+        assert agg.last == expected.last and agg.case_users == expected.case_users
+        agg.add_columnar(log)  # continues the cases like adding the traces again
+        for caseid, trace in log.items():
+            expected.add_case(caseid, trace)
+        assert json.dumps(agg.report()) == json.dumps(expected.report())
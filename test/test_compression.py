@@ -0,0 +1,74 @@
+import bz2
+import gzip
+import json
+import lzma
+import pathlib
+
+import pytest
+
+import prosessilouhinta.compression as compression
+import prosessilouhinta.prosessilouhinta as pm
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+OPENERS = {compression.GZIP: gzip.open, compression.BZIP2: bz2.open, compression.XZ: lzma.open}
+
+
+def compressed_copy(folder, kind, source=SMALL):
+    path = folder / f'{source.name}.{kind}'
+    with OPENERS[kind](path, 'wb') as handle:
+        handle.write(source.read_bytes())
+    return path
+
+
+@pytest.mark.parametrize('kind', sorted(OPENERS))
+def test_sniff_and_read_compressed_lines(tmp_path, kind):
+    path = compressed_copy(tmp_path, kind)
+    assert compression.sniff(path) == kind
+    assert list(pm.reader(path)) == list(pm.reader(SMALL))
+
+
+def test_sniff_uncompressed_and_empty(tmp_path):
+    empty = tmp_path / 'empty.csv'
+    empty.touch()
+    assert compression.sniff(SMALL) is None
+    assert compression.sniff(empty) is None
+
+
+def test_sniff_bzip2_needs_the_block_size_digit(tmp_path):
+    for text, kind in (('BZh9', compression.BZIP2), ('BZh1', compression.BZIP2), ('BZh0', None), ('BZhello', None)):
+        path = tmp_path / 'log.csv'
+        path.write_text(text, encoding='utf-8')
+        assert compression.sniff(path) == kind
+
+
+def test_decompressed_lines_in_several_chunks_and_early_close(tmp_path, monkeypatch):
+    monkeypatch.setattr(compression, 'CHUNK_CHARS', 16)
+    monkeypatch.setattr(compression, 'QUEUE_CHUNKS', 1)
+    path = compressed_copy(tmp_path, compression.GZIP)
+    assert list(compression.decompressed_lines(path, compression.GZIP)) == list(pm.reader(SMALL))
+    lines = compression.decompressed_lines(path, compression.GZIP)
+    assert next(lines).startswith('#')
+    lines.close()
+
+
+def test_decompressed_lines_raise_errors_of_the_thread(tmp_path):
+    path = tmp_path / 'broken.csv.gz'
+    path.write_bytes(gzip.compress(SMALL.read_bytes())[:40])
+    with pytest.raises(EOFError):
+        list(compression.decompressed_lines(path, compression.GZIP))
+
+
+def test_main_extracts_compressed_source_like_plain(tmp_path):
+    plain, packed = tmp_path / 'plain.json', tmp_path / 'packed.json'
+    source = compressed_copy(tmp_path, compression.XZ)
+    assert pm.main(['extract', str(SMALL), str(plain), '']) == 0
+    assert pm.main(['extract', str(source), str(packed), '']) == 0
+    assert json.loads(packed.read_text()) == json.loads(plain.read_text())
+
+
+def test_verify_request_rejects_parallel_jobs_on_compressed_source(tmp_path):
+    source = compressed_copy(tmp_path, compression.GZIP)
+    argv = ['extract', str(source), '', '']
+    message = 'compressed source requires a single job and no incremental extraction'
+    assert pm.verify_request(argv, {'jobs': 2}) == (2, message, [''])
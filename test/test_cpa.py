@@ -1,6 +1,11 @@
+import contextlib
 import json
 import operator
 import pathlib
+import random
+import time
+
+import pytest
 
 import prosessilouhinta.cpa as cpa
 
@@ -74,8 +79,11 @@ def test_cpa_nodes_in_cyclic_dgraph():
     c = p.add(cpa.Node('C', duration=4, lag=0))
     d = p.add(cpa.Node('D', duration=6, lag=0))
     e = p.add(cpa.Node('E', duration=5, lag=0))
-    p.link(a, b).link(a, c).link(a, d).link(b, e).link(c, e).link(d, e).link(e, a)
-    assert p.is_acyclic() is False
+    p.link(a, b).link(a, c).link(a, d).link(b, e).link(c, e).link(d, e)
+    with pytest.raises(ValueError, match='closing a cycle'):
+        p.link(e, a)
+    assert e not in a.incoming_nodes
+    assert p.is_acyclic() is True
 
 
 def test_cpa_of_micro_project():
@@ -116,6 +124,8 @@ def test_cpa_of_micro_project():
         'latest_start': 0,
         'latest_finish': 14,
         'drag': None,
+        'total_float': None,
+        'free_float': None,
     }
     the_data = p.activity_on_node()
     assert the_data == p_aon_map
@@ -125,71 +135,71 @@ def test_cpa_of_micro_project():
 
     assert a is not None
     aon_a = """\
-+-----------+
-|   DUR=3   |
-+-----------+
-|ES=0| |EF=3|
-|----|A|----|
-|LS=0| |LF=3|
-+-----------+
-|  DRAG=n/a |
-+-----------+
++--------------+
+|    DUR=3     |
++--------------+
+|ES=0|TF=0|EF=3|
+|----| A  |----|
+|LS=0|FF=0|LF=3|
++--------------+
+|    DRAG=3    |
++--------------+
 """
     assert aons[a.name] == aon_a
 
     assert b is not None
     aon_b = """\
-+-----------+
-|   DUR=3   |
-+-----------+
-|ES=3| |EF=6|
-|----|B|----|
-|LS=6| |LF=9|
-+-----------+
-|  DRAG=n/a |
-+-----------+
++--------------+
+|    DUR=3     |
++--------------+
+|ES=3|TF=3|EF=6|
+|----| B  |----|
+|LS=6|FF=3|LF=9|
++--------------+
+|    DRAG=0    |
++--------------+
 """
     assert aons[b.name] == aon_b
 
     assert c is not None
     aon_c = """\
-+-----------+
-|   DUR=4   |
-+-----------+
-|ES=3| |EF=7|
-|----|C|----|
-|LS=5| |LF=9|
-+-----------+
-|  DRAG=n/a |
-+-----------+
++--------------+
+|    DUR=4     |
++--------------+
+|ES=3|TF=2|EF=7|
+|----| C  |----|
+|LS=5|FF=2|LF=9|
++--------------+
+|    DRAG=0    |
++--------------+
 """
     assert aons[c.name] == aon_c
 
     aon_d = """\
-+-----------+
-|   DUR=6   |
-+-----------+
-|ES=3| |EF=9|
-|----|D|----|
-|LS=3| |LF=9|
-+-----------+
-|  DRAG=n/a |
-+-----------+
++--------------+
+|    DUR=6     |
++--------------+
+|ES=3|TF=0|EF=9|
+|----| D  |----|
+|LS=3|FF=0|LF=9|
++--------------+
+|    DRAG=2    |
++--------------+
 """
     assert d is not None
     assert aons[d.name] == aon_d
 
     assert e is not None
     aon_e = """\
-+------------+
-|   DUR=5    |
-+------------+
-|ES=9| |EF=14|
-|----|E|-----|
-|LS=9| |LF=14|
-+------------+
-|  DRAG=n/a  |
-+------------+
++---------------+
+|     DUR=5     |
++---------------+
+|ES=9|TF=0|EF=14|
+|----| E  |-----|
+|LS=9|FF=0|LF=14|
++---------------+
+|     DRAG=5    |
++---------------+
 """
     assert aons[e.name] == aon_e
 
@@ -200,15 +210,15 @@ def test_cpa_of_micro_project():
 
     aon_dia = tuple(f'{fir}{sec}{thi}' for fir, sec, thi in zip(a_el, d_el, e_el))
     expected_diagram = """\
-+-----------+    +-----------+    +------------+
-|   DUR=3   |    |   DUR=6   |    |   DUR=5    |
-+-----------+    +-----------+    +------------+
-|ES=0| |EF=3|    |ES=3| |EF=9|    |ES=9| |EF=14|
-|----|A|----| => |----|D|----| => |----|E|-----|
-|LS=0| |LF=3|    |LS=3| |LF=9|    |LS=9| |LF=14|
-+-----------+    +-----------+    +------------+
-|  DRAG=n/a |    |  DRAG=n/a |    |  DRAG=n/a  |
-+-----------+    +-----------+    +------------+
++--------------+    +--------------+    +---------------+
+|    DUR=3     |    |    DUR=6     |    |     DUR=5     |
++--------------+    +--------------+    +---------------+
+|ES=0|TF=0|EF=3|    |ES=3|TF=0|EF=9|    |ES=9|TF=0|EF=14|
+|----| A  |----| => |----| D  |----| => |----| E  |-----|
+|LS=0|FF=0|LF=3|    |LS=3|FF=0|LF=9|    |LS=9|FF=0|LF=14|
++--------------+    +--------------+    +---------------+
+|    DRAG=3    |    |    DRAG=2    |    |     DRAG=5    |
++--------------+    +--------------+    +---------------+
 """
     assert '\n'.join(aon_dia) + '\n' == expected_diagram
 
@@ -248,6 +258,8 @@ def test_cpa_of_loaded_micro_project():
         'latest_start': 0,
         'latest_finish': 14,
         'drag': None,
+        'total_float': None,
+        'free_float': None,
     }
     the_data = p.activity_on_node()
     assert the_data == p_aon_map
@@ -256,15 +268,15 @@ def test_cpa_of_loaded_micro_project():
     assert p.activity_on_node_strings() == tuple(row for row in aon_p.split('\n') if row)
 
     expected_diagram = """\
-+-----------+    +-----------+    +------------+
-|   DUR=3   |    |   DUR=6   |    |   DUR=5    |
-+-----------+    +-----------+    +------------+
-|ES=0| |EF=3|    |ES=3| |EF=9|    |ES=9| |EF=14|
-|----|A|----| => |----|D|----| => |----|E|-----|
-|LS=0| |LF=3|    |LS=3| |LF=9|    |LS=9| |LF=14|
-+-----------+    +-----------+    +------------+
-|  DRAG=n/a |    |  DRAG=n/a |    |  DRAG=n/a  |
-+-----------+    +-----------+    +------------+
++--------------+    +--------------+    +---------------+
+|    DUR=3     |    |    DUR=6     |    |     DUR=5     |
++--------------+    +--------------+    +---------------+
+|ES=0|TF=0|EF=3|    |ES=3|TF=0|EF=9|    |ES=9|TF=0|EF=14|
+|----| A  |----| => |----| D  |----| => |----| E  |-----|
+|LS=0|FF=0|LF=3|    |LS=3|FF=0|LF=9|    |LS=9|FF=0|LF=14|
++--------------+    +--------------+    +---------------+
+|    DRAG=3    |    |    DRAG=2    |    |     DRAG=5    |
++--------------+    +--------------+    +---------------+
 """
     aon_dia_text = p.aon_diagram_text(p.activity_on_node_diagram_data())
     assert aon_dia_text == expected_diagram
@@ -294,11 +306,11 @@ def test_model_loaded_small():
 +--------------------+
 |       DUR=31       |
 +--------------------+
-|ES=8305|    |EF=8336|
+|ES=8305|TF=0|EF=8336|
 |-------|4696|-------|
-|LS=8305|    |LF=8336|
+|LS=8305|FF=0|LF=8336|
 +--------------------+
-|      DRAG=n/a      |
+|       DRAG=4       |
 +--------------------+
 """
     assert p.lookup_node('4696').activity_on_node_text() == activity_on_node_4696
@@ -307,11 +319,11 @@ def test_model_loaded_small():
 +--------------------+
 |       DUR=10       |
 +--------------------+
-|ES=8336|    |EF=8346|
+|ES=8336|TF=0|EF=8346|
 |-------|4706|-------|
-|LS=8336|    |LF=8346|
+|LS=8336|FF=0|LF=8346|
 +--------------------+
-|      DRAG=n/a      |
+|      DRAG=10       |
 +--------------------+
 """
     assert p.lookup_node('4706').activity_on_node_text() == activity_on_node_4706
@@ -320,11 +332,243 @@ def test_model_loaded_small():
 +--------------------+
 |       DUR=0        |
 +--------------------+
-|ES=8346|    |EF=8346|
+|ES=8346|TF=0|EF=8346|
 |-------|4707|-------|
-|LS=8346|    |LF=8346|
+|LS=8346|FF=0|LF=8346|
 +--------------------+
-|      DRAG=n/a      |
+|       DRAG=0       |
 +--------------------+
 """
     assert p.lookup_node('4707').activity_on_node_text() == activity_on_node_4707
+
+
+def test_cpa_critical_path_ties_prefer_earlier_added_nodes():
+    p = cpa.Node('ties')
+    a = p.add(cpa.Node('A', duration=1))
+    c = p.add(cpa.Node('C', duration=2))
+    b = p.add(cpa.Node('B', duration=2))
+    e = p.add(cpa.Node('E', duration=0))
+    p.link(a, b).link(a, c).link(b, e).link(c, e).update_all()
+    assert p.get_critical_path() == [a, c, e]
+    assert p.duration == 3
+
+
+def test_cpa_critical_path_of_ladder_with_exponentially_many_paths():
+    p = cpa.Node('ladder')
+    previous = p.add(cpa.Node('start', duration=0))
+    for rung in range(64):
+        left = p.add(cpa.Node(f'L{rung}', duration=1))
+        right = p.add(cpa.Node(f'R{rung}', duration=2 if rung == 42 else 1))
+        join = p.add(cpa.Node(f'J{rung}', duration=0))
+        p.link(previous, left).link(previous, right).link(left, join).link(right, join)
+        previous = join
+    p.update_all()
+    path = [str(node) for node in p.get_critical_path()]
+    assert p.duration == 65
+    assert len(path) == 1 + 64 * 2
+    assert 'R42' in path and 'L42' not in path
+    assert path[1] == 'L0'
+
+
+def test_cpa_link_rejects_self_loops():
+    p = cpa.Node('loop')
+    a = p.add(cpa.Node('A', duration=3))
+    with pytest.raises(ValueError, match='to itself'):
+        p.link(a, a)
+
+
+def test_cpa_link_maintains_topological_order():
+    rng = random.Random(42)
+    p = cpa.Node('random')
+    members = [p.add(cpa.Node(f'n{k}', duration=1)) for k in range(60)]
+    rank = list(range(60))
+    rng.shuffle(rank)  # a hidden order the links respect but the additions do not
+    for _ in range(600):
+        x, y = rng.sample(members, 2)
+        if rank[members.index(x)] > rank[members.index(y)]:
+            x, y = y, x
+        p.link(x, y)
+        order = p.topological_order()
+        assert [node.position for node in order] == list(range(60))
+        assert all(node.position < target.position for node in order for target in node.to_nodes)
+    assert p.is_acyclic() is True
+
+
+def test_cpa_load_network_restores_order_wunce(tmp_path):
+    network = {'name': 'reversed', 'nodes': {'A': {'duration': 1}, 'B': {'duration': 2}, 'C': {'duration': 3}}}
+    path = tmp_path / 'network.json'
+    path.write_text(json.dumps({**network, 'edges': [['C', 'B'], ['B', 'A']]}), encoding='utf-8')
+    p = cpa.Node('reversed')
+    p.load_network(str(path))
+    assert [str(node) for node in p.topological_order()] == ['C', 'B', 'A']
+    assert [str(node) for node in p.get_critical_path()] == ['C', 'B', 'A']
+
+    path.write_text(json.dumps({**network, 'edges': [['C', 'B'], ['B', 'A'], ['A', 'C']]}), encoding='utf-8')
+    with pytest.raises(TypeError, match='Network contains cycles'):
+        cpa.Node('reversed').load_network(str(path))
+
+
+def test_cpa_update_all_applies_lags_in_wun_sweep():
+    p = cpa.Node('lagged', lag=1)
+    a = p.add(cpa.Node('A', duration=3, lag=2))
+    b = p.add(cpa.Node('B', duration=2, lag=4))
+    c = p.add(cpa.Node('C', duration=5))
+    d = p.add(cpa.Node('D', duration=1, lag=1))
+    p.link(a, b).link(a, c).link(b, d).link(c, d).update_all()
+    timings = [(3, 6, 5, 8), (10, 12, 11, 13), (6, 11, 8, 13), (13, 14, 13, 14)]
+    assert [(n.es, n.ef, n.ls, n.lf) for n in (a, b, c, d)] == timings
+    assert p.get_critical_path() == [a, c, d]
+    assert (p.duration, p.es, p.ef, p.ls, p.lf) == (9, 3, 14, 5, 14)
+
+
+def test_cpa_update_all_recomputes_after_changes():
+    p = cpa.Node('micro')
+    p.load_network(str(CPA_MICRO_FIXTURE_PATH))
+    b = p.lookup_node('B')
+    b.duration = 9
+    p.update_all()
+    assert [str(node) for node in p.get_critical_path()] == ['A', 'B', 'E']
+    assert (b.es, b.ef, b.ls, b.lf) == (3, 12, 3, 12)
+    d = p.lookup_node('D')
+    assert (d.es, d.ef, d.ls, d.lf) == (3, 9, 6, 12)
+    assert p.duration == 17
+
+
+def test_cpa_drag_and_floats_of_micro_project():
+    p = cpa.Node('micro')
+    p.load_network(str(CPA_MICRO_FIXTURE_PATH))
+    measures = {node.name: (node.drag, node.total_float, node.free_float) for node in p.nodes}
+    assert measures == {'A': (3, 0, 0), 'B': (0, 3, 3), 'C': (0, 2, 2), 'D': (2, 0, 0), 'E': (5, 0, 0)}
+    assert p.activity(p.lookup_node('C'))['total_float'] == 2
+
+
+def test_cpa_drag_matches_rescheduling_without_the_node():
+    rng = random.Random(7)
+    for _ in range(50):
+        p = cpa.Node('random', lag=rng.choice((0, 2)))
+        lags = [rng.choice((0, 0, 1, 3)) for _ in range(12)]
+        members = [p.add(cpa.Node(f'n{k}', duration=rng.randint(0, 6), lag=lag)) for k, lag in enumerate(lags)]
+        for _ in range(24):
+            x, y = rng.sample(members, 2)
+            try:
+                p.link(x, y)
+            except ValueError:
+                pass
+        p.update_all()
+        drags, longest, critical = {n.name: n.drag for n in members}, p.duration, set(p.get_critical_path())
+        for node in members:
+            duration, node.duration = node.duration, 0
+            p.update_all()
+            assert drags[node.name] == (longest - p.duration if node in critical else 0)
+            node.duration = duration
+
+
+def test_cpa_update_activity_reschedules_the_micro_project():
+    p = cpa.Node('micro')
+    p.load_network(str(CPA_MICRO_FIXTURE_PATH))
+    p.update_activity('B', duration=9)
+    b, d = p.lookup_node('B'), p.lookup_node('D')
+    assert [str(node) for node in p.get_critical_path()] == ['A', 'B', 'E']
+    assert (p.duration, p.es, p.ef, p.ls, p.lf) == (17, 0, 17, 0, 17)
+    assert (b.es, b.ef, b.ls, b.lf, b.total_float) == (3, 12, 3, 12, 0)
+    assert (d.es, d.ef, d.ls, d.lf, d.total_float, d.free_float) == (3, 9, 6, 12, 3, 3)
+    assert (b.drag, d.drag) == (3, 0)
+
+    p.update_link('B', 'E', linked=False)
+    assert [str(node) for node in p.get_critical_path()] == ['A', 'D', 'E']
+    assert (p.duration, b.lf, b.total_float, b.drag, d.drag) == (14, 12, 0, 0, 2)
+
+
+def test_cpa_incremental_updates_match_update_all():
+    def timings(project):
+        return [project.activity(node) for node in project.nodes], project.activity_on_node()
+
+    rng = random.Random(11)
+    for _ in range(30):
+        lags = [rng.choice((0, 0, 1, 3)) for _ in range(12)]
+        p = cpa.Node('random', lag=rng.choice((0, 2)))
+        members = [p.add(cpa.Node(f'n{k}', duration=rng.randint(0, 6), lag=lag)) for k, lag in enumerate(lags)]
+        for _ in range(20):
+            with contextlib.suppress(ValueError):
+                p.link(*rng.sample(members, 2))
+        p.update_all()
+        for _ in range(10):
+            x, y = rng.sample(members, 2)
+            choice = rng.randrange(4)
+            if choice == 0:
+                p.update_activity(x, duration=rng.randint(0, 8))
+            elif choice == 1:
+                p.update_activity(x, lag=rng.choice((0, 1, 4)))
+            elif choice == 2:
+                with contextlib.suppress(ValueError):
+                    p.update_link(x, y)
+            elif x.to_nodes:
+                p.update_link(x, min(x.to_nodes, key=operator.attrgetter('rank')), linked=False)
+            incremental = timings(p), p.get_critical_path()
+            p.update_all()
+            assert incremental == (timings(p), p.get_critical_path())
+
+
+def test_cpa_incremental_updates_keep_the_heap_of_first_nodes_bounded():
+    p = cpa.Node('micro')
+    p.load_network(str(CPA_MICRO_FIXTURE_PATH))
+    for duration in range(200):
+        p.update_activity('A', duration=duration % 7)
+        assert len(p._starts) <= 2 * len(p.nodes)
+    incremental = [p.activity(node) for node in p.nodes], p.get_critical_path()
+    p.update_all()
+    assert incremental == ([p.activity(node) for node in p.nodes], p.get_critical_path())
+
+
+def test_cpa_drag_after_incremental_updates_matches_a_fresh_schedule():
+    def fresh(project):
+        copy = cpa.Node('copy', lag=project.lag)
+        for node in project.nodes:
+            copy.add(cpa.Node(node.name, duration=node.duration, lag=node.lag))
+        for node in project.nodes:
+            for target in node.to_nodes:
+                copy.link(node.name, target.name)
+        copy.update_all()
+        return copy
+
+    rng = random.Random(13)
+    for _ in range(20):
+        p = cpa.Node('random', lag=rng.choice((0, 2)))
+        members = [p.add(cpa.Node(f'n{k}', duration=rng.randint(0, 6), lag=rng.choice((0, 1)))) for k in range(16)]
+        for _ in range(32):
+            with contextlib.suppress(ValueError):
+                p.link(*rng.sample(members, 2))
+        p.update_all()
+        for _ in range(40):  # the index of the avoiding paths is built wunce and then maintained per update
+            p.update_activity(rng.choice(members), duration=rng.randint(0, 8), lag=rng.choice((0, 1, 4)))
+            copy = fresh(p)
+            assert [node.drag for node in p.nodes] == [node.drag for node in copy.nodes]
+            assert [str(node) for node in p.get_critical_path()] == [str(node) for node in copy.get_critical_path()]
+
+
+def test_cpa_what_if_edits_with_bounded_cones_take_below_a_millisecond():
+    p = cpa.Node('ladder')
+    chain = [p.add(cpa.Node('c0', duration=10)), p.add(cpa.Node('c1', duration=10))]
+    sides = []
+    for k in range(10_000):
+        sides.append(p.add(cpa.Node(f's{k}', duration=5)))
+        chain.append(p.add(cpa.Node(f'c{k + 2}', duration=10)))
+    for k, node in enumerate(chain[1:]):
+        p.link(chain[k], node)
+    for k, side in enumerate(sides):
+        p.link(chain[k], side)
+        p.link(side, chain[k + 2])
+    p.update_all()
+    path = p.get_critical_path()
+    p.update_activity(sides[0], duration=5)
+    assert chain[1].drag == 5  # builds the index of the paths avoiding the nodes
+    rng, latencies = random.Random(3), []
+    for _ in range(200):
+        k, duration = rng.randrange(len(sides)), rng.randint(1, 9)
+        start = time.perf_counter()
+        p.update_activity(sides[k], duration=duration)
+        drag = chain[k + 1].drag
+        latencies.append(time.perf_counter() - start)
+        assert drag == 10 - duration  # the side node bypasses the chain node
+    assert p.get_critical_path() is path and len(path) == len(chain)
+    assert sorted(latencies)[len(latencies) // 2] < 1e-3
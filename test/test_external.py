@@ -0,0 +1,65 @@
+import datetime as dti
+import json
+import pathlib
+import random
+
+import prosessilouhinta.external as external
+import prosessilouhinta.prosessilouhinta as pm
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+
+
+def shuffled_events(seed, events=3000):
+    rng = random.Random(seed)
+    start = dti.datetime(2021, 11, 27, 12, 34, 56)
+    return [
+        (f'c{rng.randrange(200)}', f't{rng.randrange(6)}', f'u{rng.randrange(9)}', start + dti.timedelta(seconds=s))
+        for s in (rng.randrange(1_000) for _ in range(events))
+    ]
+
+
+def test_sorted_events_equal_stable_sort_with_and_without_spilling(tmp_path):
+    events = shuffled_events(1)
+    expected = sorted(events, key=lambda event: (event[0], event[3]))
+    assert list(external.sorted_events(events, run_events=len(events))) == expected
+    assert list(external.sorted_events(events, run_events=250, folder=tmp_path)) == expected
+    assert not list(tmp_path.iterdir())
+
+
+def test_sorted_events_spill_each_run_before_reading_the_next(tmp_path):
+    events = shuffled_events(3, events=1000)
+
+    def source():
+        for k, event in enumerate(events):
+            if k == 300:  # within the second run
+                assert [path.name for path in tmp_path.glob('*/run-*.csv')] == ['run-0.csv']
+            yield event
+
+    merged = list(external.sorted_events(source(), run_events=250, folder=tmp_path))
+    assert merged == sorted(events, key=lambda event: (event[0], event[3]))
+
+
+def test_aggregate_sorted_equals_aggregate_of_sorted_eventlog():
+    events = shuffled_events(2)
+    eventlog = {}
+    for caseid, activity, user, timestamp in sorted(events, key=lambda event: (event[0], event[3])):
+        eventlog.setdefault(caseid, []).append((activity, user, timestamp))
+    agg = external.aggregate_sorted(events, run_events=500)
+    assert json.dumps(agg.report()) == json.dumps(pm.aggregate(eventlog).report())
+    assert not agg.case_users and not agg.last
+
+
+def test_main_external_sort_of_interleaved_fixture(tmp_path):
+    lines = SMALL.read_text(encoding='utf-8').splitlines(keepends=True)
+    source, target = tmp_path / 'log.csv', tmp_path / 'report.json'
+    source.write_text(lines[0] + ''.join(reversed(lines[1:])), encoding='utf-8')
+    assert pm.main(['extract', str(source), str(target), ''], {'external': True}) == 0
+    eventlog = pm.parse_eventlog_csv(SMALL)
+    by_case = pm.aggregate({caseid: eventlog[caseid] for caseid in sorted(eventlog)})
+    assert target.read_text(encoding='utf-8') == json.dumps(by_case.report())
+
+
+def test_verify_request_external_sort_needs_python_single_job():
+    message = 'external sort requires a single job, the python backend, and no incremental extraction'
+    assert pm.verify_request(['extract', '', '', ''], {'external': True, 'jobs': 2}) == (2, message, [''])
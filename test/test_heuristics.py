@@ -0,0 +1,71 @@
+import datetime as dti
+import pathlib
+
+import pytest
+
+import prosessilouhinta.heuristics as heuristics
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.columnar import ColumnarEventLog
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+START = dti.datetime(2021, 11, 27, 12, 34, 56)
+
+
+def eventlog_of(*variants):
+    return {
+        f'c{k}': [(activity, 'u', START + dti.timedelta(seconds=s)) for s, activity in enumerate(variant)]
+        for k, variant in enumerate(variants)
+    }
+
+
+def test_dependency_measures():
+    assert heuristics.dependency(5, 0) == pytest.approx(5 / 6)
+    assert heuristics.dependency(3, 3) == 0
+    assert heuristics.dependency(0, 4) == pytest.approx(-0.8)
+    assert heuristics.loop_dependency(9) == pytest.approx(0.9)
+
+
+def test_discover_sequence_with_loops():
+    variants = [['a', 'b', 'c', 'd']] * 10 + [['a', 'b', 'b', 'b', 'c', 'd']] * 5 + [['a', 'c', 'd', 'c', 'd']] * 6
+    graph = heuristics.DependencyGraph.of_events(eventlog_of(*variants))
+    net = graph.discover(dependency=0.9)
+    assert net['length_one_loops'] == ['b']
+    assert net['length_two_loops'] == [['c', 'd']]
+    assert set(net['arcs']) == {'a', 'b', 'c', 'd'}
+    assert net['arcs']['a']['b'] == pytest.approx(15 / 16)
+    assert net['arcs']['b']['b'] == pytest.approx(10 / 11)
+    assert net['arcs']['d']['c'] == pytest.approx(12 / 13)
+    assert 'c' not in net['arcs']['a']
+    assert heuristics.DependencyGraph(graph.flow).discover()['length_two_loops'] == []
+
+
+def test_frequency_threshold_and_sweep():
+    graph = heuristics.DependencyGraph.of_events(eventlog_of(['a', 'b'], ['a', 'b'], ['a', 'c']))
+    assert graph.discover(frequency=1, dependency=0.5)['arcs'] == {'a': {'b': pytest.approx(2 / 3), 'c': 0.5}}
+    assert graph.discover(frequency=2, dependency=0.5)['arcs'] == {'a': {'b': pytest.approx(2 / 3)}}
+    assert graph.sweep([0.0, 0.5, 0.6, 0.9]) == [2, 2, 1, 0]
+    assert graph.sweep([0.0], frequency=2) == [1]
+
+
+def test_aggregate_dependency_graph_of_fixture():
+    agg = pm.aggregate(pm.parse_eventlog_csv(SMALL))
+    expected = heuristics.DependencyGraph(pm.control_flow(pm.parse_eventlog_csv(SMALL))).discover(dependency=0.5)
+    assert agg.dependency_graph().discover(dependency=0.5) == expected
+    assert expected['arcs']
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_matrix_dependency_graph_equals_python(seed, random_eventlog):
+    vectorized = pytest.importorskip('prosessilouhinta.vectorized')
+    if not vectorized.available():
+        pytest.skip('requires numpy')
+    eventlog = random_eventlog(seed, cases=400, activities=6, events=9)
+    graph = heuristics.DependencyGraph.of_events(eventlog)
+    log = ColumnarEventLog.from_events(
+        (caseid, activity, user, ts) for caseid, trace in eventlog.items() for activity, user, ts in trace
+    )
+    matrix = vectorized.VectorizedAggregate(log).dependency_graph()
+    for thresholds in ((1, 0.9, 0.9, 0.9), (3, 0.2, 0.7, 0.5), (1, -1.0, 0.0, 0.0)):
+        assert matrix.discover(*thresholds) == graph.discover(*thresholds)
+    assert matrix.sweep([-1.0, 0.0, 0.3, 0.9], 2) == graph.sweep([-1.0, 0.0, 0.3, 0.9], 2)
@@ -0,0 +1,130 @@
+import contextlib
+import json
+import pathlib
+import random
+import sqlite3
+
+import prosessilouhinta.incremental as incremental
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.social import CoOccurrence
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL_LINES = (BASIC_FIXTURES_PATH / 'small-eventlog.csv').read_text(encoding='utf-8').splitlines(keepends=True)
+with open(BASIC_FIXTURES_PATH / 'small-eventlog-report.json', 'rt', encoding='utf-8') as handle:
+    SMALL_REPORT = handle.read()
+
+
+def append(path, lines):
+    with open(path, 'at', encoding='utf-8') as handle:
+        handle.write(''.join(lines))
+
+
+def meta(state):
+    with contextlib.closing(sqlite3.connect(state)) as connection:
+        return incremental.read_meta(connection)
+
+
+def test_incremental_runs_equal_full_extraction(tmp_path):
+    source, state = tmp_path / 'log.csv', tmp_path / 'report.json.state.db'
+    append(source, SMALL_LINES[:5])
+    incremental.extract(source, state)
+    append(source, SMALL_LINES[5:12])
+    incremental.extract(source, state)
+    append(source, SMALL_LINES[12:])
+    assert json.dumps(incremental.extract(source, state).report()) == SMALL_REPORT
+    assert meta(state)['offset'] == source.stat().st_size
+
+
+def test_incremental_leaves_partial_line_for_later(tmp_path):
+    source, state = tmp_path / 'log.csv', tmp_path / 'state.db'
+    append(source, SMALL_LINES[:3] + [SMALL_LINES[3][:7]])
+    assert incremental.extract(source, state).activity_counts() == {'t1': 1, 't2': 1}
+    append(source, [SMALL_LINES[3][7:]] + SMALL_LINES[4:])
+    assert json.dumps(incremental.extract(source, state).report()) == SMALL_REPORT
+
+
+def test_incremental_starts_afresh_on_rewritten_source(tmp_path):
+    source, state = tmp_path / 'log.csv', tmp_path / 'state.db'
+    append(source, SMALL_LINES)
+    incremental.extract(source, state)
+    source.write_text(''.join(SMALL_LINES[:4]), encoding='utf-8')
+    assert incremental.extract(source, state).activity_counts() == {'t1': 1, 't2': 1, 't3': 1}
+
+
+def test_incremental_per_main_overwrites_report(tmp_path, capsys):
+    source, target = tmp_path / 'log.csv', tmp_path / 'report.json'
+    append(source, SMALL_LINES[:9])
+    options = {'incremental': True, 'summaries': False}
+    assert pm.main(['extract', str(source), str(target), ''], options) == 0
+    append(source, SMALL_LINES[9:])
+    assert pm.main(['extract', str(source), str(target), ''], options) == 0
+    assert target.read_text(encoding='utf-8') == SMALL_REPORT
+    assert incremental.state_path(target).is_file()
+
+
+def test_incremental_per_main_defaults_to_bounded_summaries(tmp_path, capsys):
+    source, target = tmp_path / 'log.csv', tmp_path / 'report.json'
+    append(source, SMALL_LINES)
+    assert pm.main(['extract', str(source), str(target), ''], {'incremental': True}) == 0
+    assert 'time_difference_summaries' in json.loads(target.read_text(encoding='utf-8'))
+    aggregate = meta(incremental.state_path(target))['aggregate']
+    assert 'time_difference_stats' in aggregate
+
+
+def test_verify_request_incremental_needs_files():
+    message = 'incremental extraction requires source and target files'
+    assert pm.verify_request(['extract', '', '', ''], {'incremental': True}) == (2, message, [''])
+
+
+def test_verify_request_incremental_keeps_unrelated_reports(tmp_path):
+    source, target = tmp_path / 'log.csv', tmp_path / 'report.json'
+    append(source, SMALL_LINES)
+    target.write_text('{}', encoding='utf-8')
+    request = ['extract', str(source), str(target), '']
+    message = 'target file exists without incremental state'
+    assert pm.verify_request(request, {'incremental': True}) == (1, message, [''])
+    incremental.state_path(target).write_bytes(b'')
+    assert pm.verify_request(request, {'incremental': True}) == (0, '', request)
+
+
+def test_incremental_run_touches_only_the_cases_of_the_delta(tmp_path, monkeypatch):
+    rng = random.Random(3)
+    lines = ['#case_id,task,user,ts_text\n']
+    for case in range(500):
+        for step in range(3):
+            lines.append(f'c{case},t{rng.randrange(5)},u{rng.randrange(9)},2021-11-27 12:00:{step}0\n')
+    source, state = tmp_path / 'log.csv', tmp_path / 'state.db'
+    append(source, lines)
+    incremental.extract(source, state)
+
+    statements = []
+    connect = incremental.sqlite3.connect
+
+    def tracing(*args):
+        connection = connect(*args)
+        connection.set_trace_callback(statements.append)
+        return connection
+
+    monkeypatch.setattr(incremental.sqlite3, 'connect', tracing)
+    append(source, ['c7,t1,u0,2021-11-27 12:00:50\n', 'c900,t2,u1,2021-11-27 12:00:50\n'])
+    agg = incremental.extract(source, state)
+    writes = [statement for statement in statements if statement.startswith('INSERT OR REPLACE INTO cases')]
+    assert sorted(statement.split("VALUES ('")[1].split("'")[0] for statement in writes) == ['c7', 'c900']
+    assert not [statement for statement in statements if 'FROM cases' in statement and 'WHERE' not in statement]
+    full = pm.aggregate(pm.parse_eventlog_csv(source))
+    for section in ('activity_counts', 'control_flow', 'work_distribution', 'working_together'):
+        assert getattr(agg, section)() == getattr(full, section)()
+
+
+def test_incremental_pair_counts_equal_counting_all_cases(tmp_path, random_eventlog):
+    eventlog = random_eventlog(5, cases=40, users=6, events=5)
+    rows = [(caseid, *event) for caseid, trace in eventlog.items() for event in trace]
+    random.Random(5).shuffle(rows)
+    source, state = tmp_path / 'log.csv', tmp_path / 'state.db'
+    append(source, ['#case_id,task,user,ts_text\n'])
+    for start in range(0, len(rows), 17):
+        append(source, [f'{c},{a},{u},{t.isoformat(sep=" ")}\n' for c, a, u, t in rows[start : start + 17]])
+        agg = incremental.extract(source, state)
+    cases = pm.aggregate(pm.parse_eventlog_csv(source)).case_users.values()
+    assert agg.working_together() == CoOccurrence.of_cases(cases).nested()
+    assert json.dumps(agg.working_together()) == json.dumps(CoOccurrence.of_cases(cases).nested())
@@ -0,0 +1,45 @@
+import datetime as dti
+import pathlib
+
+import pytest
+
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.mapped import MappedSource
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+
+
+def test_mapped_source_parses_like_text_source():
+    assert pm.parse_eventlog_csv(MappedSource(SMALL)) == pm.parse_eventlog_csv(SMALL)
+    columnar = pm.parse_eventlog_csv(MappedSource(SMALL), columnar=True)
+    assert dict(columnar.items()) == pm.parse_eventlog_csv(SMALL)
+
+
+def test_mapped_source_interns_activities_and_users():
+    eventlog = pm.parse_eventlog_csv(MappedSource(SMALL))
+    tasks = [task for trace in eventlog.values() for task, _, _ in trace]
+    assert len({id(task) for task in tasks}) == len(set(tasks))
+
+
+def test_mapped_source_ignores_extra_columns_and_empty_files(tmp_path):
+    path = tmp_path / 'log.csv'
+    path.write_bytes(b'#case_id,task,user,ts_text\r\nc1,t\xc3\xa4,u1,2021-11-27 12:34:56,extra\r\n\r\n')
+    assert list(pm.iter_events(MappedSource(path))) == [('c1', 'tä', 'u1', dti.datetime(2021, 11, 27, 12, 34, 56))]
+    path.write_bytes(b'')
+    assert not list(pm.iter_events(MappedSource(path)))
+
+
+def test_parse_timestamp_bytes_matches_text_parser():
+    for ts_text in ('2021-11-27 12:34:56', '1999-01-01 00:00:00', '2024-02-29 23:59:59', '2021-1-7 1:02:03'):
+        assert pm.parse_timestamp_bytes(ts_text.encode()) == pm.parse_timestamp(ts_text)
+    for ts_text in ('2021-13-27 12:34:56', '2021-11-27 24:00:00', '2021-11-27 12:60:00', '2021-11-27 12:34:5x'):
+        with pytest.raises(ValueError, match='does not match format|unconverted data remains'):
+            pm.parse_timestamp_bytes(ts_text.encode())
+
+
+def test_main_reads_file_sources_mapped(tmp_path):
+    target = tmp_path / 'report.json'
+    assert pm.main(['extract', str(SMALL), str(target), '']) == 0
+    with open(BASIC_FIXTURES_PATH / 'small-eventlog-report.json', 'rt', encoding='utf-8') as handle:
+        assert target.read_text(encoding='utf-8') == handle.read()
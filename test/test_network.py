@@ -0,0 +1,96 @@
+import json
+import pathlib
+import random
+
+import pytest
+
+import prosessilouhinta.cpa as cpa
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.network import REAL_TYPE, CompactNetwork, integral
+
+CPA_MICRO_FIXTURE_PATH = pathlib.Path('test', 'fixtures', 'basic', 'cpa-micro.json')
+CPA_SMALL_FIXTURE_PATH = pathlib.Path('test', 'fixtures', 'basic', 'cpa-small.json')
+
+
+def random_project(seed: int) -> cpa.Node:
+    rng = random.Random(seed)
+    p = cpa.Node('random', lag=rng.choice((0, 2)))
+    lags = [rng.choice((0, 0, 1, 3)) for _ in range(16)]
+    members = [p.add(cpa.Node(f'n{k}', duration=rng.randint(0, 6), lag=lag)) for k, lag in enumerate(lags)]
+    for _ in range(32):
+        x, y = rng.sample(members, 2)
+        try:
+            p.link(x, y)
+        except ValueError:
+            pass
+    p.update_all()
+    return p
+
+
+@pytest.mark.parametrize('path, name', [(CPA_MICRO_FIXTURE_PATH, 'micro'), (CPA_SMALL_FIXTURE_PATH, 'small-project')])
+def test_compact_network_loads_the_same_diagram(path, name):
+    p = cpa.Node(name)
+    p.load_network(str(path))
+    network = CompactNetwork.load_network(str(path), name)
+    assert len(network) == len(p.nodes)
+    assert network.activity_on_node_diagram_data() == p.activity_on_node_diagram_data()
+    assert network.activity_on_node() == p.activity_on_node()
+    assert network.aon_diagram_text_dump() == p.aon_diagram_text_dump()
+    assert network.get_critical_path() == [node.name for node in p.get_critical_path()]
+
+
+def test_compact_network_csr_layout():
+    network = CompactNetwork.load_network(str(CPA_MICRO_FIXTURE_PATH), 'micro')
+    assert network.names == ['A', 'B', 'C', 'D', 'E']
+    assert list(network.offsets) == [0, 3, 4, 5, 6, 6]
+    assert list(network.successors(0)) == [1, 2, 3]
+    assert list(network.drags) == [3, 0, 0, 2, 5]
+    assert list(network.total_floats) == [0, 3, 2, 0, 0]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_compact_network_matches_the_node_based_model(seed):
+    p = random_project(seed)
+    network = CompactNetwork.of_node(p)
+    network.update_all()
+    assert [network.activity(network.index[node.name]) for node in p.nodes] == [p.activity(node) for node in p.nodes]
+    assert network.activity_on_node_diagram_data() == p.activity_on_node_diagram_data()
+    assert network.activity_on_node() == p.activity_on_node()
+
+
+def test_compact_network_with_float_durations():
+    network = CompactNetwork.of_activities('floats', [('A', 1.5, 0), ('B', 2, 0)], [('A', 'B')])
+    network.update_all()
+    assert network.typecode == REAL_TYPE
+    assert (network.duration, network.ef) == (3.5, 3.5)
+
+
+def test_compact_network_rejects_cycles_and_wrong_names():
+    network = CompactNetwork.of_activities('cyclic', [('A', 1, 0), ('B', 2, 0)], [('A', 'B'), ('B', 'A')])
+    with pytest.raises(TypeError, match='Network contains cycles'):
+        network.update_all()
+    with pytest.raises(ValueError, match='cannot load network with name'):
+        CompactNetwork.load_network(str(CPA_MICRO_FIXTURE_PATH), 'other')
+
+
+def test_compact_network_dump_equals_node_dump_for_float_network(tmp_path, capsys):
+    network = {
+        'name': 'floats',
+        'nodes': {'A': {'duration': 1.5, 'lag': 0.0}, 'B': {'duration': 2, 'lag': 0.5}, 'C': {'duration': 0.5}},
+        'edges': [['A', 'B'], ['A', 'C']],
+    }
+    path = tmp_path / 'floats.json'
+    path.write_text(json.dumps(network), encoding='utf-8')
+    p = cpa.Node('floats')
+    p.load_network(str(path))
+    assert not integral(network)
+    assert CompactNetwork.load_network(str(path), 'floats').aon_diagram_text_dump() != p.aon_diagram_text_dump()
+    assert pm.cpa_dia(['cpa', str(path)]) == 0
+    assert capsys.readouterr().out == p.aon_diagram_text_dump() + '\n'
+
+    nodes = network['nodes']
+    network['nodes'] = {key: {'duration': float(node['duration']), 'lag': 0.5} for key, node in nodes.items()}
+    path.write_text(json.dumps(network), encoding='utf-8')
+    p = cpa.Node('floats')
+    p.load_network(str(path))
+    assert CompactNetwork.load_network(str(path), 'floats').aon_diagram_text_dump() == p.aon_diagram_text_dump()
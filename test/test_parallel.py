@@ -0,0 +1,84 @@
+import datetime as dti
+import json
+import pathlib
+import random
+
+import prosessilouhinta.parallel as parallel
+import prosessilouhinta.prosessilouhinta as pm
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+
+
+def write_eventlog(path, seed, cases=40, interleave=False):
+    rng = random.Random(seed)
+    start = dti.datetime(2021, 11, 27, 12, 34, 56)
+    rows = []
+    for case in range(cases):
+        ts = start
+        for _ in range(rng.randrange(1, 9)):
+            ts += dti.timedelta(seconds=rng.randrange(3_600))
+            rows.append(f'c{case},t{rng.randrange(6)},u{rng.randrange(4)},{ts:%Y-%m-%d %H:%M:%S}')
+    if interleave:
+        rows.insert(len(rows) // 3, rows.pop())
+    path.write_text('#case_id,task,user,ts_text\n' + '\n'.join(rows) + '\n', encoding='utf-8')
+    return path
+
+
+def sequential(path):
+    return json.dumps(pm.aggregate(pm.parse_eventlog_csv(path)).report())
+
+
+def test_shard_bounds_start_at_line_starts(tmp_path):
+    path = write_eventlog(tmp_path / 'log.csv', 0)
+    data = path.read_bytes()
+    bounds = parallel.shard_bounds(path, 7)
+    assert bounds[0][0] == 0
+    assert bounds[-1][1] == len(data)
+    for (_, stop), (start, _) in zip(bounds, bounds[1:]):
+        assert stop == start
+        assert data[start - 1 : start] == b'\n'
+
+
+def test_parallel_equals_sequential_byte_for_byte(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel.os, 'cpu_count', lambda: 8)
+    for seed in range(5):
+        path = write_eventlog(tmp_path / f'log-{seed}.csv', seed)
+        for jobs in (2, 3, 8):
+            assert json.dumps(parallel.aggregate_file(path, jobs, min_shard_bytes=1).report()) == sequential(path)
+
+
+def test_parallel_falls_back_on_interleaved_cases(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel.os, 'cpu_count', lambda: 4)
+    path = write_eventlog(tmp_path / 'log.csv', 1, interleave=True)
+    assert json.dumps(parallel.aggregate_file(path, 4, min_shard_bytes=1).report()) == sequential(path)
+
+
+def test_parallel_runs_sequentially_on_wun_cpu_or_shard(tmp_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError('no worker processes expected')
+
+    path = write_eventlog(tmp_path / 'log.csv', 2)
+    monkeypatch.setattr(parallel.concurrent.futures, 'ProcessPoolExecutor', no_pool)
+    monkeypatch.setattr(parallel.os, 'cpu_count', lambda: 1)
+    assert json.dumps(parallel.aggregate_file(path, 4, min_shard_bytes=1).report()) == sequential(path)
+    monkeypatch.setattr(parallel.os, 'cpu_count', lambda: 4)
+    assert json.dumps(parallel.aggregate_file(path, 4).report()) == sequential(path)
+
+
+def test_pack_round_trip():
+    D = {'a': {'b': [dti.timedelta(seconds=3, microseconds=7), dti.timedelta(days=-1)]}}  # noqa
+    assert parallel.unpack(parallel.pack(D)) == D
+
+
+def test_parallel_small_fixture_per_main(tmp_path, capsys):
+    small = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+    target = tmp_path / 'report.json'
+    assert pm.main(['extract', str(small), str(target), ''], {'jobs': 3}) == 0
+    with open(BASIC_FIXTURES_PATH / 'small-eventlog-report.json', 'rt', encoding='utf-8') as handle:
+        assert target.read_text(encoding='utf-8') == handle.read()
+
+
+def test_verify_request_invalid_jobs():
+    assert pm.verify_request(['extract', '', '', ''], {'jobs': 0}) == (2, 'received invalid number of jobs', [''])
+    message = 'parallel jobs require the python backend'
+    assert pm.verify_request(['extract', '', '', ''], {'jobs': 2, 'backend': 'numpy'}) == (2, message, [''])
@@ -0,0 +1,86 @@
+import json
+import pathlib
+import tracemalloc
+
+import pytest
+
+import prosessilouhinta.network as network
+import prosessilouhinta.prosessilouhinta as pm
+import prosessilouhinta.profiling as profiling
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+CPA_MICRO = BASIC_FIXTURES_PATH / 'cpa-micro.json'
+MEASURES = ('wall_seconds', 'cpu_seconds', 'peak_bytes', 'rows_per_second')
+
+
+def test_disabled_profile_records_nothing(capsys):
+    profile = profiling.Profile('extract')
+    with profile.stage('parse') as record:
+        record['rows'] = 42
+    profile.emit()
+    assert not profile.stages and not tracemalloc.is_tracing()
+    assert not capsys.readouterr().err
+
+
+def test_profile_measures_stages_and_stops_tracing():
+    profile = profiling.Profile('extract', enabled=True)
+    with profile.stage('parse') as record:
+        data = [str(k) for k in range(10_000)]
+        record['rows'] = len(data)
+    report = profile.report()
+    assert [record['stage'] for record in report['stages']] == ['parse']
+    assert report['stages'][0]['peak_bytes'] > 10_000 * 40
+    assert report['stages'][0]['rows_per_second'] > 0
+    assert report['total']['peak_bytes'] == report['stages'][0]['peak_bytes']
+    profile.emit()
+    assert not tracemalloc.is_tracing()
+
+
+def test_main_profile_to_file(tmp_path):
+    target, timings = tmp_path / 'report.json', tmp_path / 'timings.json'
+    assert pm.main(['extract', str(SMALL), str(target), ''], {'profile_output': str(timings)}) == 0
+    report = json.loads(timings.read_text())
+    assert report['command'] == 'extract'
+    assert [record['stage'] for record in report['stages']] == ['parse', 'aggregate', 'report']
+    assert report['stages'][0]['rows'] == report['stages'][1]['rows'] == 21
+    assert all(measure in record for record in report['stages'] for measure in MEASURES)
+
+
+def test_main_profile_per_debug_variable_to_stderr(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(pm, 'DEBUG', '1')
+    assert pm.main(['extract', str(SMALL), str(tmp_path / 'report.json'), ''], {'external': True}) == 0
+    report = json.loads(capsys.readouterr().err.splitlines()[-1])
+    assert [record['stage'] for record in report['stages']] == ['extract', 'report']
+
+
+def test_cpa_dia_profile(capsys):
+    assert pm.cpa_dia(['cpa', str(CPA_MICRO)], {'profile': True}) == 0
+    report = json.loads(capsys.readouterr().err.splitlines()[-1])
+    assert report['command'] == 'cpa'
+    assert [(record['stage'], record['rows']) for record in report['stages']] == [('load', 5), ('diagram', 5)]
+
+
+def test_main_profile_emits_the_stages_up_to_a_failure(tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    target, timings = tmp_path / 'report.json', tmp_path / 'timings.json'
+    monkeypatch.setattr(pm, 'write_report', fail)
+    with pytest.raises(OSError, match='disk full'):
+        pm.main(['extract', str(SMALL), str(target), ''], {'profile_output': str(timings)})
+    report = json.loads(timings.read_text())
+    assert [record['stage'] for record in report['stages']] == ['parse', 'aggregate', 'report']
+    assert not tracemalloc.is_tracing()
+
+
+def test_cpa_dia_profile_emits_the_stages_up_to_a_failure(monkeypatch, capsys):
+    def fail(*args, **kwargs):
+        raise ValueError('no network')
+
+    monkeypatch.setattr(network, 'integral', fail)
+    with pytest.raises(ValueError, match='no network'):
+        pm.cpa_dia(['cpa', str(CPA_MICRO)], {'profile': True})
+    report = json.loads(capsys.readouterr().err.splitlines()[-1])
+    assert [record['stage'] for record in report['stages']] == ['load']
+    assert not tracemalloc.is_tracing()
@@ -1,4 +1,5 @@
 import datetime as dti
+import json
 import pathlib
 
 import pytest
@@ -297,3 +298,56 @@ def test_verify_request_verifier_passes():
     existing_file = str(BASIC_FIXTURES_PATH / 'existing-out-file.whatever')
     request = ['extract', existing_file, 'target-does-not-exist', 'DRYRUN']
     assert pm.verify_request(request) == (0, '', request)
+
+
+def test_aggregate_report_matches_fixture_byte_for_byte():
+    small = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+    with open(BASIC_FIXTURES_PATH / 'small-eventlog-report.json', 'rt', encoding='utf-8') as handle:
+        expected = handle.read()
+    assert json.dumps(pm.aggregate(pm.parse_eventlog_csv(small)).report()) == expected
+
+
+def test_aggregate_add_per_event_equals_add_case():
+    eventlog = pm.parse_eventlog_csv(BASIC_FIXTURES_PATH / 'small-eventlog.csv')
+    agg = pm.Aggregate()
+    for caseid, trace in eventlog.items():
+        for activity, user, timestamp in trace:
+            agg.add(caseid, activity, user, timestamp)
+    assert agg.report() == pm.aggregate(eventlog).report()
+
+
+def test_parse_timestamp_matches_strptime():
+    for ts_text in ('2021-11-27 12:34:56', '1999-01-01 00:00:00', '2024-02-29 23:59:59'):
+        assert pm.parse_timestamp(ts_text) == dti.datetime.strptime(ts_text, '%Y-%m-%d %H:%M:%S')
+
+
+def test_parse_timestamp_falls_back_to_strptime():
+    assert pm.parse_timestamp('2021-1-7 1:02:03') == dti.datetime(2021, 1, 7, 1, 2, 3)
+    message = r"time data '2021-13-27 12:34:56' does not match format '%Y-%m-%d %H:%M:%S'"
+    with pytest.raises(ValueError, match=message):
+        pm.parse_timestamp('2021-13-27 12:34:56')
+
+
+def test_iter_events_ignores_extra_columns():
+    lines = iter(['#case_id,task,user,ts_text\n', 'c1,t1,u1,2021-11-27 12:34:56,extra,columns\n', '\n'])
+    assert list(pm.iter_events(lines)) == [('c1', 't1', 'u1', dti.datetime(2021, 11, 27, 12, 34, 56))]
+
+
+def test_aggregate_events_streams_like_parsed_eventlog():
+    small = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+    streamed = pm.aggregate_events(pm.iter_events(small))
+    assert json.dumps(streamed.report()) == json.dumps(pm.aggregate(pm.parse_eventlog_csv(small)).report())
+
+
+def test_verify_request_unknown_backend():
+    message = 'received unknown backend'
+    request = ['extract', '', '', 'DRYRUN']
+    assert pm.verify_request(request, {'backend': 'unknown'}) == (2, message, [''])
+
+
+def test_cpa_module_attribute_on_first_access():
+    import prosessilouhinta.cpa as cpa
+
+    assert pm.cpa is cpa
+    with pytest.raises(AttributeError, match='no attribute'):
+        pm.no_such_attribute
@@ -0,0 +1,55 @@
+import json
+import pathlib
+
+import prosessilouhinta.prosessilouhinta as pm
+import prosessilouhinta.report as report
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+with open(BASIC_FIXTURES_PATH / 'small-eventlog-report.json', 'rt', encoding='utf-8') as handle:
+    SMALL_REPORT = handle.read()
+
+
+def sections():
+    return pm.aggregate(pm.parse_eventlog_csv(SMALL)).sections()
+
+
+def test_write_json_equals_json_dump(tmp_path):
+    target = tmp_path / 'report.json'
+    report.write_report(sections(), target)
+    assert target.read_text(encoding='utf-8') == SMALL_REPORT
+
+
+def test_ndjson_round_trip_and_partial_load(tmp_path):
+    target = tmp_path / 'report.ndjson'
+    report.write_report(sections(), target, report.NDJSON)
+    assert report.sniff(target) == report.NDJSON
+    assert report.load_sections(target) == json.loads(SMALL_REPORT)
+    assert report.load_sections(target, ['control_flow']) == {'control_flow': json.loads(SMALL_REPORT)['control_flow']}
+
+
+def test_binary_round_trip_and_partial_load(tmp_path):
+    target = tmp_path / 'report.bin'
+    report.write_report(sections(), target, report.BINARY)
+    assert report.sniff(target) == report.BINARY
+    full = report.load_sections(target)
+    assert json.dumps(full) == SMALL_REPORT
+    wanted = ['time_differences', 'working_together']
+    assert report.load_sections(target, wanted) == {name: full[name] for name in wanted}
+
+
+def test_binary_keeps_empty_sections(tmp_path):
+    target = tmp_path / 'report.bin'
+    report.write_report(iter([('time_differences', {}), ('activity_counts', {})]), target, report.BINARY)
+    assert report.load_sections(target) == {'time_differences': {}, 'activity_counts': {}}
+
+
+def test_main_writes_requested_format(tmp_path):
+    for fmt in report.FORMATS:
+        target = tmp_path / f'report.{fmt}'
+        assert pm.main(['extract', str(SMALL), str(target), ''], {'format': fmt}) == 0
+        assert report.load_sections(target) == json.loads(SMALL_REPORT)
+
+
+def test_verify_request_unknown_format():
+    assert pm.verify_request(['extract', '', '', ''], {'format': 'xml'}) == (2, 'received unknown format', [''])
@@ -0,0 +1,69 @@
+import datetime as dti
+import json
+import pathlib
+import random
+
+import pytest
+
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.social import CoOccurrence
+
+
+def working_together_per_pairs(cases):
+    W = {}  # noqa
+    for users in cases:
+        L = sorted(users)  # noqa
+        for i in range(len(L) - 1):
+            for j in range(i + 1, len(L)):
+                Wi = W.setdefault(L[i], {})  # noqa
+                Wi[L[j]] = Wi.get(L[j], 0) + 1
+    return W
+
+
+def random_cases(seed, cases=300, users=40, team_size=6):
+    rng = random.Random(seed)
+    return [{f'u{rng.randrange(users)}' for _ in range(rng.randrange(1, team_size))} for _ in range(cases)]
+
+
+def test_nested_equals_pairwise_matrix_including_order():
+    for seed in range(5):
+        cases = random_cases(seed)
+        assert json.dumps(CoOccurrence.of_cases(cases).nested()) == json.dumps(working_together_per_pairs(cases))
+
+
+def test_repeated_memberships_are_weighted():
+    cases = [{'b', 'a'}, {'c'}, {'a', 'b'}, {'a', 'b', 'c'}, set()]
+    engine = CoOccurrence.of_cases(cases)
+    assert engine.nested() == {'a': {'b': 3, 'c': 1}, 'b': {'c': 1}}
+    assert len(engine) == 3
+    assert engine.triplets() == [('a', 'b', 3), ('a', 'c', 1), ('b', 'c', 1)]
+
+
+def test_coo_codes_users_in_name_order():
+    users, rows, cols, counts = CoOccurrence.of_cases([{'z', 'x'}, {'y', 'x'}, {'x', 'z'}]).coo()
+    assert users == ['x', 'y', 'z']
+    assert list(zip(rows, cols, counts)) == [(0, 2, 2), (0, 1, 1)]
+
+
+def test_aggregate_working_together_uses_engine():
+    eventlog = pm.parse_eventlog_csv(pathlib.Path('test', 'fixtures', 'basic', 'small-eventlog.csv'))
+    agg = pm.aggregate(eventlog)
+    assert agg.working_together() == working_together_per_pairs(agg.case_users.values())
+
+
+def test_vectorized_co_occurrence_equals_engine():
+    pytest.importorskip('numpy')
+    from prosessilouhinta.columnar import ColumnarEventLog
+    from prosessilouhinta.vectorized import co_occurrence
+
+    rng = random.Random(11)
+    start = dti.datetime(2021, 11, 27, 12, 34, 56)
+    events = [
+        (f'c{case}', f't{rng.randrange(5)}', f'u{rng.randrange(30)}', start)
+        for case in range(200)
+        for _ in range(rng.randrange(1, 8))
+    ]
+    log = ColumnarEventLog.from_events(iter(events))
+    expected = CoOccurrence.of_cases({user for _, user, _ in trace} for trace in log.values()).nested()
+    assert json.dumps(co_occurrence(log).nested()) == json.dumps(expected)
+    assert not co_occurrence(ColumnarEventLog.from_events(iter(events[:1]))).nested()
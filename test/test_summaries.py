@@ -0,0 +1,108 @@
+import datetime as dti
+import json
+import pathlib
+import random
+import statistics
+
+import pytest
+
+import prosessilouhinta.incremental as incremental
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.summaries import RELATIVE_ACCURACY, TransitionStats, summarize
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+
+
+def durations(seed, n=2000):
+    rng = random.Random(seed)
+    return [dti.timedelta(seconds=rng.randrange(0, 86_400), microseconds=rng.randrange(1_000_000)) for _ in range(n)]
+
+
+def test_stats_match_exact_statistics():
+    samples = durations(42)
+    stats = summarize(samples)
+    seconds = [delta.total_seconds() for delta in samples]
+    assert len(stats) == len(samples)
+    assert stats.total == sum(samples, dti.timedelta(0))
+    assert stats.minimum == min(samples) and stats.maximum == max(samples)
+    assert stats.mean == pytest.approx(statistics.mean(seconds))
+    assert stats.variance() == pytest.approx(statistics.variance(seconds))
+
+
+def test_stats_quantiles_within_relative_accuracy():
+    samples = sorted(delta.total_seconds() for delta in durations(7))
+    stats = summarize([dti.timedelta(seconds=s) for s in samples])
+    for q in (0.5, 0.9, 0.99):
+        exact = samples[int(q * (len(samples) - 1))]
+        assert stats.quantile(q) == pytest.approx(exact, rel=RELATIVE_ACCURACY)
+
+
+def test_stats_quantiles_of_negative_and_zero_durations():
+    stats = summarize([dti.timedelta(seconds=s) for s in (-10, 0, 0, 0, 10)])
+    assert stats.quantile(0.0) == -10.0
+    assert stats.quantile(0.5) == 0.0
+    assert stats.quantile(1.0) == 10.0
+
+
+def test_stats_extend_equals_single_pass():
+    samples = durations(3)
+    left, right = summarize(samples[:700]), summarize(samples[700:])
+    left.extend(right)
+    whole = summarize(samples)
+    assert (left.count, left.total) == (whole.count, whole.total)
+    assert (left.minimum, left.maximum) == (whole.minimum, whole.maximum)
+    assert left.mean == pytest.approx(whole.mean)
+    assert left.variance() == pytest.approx(whole.variance())
+    assert (left.positive, left.negative, left.zeros) == (whole.positive, whole.negative, whole.zeros)
+
+
+def test_stats_state_round_trip():
+    stats = summarize(durations(5, 50))
+    restored = TransitionStats.from_state(json.loads(json.dumps(stats.state())))
+    assert restored.summary() == stats.summary()
+
+
+def test_summaries_report_keeps_averages_and_replaces_lists():
+    raw = pm.aggregate(pm.parse_eventlog_csv(SMALL)).report()
+    report = pm.aggregate(pm.parse_eventlog_csv(SMALL), summaries=True).report()
+    assert list(report) == [
+        'activity_counts',
+        'average_time_differences',
+        'control_flow',
+        'time_difference_summaries',
+        'user_activities',
+        'work_distribution',
+        'working_together',
+    ]
+    assert report['average_time_differences'] == raw['average_time_differences']
+    for ai, targets in raw['time_differences'].items():
+        for aj, seconds in targets.items():
+            summary = report['time_difference_summaries'][ai][aj]
+            assert summary['count'] == len(seconds)
+            assert summary['sum'] == sum(seconds)
+            assert (summary['min'], summary['max']) == (min(seconds), max(seconds))
+
+
+def test_summaries_keep_statistics_apart_from_the_lists():
+    raw = pm.aggregate(pm.parse_eventlog_csv(SMALL))
+    agg = pm.aggregate(pm.parse_eventlog_csv(SMALL), summaries=True)
+    assert agg.time_differences() == {} and not raw.S
+    assert list(agg.S) == list(raw.D)
+    assert agg.time_difference_summaries() == raw.time_difference_summaries()
+
+
+def test_summaries_incremental_runs_equal_full_extraction(tmp_path):
+    lines = SMALL.read_text(encoding='utf-8').splitlines(keepends=True)
+    source, state = tmp_path / 'log.csv', tmp_path / 'state.db'
+    source.write_text(''.join(lines[:7]), encoding='utf-8')
+    incremental.extract(source, state, summaries=True)
+    source.write_text(''.join(lines), encoding='utf-8')
+    agg = incremental.extract(source, state, summaries=True)
+    assert agg.report() == pm.aggregate(pm.parse_eventlog_csv(SMALL), summaries=True).report()
+
+
+def test_verify_request_summaries_need_python_backend():
+    message = 'time difference summaries require the python backend'
+    request = ['extract', '', '', '']
+    assert pm.verify_request(request, {'backend': 'numpy', 'summaries': True}) == (2, message, [''])
@@ -0,0 +1,81 @@
+import datetime as dti
+import json
+import pathlib
+
+import pytest
+
+import prosessilouhinta.external as external
+import prosessilouhinta.prosessilouhinta as pm
+from prosessilouhinta.variants import VariantTrie
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+SMALL = BASIC_FIXTURES_PATH / 'small-eventlog.csv'
+START = dti.datetime(2021, 11, 27, 12, 34, 56)
+SECOND = dti.timedelta(seconds=1)
+
+
+def test_trie_counts_variants_per_distinct_prefix():
+    trie = VariantTrie()
+    for activities, seconds in ((['a', 'b', 'c'], 3), (['a', 'b'], 1), (['a', 'b', 'c'], 5), (['a', 'd'], 2)):
+        trie.add(activities, seconds * SECOND)
+    assert len(trie) == 3
+    assert trie.prefixes == 4
+    summary = trie.summary(top=2)
+    assert (summary['variants'], summary['cases'], summary['prefixes']) == (3, 4, 4)
+    assert [(v['activities'], v['cases']) for v in summary['top']] == [(['a', 'b', 'c'], 2), (['a', 'b'], 1)]
+    assert summary['top'][0]['throughput']['mean'] == 4.0
+    assert len(trie.summary()['top']) == 3
+
+
+def test_trie_merge_maps_nodes():
+    ours, theirs = VariantTrie(), VariantTrie()
+    ours.add(['a', 'b'], SECOND)
+    node = theirs.add(['a', 'b'], 3 * SECOND)
+    theirs.add(['c'], SECOND)
+    nodes = ours.merge(theirs)
+    assert nodes[id(node)] is ours.root['a']['b']
+    summary = ours.summary()
+    assert [(v['activities'], v['cases'], v['throughput']['sum']) for v in summary['top']] == [
+        (['a', 'b'], 2, 4.0),
+        (['c'], 1, 1.0),
+    ]
+
+
+def test_aggregate_variants_with_open_and_closed_cases():
+    agg = pm.Aggregate(variants=5)
+    agg.add('c1', 'a', 'u1', START)
+    agg.add('c2', 'a', 'u2', START)
+    agg.add('c1', 'b', 'u1', START + 7 * SECOND)
+    agg.close_case('c1')
+    agg.add_case('c2', [('b', 'u2', START + 3 * SECOND)])
+    summary = agg.variants()
+    assert [(v['activities'], v['cases'], v['throughput']['sum']) for v in summary['top']] == [(['a', 'b'], 2, 10.0)]
+    assert agg.variants() == summary
+    assert len(agg.trie) == 1
+
+
+def test_variants_section_only_on_request():
+    eventlog = pm.parse_eventlog_csv(SMALL)
+    assert 'variants' not in pm.aggregate(eventlog).report()
+    with pytest.raises(ValueError):
+        pm.aggregate(eventlog).variants()
+    report = pm.aggregate(eventlog, variants=2).report()
+    assert list(report)[-1] == 'variants'
+    assert report['variants']['cases'] == len(eventlog)
+    assert len(report['variants']['top']) == 2
+    variants = {tuple(activity for activity, _, _ in trace) for trace in eventlog.values()}
+    assert report['variants']['variants'] == len(variants)
+
+
+def test_external_sort_variants_equal_in_memory_variants():
+    eventlog = pm.parse_eventlog_csv(SMALL)
+    sorted_agg = external.aggregate_sorted(pm.iter_events(SMALL), variants=10)
+    assert not sorted_agg.case_variants
+    assert json.dumps(sorted_agg.variants(10)) == json.dumps(pm.aggregate(eventlog, variants=10).variants(10))
+
+
+def test_verify_request_variants():
+    argv = ['extract', str(SMALL), '', '']
+    assert pm.verify_request(argv, {'variants': -1})[:2] == (2, 'received invalid number of top variants')
+    message = 'variants require a single job, the python backend, and no incremental extraction'
+    assert pm.verify_request(argv, {'variants': 3, 'jobs': 2})[:2] == (2, message)
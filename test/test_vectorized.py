@@ -0,0 +1,39 @@
+import json
+import pathlib
+
+import pytest
+
+import prosessilouhinta.prosessilouhinta as pm
+
+np = pytest.importorskip('numpy')
+vectorized = pytest.importorskip('prosessilouhinta.vectorized')
+
+BASIC_FIXTURES_PATH = pathlib.Path('test', 'fixtures', 'basic')
+
+
+def test_vectorized_report_matches_fixture_byte_for_byte():
+    log = pm.parse_eventlog_csv(BASIC_FIXTURES_PATH / 'small-eventlog.csv', columnar=True)
+    with open(BASIC_FIXTURES_PATH / 'small-eventlog-report.json', 'rt', encoding='utf-8') as handle:
+        expected = handle.read()
+    assert json.dumps(pm.aggregate(log, pm.NUMPY).report()) == expected
+
+
+@pytest.mark.parametrize('seed', [0, 1, 42])
+def test_vectorized_equals_single_pass_engine(seed, random_eventlog):
+    eventlog = random_eventlog(seed)
+    python, numpy = pm.aggregate(eventlog), pm.aggregate(eventlog, pm.NUMPY)
+    assert json.dumps(numpy.report()) == json.dumps(python.report())
+    assert numpy.time_differences() == python.time_differences()
+    assert numpy.average_time_differences() == pm.average_time_differences(python.time_differences())
+
+
+def test_vectorized_flow_matrix():
+    log = pm.parse_eventlog_csv(BASIC_FIXTURES_PATH / 'small-eventlog.csv', columnar=True)
+    matrix = vectorized.flow_matrix(log)
+    assert matrix.shape == (4, 4)
+    assert matrix.tolist() == [[0, 6, 0, 0], [0, 0, 4, 0], [0, 0, 0, 1], [0, 0, 0, 0]]
+
+
+def test_vectorized_empty_eventlog():
+    log = pm.parse_eventlog_csv(BASIC_FIXTURES_PATH / 'empty.csv', columnar=True)
+    assert pm.aggregate(log, pm.NUMPY).report() == pm.aggregate({}).report()